@@ -2,13 +2,23 @@ from agno.agent import Agent
 from agno.models.openrouter import OpenRouter
 from agno.tools import tool
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+import asyncio
+import concurrent.futures
+import inspect
+import json
 import os
+import threading
+import time
+import uuid
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from typing import Optional
 from pydantic import BaseModel
+from src.utils.response_cache import get_response_cache
 
 load_dotenv()
 
@@ -20,6 +30,17 @@ TODOIST_HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Limites do /chat: execuções simultâneas do agente e pedidos aguardando vaga
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+# Eventos do /chat/stream retidos enquanto o cliente não os consome; com o
+# buffer cheio a geração do modelo pausa (backpressure)
+CHAT_STREAM_BUFFER = int(os.getenv("CHAT_STREAM_BUFFER", "64"))
+# Sessões de chat com agente próprio mantidas em memória e inatividade (s)
+# após a qual a sessão é descartada
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "100"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))
+
 
 @tool
 def list_todoist_tasks(filter: Optional[str] = None) -> str:
@@ -212,6 +233,8 @@ def add_todoist_task(content: str, due_date: Optional[str] = None, priority: int
         due_info = ""
         if task.get("due") and task["due"].get("date"):
             due_info = f" 📅 para {task['due']['date']}"
+        # Respostas em cache podem listar as tarefas de antes da criação
+        get_response_cache().invalidate()
         return f"✅ Tarefa adicionada: {task['content']}{due_info} (ID: {task['id']})"
     else:
         return f"Erro ao adicionar tarefa: {response.status_code}"
@@ -231,6 +254,7 @@ def complete_todoist_task(task_id: str) -> str:
     )
     
     if response.status_code == 204:
+        get_response_cache().invalidate()
         return f"✅ Tarefa {task_id} marcada como concluída!"
     else:
         return f"Erro ao completar tarefa: {response.status_code}"
@@ -297,20 +321,240 @@ def list_completed_tasks(limit: int = 20) -> str:
 
 
 # Criar o agente com as ferramentas do Todoist
-agent = Agent(
-    tools=[list_todoist_tasks, add_todoist_task, complete_todoist_task, list_completed_tasks],
-    model=OpenRouter(
-        id="openai/gpt-4o-mini",
-        api_key=os.getenv("OPENROUTER_API_KEY")
-    )
+# Modelo e ferramentas são criados uma vez e compartilhados pelos agentes das sessões
+TOOLS = [list_todoist_tasks, add_todoist_task, complete_todoist_task, list_completed_tasks]
+MODEL = OpenRouter(
+    id="openai/gpt-4o-mini",
+    api_key=os.getenv("OPENROUTER_API_KEY")
 )
 
+
+def create_agent() -> Agent:
+    # Sem histórico no contexto, a resposta só depende da mensagem: com
+    # RESPONSE_CACHE_TTL > 0, perguntas repetidas são respondidas pelo cache
+    return get_response_cache().wrap(Agent(tools=TOOLS, model=MODEL))
+
+
+class AgentPool:
+    """
+    Um agente por sessão, descartado por inatividade (TTL) ou pelo limite de
+    sessões (o menos usado primeiro).
+    
+    Cada agente tem uma trava (asyncio.Lock): pedidos simultâneos da mesma
+    sessão são executados em ordem, e sessões diferentes não compartilham estado.
+    A trava é obtida no event loop antes da vaga do ChatLimiter, para que um
+    pedido esperando a própria sessão não ocupe uma thread do pool.
+    """
+    
+    def __init__(self, factory, max_sessions: int, ttl: float):
+        self.factory = factory
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        # session_id -> [agente, trava, último uso], do menos ao mais recente
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+    
+    def acquire(self, session_id: str):
+        """Retorna (agente, trava) da sessão, criando o agente se necessário."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry[2] = now
+                self._sessions.move_to_end(session_id)
+                self.reused += 1
+                return entry[0], entry[1]
+            self._evict(now)
+        
+        # Criado fora da trava do pool: não atrasa as demais sessões
+        agent = self.factory()
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, [agent, asyncio.Lock(), now])
+            if entry[0] is agent:
+                self.created += 1
+            return entry[0], entry[1]
+    
+    def _evict(self, now: float):
+        """Remove sessões expiradas e, acima do limite, as menos usadas ociosas."""
+        for session_id, (_, lock, last_used) in list(self._sessions.items()):
+            expired = self.ttl > 0 and now - last_used >= self.ttl
+            if not expired and len(self._sessions) < self.max_sessions:
+                break
+            # Sessões com execução em andamento ficam até terminar
+            if not lock.locked():
+                del self._sessions[session_id]
+                self.evicted += 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+
+agent_pool = AgentPool(create_agent, CHAT_MAX_SESSIONS, CHAT_SESSION_TTL)
+
+
+def run_agent(agent: Agent, session_id: str, message: str):
+    """Executa o agente da sessão (em uma thread do pool, com a trava da sessão já obtida)."""
+    return agent.run(message, session_id=session_id)
+
+
+class ChatLimiter:
+    """
+    Executa o agente fora do event loop, com limite de concorrência e de fila.
+    
+    As ferramentas usam requests (síncrono): mesmo agent.arun() chamaria as
+    ferramentas dentro do event loop. Por isso agent.run() roda em um pool de
+    threads do mesmo tamanho do limite, e o loop continua livre para os demais
+    pedidos.
+    """
+    
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="chat")
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+    
+    def is_full(self) -> bool:
+        return self.waiting >= self.max_queue
+    
+    async def _acquire(self, lock: Optional[asyncio.Lock] = None):
+        """Aguarda a trava da sessão (se houver) e depois uma vaga."""
+        self.waiting += 1
+        try:
+            if lock is not None:
+                await lock.acquire()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                if lock is not None:
+                    lock.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.running += 1
+    
+    def _release(self, start: float, failed: bool, lock: Optional[asyncio.Lock] = None):
+        if failed:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._busy_seconds += time.perf_counter() - start
+        self.running -= 1
+        self._slots.release()
+        if lock is not None:
+            lock.release()
+    
+    async def run(self, func, *args, lock: Optional[asyncio.Lock] = None):
+        """
+        Aguarda uma vaga e executa func(*args) em uma thread do pool.
+        
+        Com `lock`, a trava é obtida antes da vaga e liberada junto com ela.
+        """
+        await self._acquire(lock)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            failed = False
+            return result
+        finally:
+            self._release(start, failed, lock)
+    
+    async def stream(self, func, *args, lock: Optional[asyncio.Lock] = None, buffer: int = CHAT_STREAM_BUFFER):
+        """
+        Aguarda uma vaga, consome o iterador síncrono func(*args) em uma thread
+        do pool e repassa os itens por uma fila limitada.
+        
+        Com a fila cheia (cliente lento) a thread espera, e o iterador do modelo
+        não avança. Se o consumidor desistir (cliente desconectou), a thread
+        para no item seguinte e só então a vaga (e a trava `lock`) é liberada.
+        """
+        await self._acquire(lock)
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer))
+        cancelled = threading.Event()
+        end = object()
+        
+        def put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return False
+        
+        def produce():
+            iterator = func(*args)
+            try:
+                for item in iterator:
+                    if cancelled.is_set() or not put(item):
+                        return
+            except Exception as e:
+                put(e)
+                raise
+            finally:
+                # Fecha o gerador nesta thread (encerra a execução do agente)
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                put(end)
+        
+        task = loop.run_in_executor(self._executor, produce)
+        task.add_done_callback(lambda t: self._release(start, t.cancelled() or t.exception() is not None, lock))
+        try:
+            while True:
+                item = await queue.get()
+                if item is end:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+    
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_seconds": round(self._busy_seconds / finished, 3) if finished else 0.0,
+        }
+
+
+chat_limiter = ChatLimiter(CHAT_MAX_CONCURRENCY, CHAT_MAX_QUEUE)
+
 # Criar FastAPI app
 app = FastAPI(title="Assistente Todoist")
 
 # Modelo para requisições
 class ChatRequest(BaseModel):
     message: str
+    # Sessão do cliente; sem ela, o pedido abre uma sessão nova
+    session_id: Optional[str] = None
 
 # Página HTML simples
 @app.get("/", response_class=HTMLResponse)
@@ -351,6 +595,7 @@ async def root():
             }
             .user { background: #e3f2fd; }
             .assistant { background: #f5f5f5; white-space: pre-wrap; }
+            .tool { color: #777; font-size: 13px; margin: -10px 0 5px 10px; }
             .input-group {
                 display: flex;
                 gap: 10px;
@@ -412,6 +657,9 @@ async def root():
         </div>
 
         <script>
+            // Sessão da aba: o servidor mantém um agente (e o histórico) por sessão
+            let sessionId = sessionStorage.getItem('sessionId');
+
             function addMessage(content, isUser) {
                 const messages = document.getElementById('messages');
                 const div = document.createElement('div');
@@ -421,6 +669,17 @@ async def root():
                 messages.scrollTop = messages.scrollHeight;
             }
 
+            function addToolStatus(div, data) {
+                let line = div.querySelector('[data-tool="' + data.name + '"]');
+                if (!line) {
+                    line = document.createElement('div');
+                    line.className = 'tool';
+                    line.dataset.tool = data.name;
+                    div.parentNode.insertBefore(line, div);
+                }
+                line.textContent = (data.status === 'started' ? '🔧 ' : '✔️ ') + data.name;
+            }
+
             function setInput(text) {
                 document.getElementById('input').value = text;
                 document.getElementById('input').focus();
@@ -437,15 +696,50 @@ async def root():
                 input.value = '';
                 sendBtn.disabled = true;
                 
+                const messages = document.getElementById('messages');
+                const div = document.createElement('div');
+                div.className = 'message assistant';
+                messages.appendChild(div);
+                
                 try {
-                    const response = await fetch('/chat', {
+                    const response = await fetch('/chat/stream', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ message: message })
+                        body: JSON.stringify({ message: message, session_id: sessionId })
                     });
                     
-                    const data = await response.json();
-                    addMessage(data.response, false);
+                    if (!response.ok) {
+                        const data = await response.json();
+                        div.textContent = data.response;
+                        return;
+                    }
+                    
+                    // Lê os eventos SSE à medida que chegam e acrescenta o texto
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    while (true) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        const events = buffer.split('\n\n');
+                        buffer = events.pop();
+                        for (const raw of events) {
+                            const event = (raw.match(/^event: (.*)$/m) || [])[1];
+                            const data = JSON.parse((raw.match(/^data: (.*)$/m) || [])[1] || '{}');
+                            if (event === 'session') {
+                                sessionId = data.session_id;
+                                sessionStorage.setItem('sessionId', sessionId);
+                            } else if (event === 'token') {
+                                div.textContent += data.content;
+                            } else if (event === 'tool') {
+                                addToolStatus(div, data);
+                            } else if (event === 'error') {
+                                div.textContent += '\nErro: ' + data.message;
+                            }
+                        }
+                        messages.scrollTop = messages.scrollHeight;
+                    }
                 } catch (error) {
                     addMessage('Erro: ' + error.message, false);
                 } finally {
@@ -460,12 +754,78 @@ async def root():
 # Endpoint do chat
 @app.post("/chat")
 async def chat(request: ChatRequest):
+    if chat_limiter.is_full():
+        chat_limiter.rejected += 1
+        return JSONResponse(
+            status_code=503,
+            content={"response": "Servidor ocupado, tente novamente em alguns segundos."},
+        )
     try:
-        response = agent.run(request.message)
-        return {"response": response.content}
+        session_id = request.session_id or uuid.uuid4().hex
+        agent, lock = agent_pool.acquire(session_id)
+        response = await chat_limiter.run(run_agent, agent, session_id, request.message, lock=lock)
+        return {"response": response.content, "session_id": session_id}
     except Exception as e:
         return {"response": f"Erro: {str(e)}"}
 
+# O agno renomeou o parâmetro dos eventos intermediários (ferramentas) entre versões
+_STREAM_EVENTS_ARG = (
+    "stream_events" if "stream_events" in inspect.signature(Agent.run).parameters
+    else "stream_intermediate_steps"
+)
+
+
+def run_agent_stream(agent: Agent, session_id: str, message: str):
+    """Executa o agente da sessão em modo streaming (iterador síncrono de eventos)."""
+    yield from agent.run(message, stream=True, session_id=session_id, **{_STREAM_EVENTS_ARG: True})
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# Endpoint do chat com streaming (Server-Sent Events)
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    if chat_limiter.is_full():
+        chat_limiter.rejected += 1
+        return JSONResponse(
+            status_code=503,
+            content={"response": "Servidor ocupado, tente novamente em alguns segundos."},
+        )
+    
+    session_id = request.session_id or uuid.uuid4().hex
+    
+    async def events():
+        yield sse("session", {"session_id": session_id})
+        try:
+            agent, lock = agent_pool.acquire(session_id)
+            stream = chat_limiter.stream(run_agent_stream, agent, session_id, request.message, lock=lock)
+            async for event in stream:
+                kind = getattr(event, "event", "")
+                if kind == "RunContent" and event.content:
+                    yield sse("token", {"content": str(event.content)})
+                elif kind in ("ToolCallStarted", "ToolCallCompleted") and getattr(event, "tool", None):
+                    status = "started" if kind == "ToolCallStarted" else "completed"
+                    yield sse("tool", {"name": event.tool.tool_name, "status": status})
+                elif kind == "RunError":
+                    yield sse("error", {"message": str(getattr(event, "content", "") or "Erro na execução")})
+            yield sse("done", {})
+        except Exception as e:
+            yield sse("error", {"message": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Sem cache nem buffer em proxies: cada evento sai assim que é gerado
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Métricas de concorrência e fila do /chat
+@app.get("/metrics")
+async def metrics():
+    return {**chat_limiter.stats(), "agents": agent_pool.stats(), "response_cache": get_response_cache().stats()}
+
 if __name__ == "__main__":
     import uvicorn
     print("🤖 Assistente Todoist com Interface Web!")
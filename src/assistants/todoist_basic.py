@@ -13,8 +13,11 @@ from src.tools import (
     list_todoist_tasks,
     add_todoist_task,
     complete_todoist_task,
-    list_completed_tasks
+    list_completed_tasks,
+    add_todoist_tasks,
+    complete_todoist_tasks
 )
+from src.utils import get_pool_stats
 
 
 def create_todoist_assistant():
@@ -27,6 +30,7 @@ def create_todoist_assistant():
         - Listar tarefas (todas, hoje, amanhã, semana, vencidas)
         - Adicionar novas tarefas com datas
         - Marcar tarefas como concluídas
+        - Adicionar ou concluir várias tarefas de uma vez (prefira as ferramentas em lote)
         - Mostrar tarefas já concluídas
         
         Seja sempre claro e organizado nas respostas.""",
@@ -34,7 +38,9 @@ def create_todoist_assistant():
             list_todoist_tasks,
             add_todoist_task,
             complete_todoist_task,
-            list_completed_tasks
+            list_completed_tasks,
+            add_todoist_tasks,
+            complete_todoist_tasks
         ],
         model=OpenRouter(
             id=DEFAULT_MODEL,
@@ -76,6 +82,7 @@ def main():
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/agents  - Listar agentes")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/runs    - Histórico de execuções")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/mcp     - MCP Server endpoint")
+    print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/todoist/stats - Requisições e pool de conexões do Todoist")
     print()
     print("🎯 Para usar o agente via API:")
     print(f'  curl -X POST "http://localhost:{AGENTOS_DEFAULT_PORT}/agent/run" \\')
@@ -111,5 +118,11 @@ agent_os = AgentOS(
 app = agent_os.get_app()
 
 
+@app.get("/todoist/stats")
+async def todoist_stats():
+    """Requisições, latência e pool de conexões do cliente Todoist compartilhado."""
+    return get_pool_stats()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
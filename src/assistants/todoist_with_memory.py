@@ -4,28 +4,122 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from typing import Any, Dict, Optional
+
 from agno.agent import Agent
 from agno.models.openrouter import OpenRouter
 from agno.tools import tool
 from agno.os import AgentOS
 from agno.os.interfaces.agui import AGUI
-from agno.storage import SqliteStorage
+from agno.db.sqlite import SqliteDb
 from src.config import OPENROUTER_API_KEY, DEFAULT_MODEL, AGENTOS_DEFAULT_PORT
 from src.tools import (
     list_todoist_tasks,
     add_todoist_task,
     complete_todoist_task,
-    list_completed_tasks
+    list_completed_tasks,
+    add_todoist_tasks,
+    complete_todoist_tasks
 )
-from src.utils import MemoryManager
+from src.utils import MemoryManager, get_pool_stats
 
 
 # Inicializar o gerenciador de memória
 memory_manager = MemoryManager()
 
+# Chave do session_state com a mensagem da execução, usada pelas instruções
+# dinâmicas para selecionar as memórias relacionadas
+MEMORY_QUERY_KEY = "memory_query"
+
+INSTRUCTIONS = """Você é um assistente especializado em gerenciar tarefas no Todoist com memória persistente.
+        
+        Você pode:
+        - Listar, adicionar e completar tarefas no Todoist (use as ferramentas em lote para várias tarefas)
+        - Lembrar preferências e informações do usuário
+        - Recuperar informações armazenadas anteriormente (pela chave ou buscando pelo assunto)
+        - Mostrar todas as memórias armazenadas
+        - Limpar memórias quando solicitado
+        
+        {memory_context}
+        
+        Use a memória para personalizar suas respostas e lembrar de preferências do usuário.
+        Seja proativo em sugerir ações baseadas no que você sabe sobre o usuário."""
+
+
+# Tamanho máximo do user_id (informado pelo cliente) aceito nas memórias
+MAX_USER_ID_LENGTH = 256
+
+
+def _current_user(session_state: Optional[Dict[str, Any]]) -> str:
+    """
+    Usuário da execução atual ("default" quando a chamada não informa user_id).
+    
+    O agno coloca o user_id da execução em session_state["current_user_id"].
+    
+    Raises:
+        ValueError: Se o user_id for longo demais ou tiver caracteres de controle
+    """
+    user_id = (session_state or {}).get("current_user_id")
+    if not user_id:
+        return "default"
+    # O user_id vem do cliente: os backends não o usam como caminho (nomes
+    # inseguros viram hash), mas ids absurdos são recusados aqui
+    if not isinstance(user_id, str) or len(user_id) > MAX_USER_ID_LENGTH or not user_id.isprintable():
+        raise ValueError("user_id inválido")
+    return user_id
+
+
+def memory_instructions(session_state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Instruções do agente com as memórias do usuário, montadas a cada execução.
+    
+    Inclui só as memórias relacionadas à mensagem (ou as mais recentes, sem
+    mensagem); o resumo fica em cache até a próxima alteração das memórias.
+    """
+    user_id = _current_user(session_state)
+    query = (session_state or {}).get(MEMORY_QUERY_KEY)
+    if query:
+        memory_context = memory_manager.get_relevant_context(query, user_id)
+    else:
+        memory_context = memory_manager.get_context_summary(user_id)
+    return INSTRUCTIONS.format(memory_context=memory_context)
+
+
+def with_memory_query(agent: Agent) -> Agent:
+    """
+    Passa a mensagem de cada execução no session_state, para memory_instructions.
+    
+    Envolve agent.run e agent.arun (usados também pelo AgentOS); mensagens que
+    não são texto limpam a consulta da execução anterior.
+    
+    Args:
+        agent: Agente agno
+    
+    Returns:
+        O próprio agente
+    """
+    run, arun = agent.run, agent.arun
+
+    def add_query(args, kwargs):
+        text = args[0] if args else kwargs.get("input")
+        kwargs["session_state"] = {
+            **(kwargs.get("session_state") or {}),
+            MEMORY_QUERY_KEY: text if isinstance(text, str) else None,
+        }
+        return kwargs
+
+    def run_with_query(*args, **kwargs):
+        return run(*args, **add_query(args, kwargs))
+
+    def arun_with_query(*args, **kwargs):
+        return arun(*args, **add_query(args, kwargs))
+
+    agent.run, agent.arun = run_with_query, arun_with_query
+    return agent
+
 
 @tool
-def remember_preference(key: str, value: str) -> str:
+def remember_preference(key: str, value: str, session_state: Optional[Dict[str, Any]] = None) -> str:
     """
     Armazena uma preferência ou informação do usuário na memória.
     
@@ -33,28 +127,48 @@ def remember_preference(key: str, value: str) -> str:
         key: Chave da preferência (ex: "projeto_prioritário", "horário_preferido")
         value: Valor da preferência
     """
-    memory_manager.remember(key, value)
+    memory_manager.remember(key, value, _current_user(session_state))
     return f"✅ Vou lembrar que {key}: {value}"
 
 
 @tool
-def recall_preference(key: str) -> str:
+def recall_preference(key: str, session_state: Optional[Dict[str, Any]] = None) -> str:
     """
     Recupera uma preferência ou informação armazenada na memória.
     
     Args:
         key: Chave da preferência a recuperar
     """
-    value = memory_manager.recall(key)
+    value = memory_manager.recall(key, _current_user(session_state))
     if value:
         return f"📝 Lembro que {key}: {value}"
     return f"❌ Não tenho informação sobre '{key}' na memória"
 
 
 @tool
-def show_all_memories() -> str:
+def search_memories(query: str, limit: int = 5, session_state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Busca memórias pelo assunto, sem precisar saber a chave exata.
+    
+    Args:
+        query: O que procurar (ex: "projeto mais importante", "horário de trabalho")
+        limit: Número máximo de memórias a retornar (padrão: 5)
+    """
+    results = memory_manager.search(query, _current_user(session_state), k=limit)
+    if not results:
+        return f"❌ Não encontrei memórias relacionadas a '{query}'"
+    
+    result = f"🔎 Memórias relacionadas a '{query}':\n"
+    for key, value, score in results:
+        result += f"  • {key}: {value} ({score:.0%})\n"
+    
+    return result
+
+
+@tool
+def show_all_memories(session_state: Optional[Dict[str, Any]] = None) -> str:
     """Mostra todas as preferências e informações armazenadas na memória."""
-    memories = memory_manager.get_all_memories()
+    memories = memory_manager.get_all_memories(_current_user(session_state))
     if not memories:
         return "📭 Ainda não tenho nenhuma memória armazenada"
     
@@ -67,42 +181,31 @@ def show_all_memories() -> str:
 
 
 @tool
-def clear_all_memories() -> str:
+def clear_all_memories(session_state: Optional[Dict[str, Any]] = None) -> str:
     """Limpa todas as memórias armazenadas."""
-    memory_manager.clear_memories()
+    memory_manager.clear_memories(_current_user(session_state))
     return "🧹 Todas as memórias foram limpas"
 
 
 def create_todoist_assistant_with_memory():
     """Cria o assistente Todoist com memória persistente."""
     
-    # Obter contexto das memórias anteriores
-    memory_context = memory_manager.get_context_summary()
-    
     agent = Agent(
         name="Assistente Todoist com Memória",
-        instructions=f"""Você é um assistente especializado em gerenciar tarefas no Todoist com memória persistente.
-        
-        Você pode:
-        - Listar, adicionar e completar tarefas no Todoist
-        - Lembrar preferências e informações do usuário
-        - Recuperar informações armazenadas anteriormente
-        - Mostrar todas as memórias armazenadas
-        - Limpar memórias quando solicitado
-        
-        {memory_context}
-        
-        Use a memória para personalizar suas respostas e lembrar de preferências do usuário.
-        Seja proativo em sugerir ações baseadas no que você sabe sobre o usuário.""",
+        # Contexto das memórias calculado a cada execução, para o usuário atual
+        instructions=memory_instructions,
         tools=[
             # Ferramentas do Todoist
             list_todoist_tasks,
             add_todoist_task,
             complete_todoist_task,
             list_completed_tasks,
+            add_todoist_tasks,
+            complete_todoist_tasks,
             # Ferramentas de memória
             remember_preference,
             recall_preference,
+            search_memories,
             show_all_memories,
             clear_all_memories
         ],
@@ -113,13 +216,13 @@ def create_todoist_assistant_with_memory():
         add_history_to_context=True,
         num_history_runs=10,
         markdown=True,
-        storage=SqliteStorage(
+        db=SqliteDb(
             db_file="storage/todoist_memory_assistant.db",
-            table_name="interactions"
+            session_table="interactions"
         )
     )
     
-    return agent
+    return with_memory_query(agent)
 
 
 def main():
@@ -135,10 +238,6 @@ def main():
         interfaces=[AGUI(agent=agent)],
         telemetry=True,
         enable_mcp=True,
-        storage=SqliteStorage(
-            db_file="storage/agentos_memory.db",
-            table_name="agentos_data"
-        )
     )
     
     # Obter a aplicação FastAPI
@@ -154,6 +253,7 @@ def main():
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/memory  - Visualizar memórias")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/history - Histórico de interações")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/mcp     - MCP Server endpoint")
+    print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/todoist/stats - Requisições e pool de conexões do Todoist")
     print()
     print("🧠 Recursos de Memória:")
     print("  • Lembra preferências do usuário")
@@ -186,13 +286,15 @@ agent_os = AgentOS(
     interfaces=[AGUI(agent=agent)],
     telemetry=True,
     enable_mcp=True,
-    storage=SqliteStorage(
-        db_file="storage/agentos_memory.db",
-        table_name="agentos_data"
-    )
 )
 app = agent_os.get_app()
 
 
+@app.get("/todoist/stats")
+async def todoist_stats():
+    """Requisições, latência e pool de conexões do cliente Todoist compartilhado."""
+    return get_pool_stats()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -14,8 +14,11 @@ from src.tools import (
     list_todoist_tasks,
     add_todoist_task,
     complete_todoist_task,
-    list_completed_tasks
+    list_completed_tasks,
+    add_todoist_tasks,
+    complete_todoist_tasks
 )
+from src.utils import get_pool_stats
 
 
 def create_todoist_assistant_with_storage():
@@ -28,6 +31,7 @@ def create_todoist_assistant_with_storage():
         - Listar tarefas (todas, hoje, amanhã, semana, vencidas)
         - Adicionar novas tarefas com datas
         - Marcar tarefas como concluídas
+        - Adicionar ou concluir várias tarefas de uma vez (prefira as ferramentas em lote)
         - Mostrar tarefas já concluídas
         
         Importante: Você tem armazenamento persistente e mantém histórico das interações.
@@ -36,7 +40,9 @@ def create_todoist_assistant_with_storage():
             list_todoist_tasks,
             add_todoist_task,
             complete_todoist_task,
-            list_completed_tasks
+            list_completed_tasks,
+            add_todoist_tasks,
+            complete_todoist_tasks
         ],
         model=OpenRouter(
             id=DEFAULT_MODEL,
@@ -86,6 +92,7 @@ def main():
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/storage - Visualizar dados armazenados")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/history - Histórico de interações")
     print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/mcp     - MCP Server endpoint")
+    print(f"  • http://localhost:{AGENTOS_DEFAULT_PORT}/todoist/stats - Requisições e pool de conexões do Todoist")
     print()
     print("💾 Recursos de Armazenamento:")
     print("  • Histórico persistente de conversas")
@@ -124,5 +131,11 @@ agent_os = AgentOS(
 app = agent_os.get_app()
 
 
+@app.get("/todoist/stats")
+async def todoist_stats():
+    """Requisições, latência e pool de conexões do cliente Todoist compartilhado."""
+    return get_pool_stats()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -23,6 +23,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # URLs base
 TODOIST_BASE_URL = "https://api.todoist.com/rest/v2"
+TODOIST_SYNC_URL = "https://api.todoist.com/sync/v9"
 
 # Headers padrão para Todoist
 TODOIST_HEADERS = {
@@ -30,6 +31,85 @@ TODOIST_HEADERS = {
     "Content-Type": "application/json"
 } if TODOIST_API_KEY else {}
 
+# Configurações do cliente HTTP do Todoist (pool de conexões, timeouts e retry)
+TODOIST_CONNECT_TIMEOUT = float(os.getenv("TODOIST_CONNECT_TIMEOUT", "3.05"))
+TODOIST_READ_TIMEOUT = float(os.getenv("TODOIST_READ_TIMEOUT", "10"))
+TODOIST_POOL_CONNECTIONS = int(os.getenv("TODOIST_POOL_CONNECTIONS", "4"))
+TODOIST_POOL_MAXSIZE = int(os.getenv("TODOIST_POOL_MAXSIZE", "10"))
+TODOIST_MAX_RETRIES = int(os.getenv("TODOIST_MAX_RETRIES", "3"))
+TODOIST_BACKOFF_FACTOR = float(os.getenv("TODOIST_BACKOFF_FACTOR", "0.5"))
+TODOIST_ASYNC_MAX_CONNECTIONS = int(os.getenv("TODOIST_ASYNC_MAX_CONNECTIONS", "100"))
+
+# Espelho local de tarefas (SQLite sincronizado via Sync API)
+TODOIST_MIRROR_ENABLED = os.getenv("TODOIST_MIRROR_ENABLED", "true").lower() == "true"
+TODOIST_MIRROR_MAX_AGE = float(os.getenv("TODOIST_MIRROR_MAX_AGE", "30"))
+
+# Janela (segundos) para agrupar escritas concorrentes em um único request de
+# commands da Sync API; 0 desativa o agrupamento e usa a REST API diretamente
+TODOIST_BATCH_WINDOW = float(os.getenv("TODOIST_BATCH_WINDOW", "0"))
+
+# Cache de list_todoist_tasks por filtro (TTL em segundos, 0 desativa; tamanho LRU).
+# O cache é por processo: uma escrita só o limpa no processo que a fez. Com vários
+# workers (ex: uvicorn --workers N), os demais podem listar dados velhos por até
+# TODOIST_CACHE_TTL segundos; nesse cenário use um TTL curto (ou 0)
+TODOIST_CACHE_TTL = float(os.getenv("TODOIST_CACHE_TTL", "60"))
+TODOIST_CACHE_SIZE = int(os.getenv("TODOIST_CACHE_SIZE", "128"))
+
+# Formato das listagens para o agente: "verbose" (emojis), "compact" (menos tokens)
+# ou "table" (colunas separadas por tab, datas agrupadas)
+TODOIST_OUTPUT_MODE = os.getenv("TODOIST_OUTPUT_MODE", "verbose").lower()
+# Máximo estimado de tokens por listagem; o excedente vira um resumo (0 = sem limite)
+TODOIST_TOKEN_BUDGET = int(os.getenv("TODOIST_TOKEN_BUDGET", "0"))
+
+# Limite de taxa da API do Todoist (token bucket compartilhado entre workers)
+TODOIST_RATE_LIMIT_ENABLED = os.getenv("TODOIST_RATE_LIMIT_ENABLED", "true").lower() == "true"
+TODOIST_RATE_LIMIT = int(os.getenv("TODOIST_RATE_LIMIT", "1000"))  # requisições por janela
+TODOIST_RATE_WINDOW = float(os.getenv("TODOIST_RATE_WINDOW", "900"))  # janela em segundos
+TODOIST_RATE_BURST = int(os.getenv("TODOIST_RATE_BURST", "50"))
+TODOIST_RATE_RESERVE = float(os.getenv("TODOIST_RATE_RESERVE", "0.2"))  # fração para leituras
+TODOIST_RATE_MAX_WAIT = float(os.getenv("TODOIST_RATE_MAX_WAIT", "60"))
+TODOIST_RATE_LIMIT_DB = Path(os.getenv("TODOIST_RATE_LIMIT_DB", str(STORAGE_DIR / "todoist_ratelimit.db")))
+
+# Armazenamento das memórias dos assistentes: "sqlite" (WAL, uma linha por
+# memória), "json" (um arquivo por usuário, formato original) ou "journal"
+# (snapshot JSON + journal append-only compactado em segundo plano)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "sqlite").lower()
+MEMORY_JOURNAL_FSYNC_INTERVAL = float(os.getenv("MEMORY_JOURNAL_FSYNC_INTERVAL", "0.1"))
+MEMORY_JOURNAL_COMPACT_INTERVAL = float(os.getenv("MEMORY_JOURNAL_COMPACT_INTERVAL", "30"))
+MEMORY_JOURNAL_COMPACT_ENTRIES = int(os.getenv("MEMORY_JOURNAL_COMPACT_ENTRIES", "500"))
+# Usuários com memórias mantidas em RAM (LRU); os demais são lidos sob demanda
+MEMORY_CACHE_USERS = int(os.getenv("MEMORY_CACHE_USERS", "256"))
+# Gravação das memórias: "sync" (antes de retornar) ou "buffered" (write-behind,
+# gravadas a cada MEMORY_FLUSH_INTERVAL segundos, MEMORY_FLUSH_COUNT alterações
+# ou ao encerrar o processo)
+MEMORY_DURABILITY = os.getenv("MEMORY_DURABILITY", "sync").lower()
+MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "1.0"))
+MEMORY_FLUSH_COUNT = int(os.getenv("MEMORY_FLUSH_COUNT", "100"))
+# Espera máxima, em segundos, entre novas tentativas de uma gravação em segundo
+# plano que falhou (a espera dobra a cada falha seguida)
+MEMORY_FLUSH_MAX_BACKOFF = float(os.getenv("MEMORY_FLUSH_MAX_BACKOFF", "60"))
+# Segundos entre verificações de memórias alteradas por outros processos (ex:
+# workers do uvicorn); só os usuários alterados são recarregados (0 = a cada acesso)
+MEMORY_SYNC_INTERVAL = float(os.getenv("MEMORY_SYNC_INTERVAL", "1.0"))
+# Dimensão dos vetores da busca semântica nas memórias (embedder local por hashing)
+MEMORY_EMBEDDING_DIM = int(os.getenv("MEMORY_EMBEDDING_DIM", "256"))
+# Retenção: máximo de memórias por usuário (0 = sem limite), validade padrão em
+# segundos (0 = não expira) e política de descarte ("lru", "oldest" ou "importance")
+MEMORY_MAX_PER_USER = int(os.getenv("MEMORY_MAX_PER_USER", "1000"))
+MEMORY_DEFAULT_TTL = float(os.getenv("MEMORY_DEFAULT_TTL", "0"))
+MEMORY_EVICTION_POLICY = os.getenv("MEMORY_EVICTION_POLICY", "lru").lower()
+
+# Cache de respostas dos agentes (opt-in): validade em segundos (0 = desativado),
+# entradas por usuário e similaridade mínima para reaproveitar uma pergunta
+# parecida (0 = só texto idêntico após normalização; use valores altos, ex: 0.9).
+# Usado pelos agentes sem histórico no contexto (5-assistente-api.py); agentes com
+# histórico não passam pelo cache. O cache é por processo: uma escrita no Todoist
+# só o invalida no worker que a fez, e os demais podem repetir respostas velhas
+# por até RESPONSE_CACHE_TTL segundos
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "64"))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))
+
 # Configurações do AgentOS
 AGENTOS_DEFAULT_PORT = 7777
 AGENTOS_DEFAULT_HOST = "localhost"
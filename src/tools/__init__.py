@@ -4,12 +4,30 @@ from .todoist import (
     list_todoist_tasks,
     add_todoist_task,
     complete_todoist_task,
-    list_completed_tasks
+    list_completed_tasks,
+    add_todoist_tasks,
+    complete_todoist_tasks
+)
+from .todoist_async import (
+    alist_todoist_tasks,
+    aadd_todoist_task,
+    acomplete_todoist_task,
+    alist_completed_tasks,
+    aadd_todoist_tasks,
+    acomplete_todoist_tasks
 )
 
 __all__ = [
     'list_todoist_tasks',
     'add_todoist_task', 
     'complete_todoist_task',
-    'list_completed_tasks'
+    'list_completed_tasks',
+    'add_todoist_tasks',
+    'complete_todoist_tasks',
+    'alist_todoist_tasks',
+    'aadd_todoist_task',
+    'acomplete_todoist_task',
+    'alist_completed_tasks',
+    'aadd_todoist_tasks',
+    'acomplete_todoist_tasks'
 ]
\ No newline at end of file
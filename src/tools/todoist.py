@@ -1,118 +1,294 @@
 """Ferramentas para integração com Todoist"""
 
+import httpx
 import requests
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date
+from typing import Optional, Dict, Any, List
 from agno.tools import tool
-from src.config import TODOIST_BASE_URL, TODOIST_HEADERS
+from src.config import (
+    TODOIST_SYNC_URL,
+    TODOIST_MIRROR_ENABLED,
+    TODOIST_BATCH_WINDOW,
+    TODOIST_CACHE_TTL,
+    TODOIST_CACHE_SIZE,
+    TODOIST_OUTPUT_MODE,
+    TODOIST_TOKEN_BUDGET,
+)
+from src.utils.cache import TTLCache
+from src.utils.streaming import iter_json_array, paginate
+from src.utils.dates import resolve_filter, resolve_due_date
+from src.utils.render import TaskRenderer
+from src.utils.http_client import get_todoist_client
+from src.utils.task_mirror import get_task_mirror, TodoistAPIError
+from src.utils.response_cache import get_response_cache
+from src.utils.singleflight import SingleFlight
+from src.utils.batching import (
+    item_add_command,
+    item_close_command,
+    task_from_command,
+    execute_commands,
+    get_write_batcher,
+)
+
+
+COMPLETED_TASKS_URL = f"{TODOIST_SYNC_URL}/completed/get_all"
+
+# Tamanho dos pedaços lidos ao processar a lista de tarefas em streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Páginas de list_todoist_tasks por filtro resolvido; invalidado a cada escrita
+task_list_cache = TTLCache(maxsize=TODOIST_CACHE_SIZE, ttl=TODOIST_CACHE_TTL)
+
+# Leituras idênticas simultâneas (sync e async) compartilham uma única requisição
+read_flights = SingleFlight()
+
+# Erros que uma leitura compartilhada pode repassar (o líder pode ser sync ou async)
+READ_ERRORS = (requests.RequestException, httpx.HTTPError, TodoistAPIError)
+
+
+def _build_list_params(filter: Optional[str]) -> Dict[str, Any]:
+    """Converte o filtro em linguagem natural nos parâmetros da API."""
+    resolved = resolve_filter(filter)
+    return {"filter": resolved.query} if resolved else {}
+
+
+def _task_list_cache_key(filter: Optional[str], limit: int, offset: int) -> str:
+    """Chave de cache: filtro do Todoist resolvido + dia atual (filtros relativos mudam à meia-noite) + página."""
+    resolved = _build_list_params(filter).get("filter", "")
+    return f"{date.today().isoformat()}|{resolved}|{offset}|{limit}"
+
+
+def _fetch_task_page(filter: Optional[str], limit: int, offset: int):
+    """
+    Busca uma página de tarefas sem carregar a lista inteira.
+
+    Returns:
+        Tupla (tarefas, há_mais)
+
+    Raises:
+        requests.RequestException, TodoistAPIError: Em falhas de acesso à API
+        ValueError: Se a resposta não for um array JSON válido
+    """
+    if TODOIST_MIRROR_ENABLED:
+        mirror = get_task_mirror()
+        mirror.ensure_fresh()
+        tasks = mirror.list_tasks(filter, limit=limit + 1, offset=offset)
+        return tasks[:limit], len(tasks) > limit
+
+    params = _build_list_params(filter)
+    response = get_todoist_client().get("/tasks", params=params, stream=True)
+    try:
+        if response.status_code != 200:
+            raise TodoistAPIError(response.status_code)
+        tasks = iter_json_array(response.iter_content(STREAM_CHUNK_SIZE))
+        return paginate(tasks, offset, limit)
+    finally:
+        response.close()
+
+
+def _load_task_page(cache_key: str, filter: Optional[str], limit: int, offset: int):
+    """Busca uma página (em voo compartilhado) e a guarda no cache."""
+    page = task_list_cache.get(cache_key)
+    if page is None:
+        # Uma escrita durante a busca invalida o cache: a página lida antes dela não é gravada
+        generation = task_list_cache.generation
+        page = _fetch_task_page(filter, limit, offset)
+        task_list_cache.set(cache_key, page, generation)
+    return page
+
+
+def _format_task_list(
+    tasks: List[Dict[str, Any]],
+    filter: Optional[str],
+    offset: int = 0,
+    has_more: bool = False,
+) -> str:
+    """Formata uma página de tarefas ativas para o agente."""
+    if not tasks:
+        filter_msg = f" com filtro '{filter}'" if filter else ""
+        if offset:
+            return f"Nenhuma tarefa a partir da posição {offset} no Todoist{filter_msg}"
+        return f"Nenhuma tarefa encontrada no Todoist{filter_msg}"
+
+    filter_msg = f" ({filter})" if filter else ""
+    renderer = TaskRenderer(TODOIST_OUTPUT_MODE, token_budget=TODOIST_TOKEN_BUDGET)
+    result = renderer.render_tasks(f"📋 Suas tarefas no Todoist{filter_msg}:", tasks)
+
+    if has_more or renderer.omitted:
+        result += f"… há mais tarefas. Use offset={offset + renderer.rendered} para ver a próxima página.\n"
+
+    return result
+
+
+def _build_task_data(content: str, due_date: Optional[str], priority: int) -> Dict[str, Any]:
+    """Monta o corpo da requisição de criação de tarefa."""
+    data = {
+        "content": content,
+        "priority": priority
+    }
+
+    resolved = resolve_due_date(due_date)
+    if resolved:
+        data["due_date"] = resolved
+
+    return data
+
+
+def _format_added_task(task: Dict[str, Any]) -> str:
+    """Formata a confirmação de uma tarefa criada."""
+    due_info = ""
+    if task.get("due") and task["due"].get("date"):
+        due_info = f" 📅 para {task['due']['date']}"
+    return f"✅ Tarefa adicionada: {task['content']}{due_info} (ID: {task['id']})"
+
+
+def _record_added_task(task: Dict[str, Any]):
+    """Propaga uma tarefa criada para o estado local."""
+    # Limpar o cache avança a geração: leituras em voo não gravam a página velha
+    task_list_cache.clear()
+    read_flights.forget()
+    # A conta do Todoist é compartilhada: respostas de todos os usuários ficam velhas
+    get_response_cache().invalidate()
+    if TODOIST_MIRROR_ENABLED:
+        mirror = get_task_mirror()
+        # Antes da escrita local: uma sincronização iniciada antes da criação
+        # não pode aplicar uma lista sem a tarefa nova
+        mirror.mark_stale()
+        mirror.upsert_task(task)
+
+
+def _record_completed_task(task_id: str):
+    """Propaga uma tarefa concluída para o estado local."""
+    task_list_cache.clear()
+    read_flights.forget()
+    get_response_cache().invalidate()
+    if TODOIST_MIRROR_ENABLED:
+        mirror = get_task_mirror()
+        mirror.mark_stale()
+        mirror.remove_task(task_id)
+
+
+def _bulk_add_entries(tasks: List[Any]) -> List[Any]:
+    """
+    Valida os itens de uma criação em lote.
+
+    Returns:
+        Para cada item, na mesma ordem, o command item_add ou a mensagem de erro
+    """
+    entries = []
+    for position, task in enumerate(tasks, start=1):
+        if not isinstance(task, dict):
+            entries.append(f"Erro na tarefa {position}: esperado um objeto com 'content'")
+            continue
+        content = task.get("content")
+        due_date = task.get("due_date")
+        priority = task.get("priority", 1)
+        if not isinstance(content, str) or not content.strip():
+            entries.append(f"Erro na tarefa {position}: 'content' é obrigatório")
+        elif due_date is not None and not isinstance(due_date, str):
+            entries.append(f"Erro na tarefa {position} '{content}': 'due_date' deve ser texto")
+        elif isinstance(priority, bool) or not isinstance(priority, int) or not 1 <= priority <= 4:
+            entries.append(f"Erro na tarefa {position} '{content}': 'priority' deve ser de 1 a 4")
+        else:
+            entries.append(item_add_command(_build_task_data(content, due_date, priority)))
+    return entries
+
+
+def _bulk_add_commands(entries: List[Any]) -> List[Dict[str, Any]]:
+    """Commands válidos de uma criação em lote (ver _bulk_add_entries)."""
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def _bulk_add_report(entries: List[Any], results: List[Dict[str, Any]]) -> str:
+    """Registra e formata o resultado de uma criação em lote (erros de validação na posição do item)."""
+    lines = []
+    results = iter(results)
+    for command in entries:
+        if isinstance(command, str):
+            lines.append(command)
+            continue
+        result = next(results)
+        if result["ok"]:
+            task = task_from_command(command, result)
+            _record_added_task(task)
+            lines.append(_format_added_task(task))
+        else:
+            lines.append(f"Erro ao adicionar tarefa '{command['args']['content']}': {result['error']}")
+    return "\n".join(lines)
+
+
+def _bulk_complete_report(results: List[Dict[str, Any]]) -> str:
+    """Registra e formata o resultado de uma conclusão em lote."""
+    lines = []
+    for result in results:
+        if result["ok"]:
+            _record_completed_task(result["id"])
+            lines.append(f"✅ Tarefa {result['id']} marcada como concluída!")
+        else:
+            lines.append(f"Erro ao completar tarefa {result['id']}: {result['error']}")
+    return "\n".join(lines)
+
+
+def _fetch_completed_tasks(limit: int) -> List[Dict[str, Any]]:
+    """
+    Busca as tarefas concluídas recentemente.
+
+    Raises:
+        requests.RequestException, TodoistAPIError: Em falhas de acesso à API
+    """
+    params = {
+        "limit": limit
+    }
+    response = get_todoist_client().get(COMPLETED_TASKS_URL, params=params)
+    if response.status_code != 200:
+        raise TodoistAPIError(response.status_code)
+    return response.json().get('items', [])
+
+
+def _format_completed_tasks(completed_items: List[Dict[str, Any]]) -> str:
+    """Formata a lista de tarefas concluídas para o agente."""
+    if not completed_items:
+        return "Nenhuma tarefa concluída encontrada"
+
+    renderer = TaskRenderer(TODOIST_OUTPUT_MODE, token_budget=TODOIST_TOKEN_BUDGET)
+    return renderer.render_completed("✅ Tarefas concluídas recentemente:", completed_items)
 
 
 @tool
-def list_todoist_tasks(filter: Optional[str] = None) -> str:
+def list_todoist_tasks(filter: Optional[str] = None, limit: int = 20, offset: int = 0) -> str:
     """
-    Lista tarefas do Todoist com filtros opcionais.
-    
+    Lista tarefas do Todoist com filtros opcionais, em páginas.
+
     Args:
         filter: Filtro opcional para as tarefas. Pode ser:
                - "hoje" ou "today": tarefas de hoje
-               - "amanhã" ou "tomorrow": tarefas de amanhã  
+               - "amanhã" ou "tomorrow": tarefas de amanhã
                - "semana" ou "week": tarefas desta semana
                - "vencidas" ou "overdue": tarefas vencidas
                - None: todas as tarefas
+        limit: Número máximo de tarefas por página (padrão: 20)
+        offset: Posição inicial da página (use o valor indicado no fim da listagem)
     """
-    params = {}
-    
-    if filter:
-        filter_lower = filter.lower()
-        today = datetime.now().date()
-        
-        if filter_lower in ["hoje", "today"]:
-            params["filter"] = "due today"
-        elif filter_lower in ["amanhã", "amanha", "tomorrow"]:
-            params["filter"] = "due tomorrow"
-        elif filter_lower in ["semana", "week", "esta semana", "this week"]:
-            end_date = today + timedelta(days=7)
-            params["filter"] = f"due before: {end_date.strftime('%Y-%m-%d')}"
-        elif filter_lower in ["vencidas", "overdue", "atrasadas"]:
-            params["filter"] = "overdue"
-        elif "próximos" in filter_lower or "next" in filter_lower:
-            import re
-            days_match = re.search(r'(\d+)', filter_lower)
-            if days_match:
-                days = int(days_match.group(1))
-                end_date = today + timedelta(days=days)
-                params["filter"] = f"due before: {end_date.strftime('%Y-%m-%d')}"
-    
-    response = requests.get(
-        f"{TODOIST_BASE_URL}/tasks",
-        headers=TODOIST_HEADERS,
-        params=params
-    )
-    
-    if response.status_code == 200:
-        tasks = response.json()
-        if not tasks:
-            filter_msg = f" com filtro '{filter}'" if filter else ""
-            return f"Nenhuma tarefa encontrada no Todoist{filter_msg}"
-        
-        filter_msg = f" ({filter})" if filter else ""
-        result = f"📋 Suas tarefas no Todoist{filter_msg}:\n"
-        today = datetime.now().date()
-        
-        for task in tasks[:20]:
-            due_info = ""
-            if task.get('due'):
-                due_date = task['due'].get('date', '')
-                due_time = task['due'].get('datetime', '')
-                
-                if due_date:
-                    try:
-                        if due_time:
-                            task_datetime = datetime.strptime(due_time, '%Y-%m-%dT%H:%M:%S')
-                            task_date = task_datetime.date()
-                            time_str = task_datetime.strftime('%H:%M')
-                        else:
-                            task_date = datetime.strptime(due_date, '%Y-%m-%d').date()
-                            time_str = None
-                        
-                        if task_date == today:
-                            time_part = f" às {time_str}" if time_str else ""
-                            due_info = f" 📅 [HOJE{time_part}]"
-                        elif task_date == today + timedelta(days=1):
-                            time_part = f" às {time_str}" if time_str else ""
-                            due_info = f" 📅 [AMANHÃ{time_part}]"
-                        elif task_date < today:
-                            days_overdue = (today - task_date).days
-                            due_info = f" ⚠️ [VENCIDA há {days_overdue} dia{'s' if days_overdue != 1 else ''}]"
-                        else:
-                            formatted_date = task_date.strftime('%d/%m')
-                            time_part = f" às {time_str}" if time_str else ""
-                            due_info = f" 📅 [{formatted_date}{time_part}]"
-                    except:
-                        due_info = f" 📅 [{due_date}]"
-            
-            priority_emoji = ""
-            if task.get('priority', 1) == 4:
-                priority_emoji = "🔴 "
-            elif task.get('priority', 1) == 3:
-                priority_emoji = "🟡 "
-            elif task.get('priority', 1) == 2:
-                priority_emoji = "🔵 "
-            
-            status_emoji = "⬜"
-            
-            result += f"{status_emoji} {priority_emoji}[{task['id']}] {task['content']}{due_info}\n"
-        
-        return result
-    else:
-        return f"Erro ao listar tarefas: {response.status_code}"
+    limit = max(1, limit)
+    offset = max(0, offset)
+
+    cache_key = _task_list_cache_key(filter, limit, offset)
+    page = task_list_cache.get(cache_key)
+    if page is None:
+        try:
+            page = read_flights.do(cache_key, _load_task_page, cache_key, filter, limit, offset)
+        except READ_ERRORS + (ValueError,) as e:
+            return f"Erro ao listar tarefas: {e}"
+
+    tasks, has_more = page
+    return _format_task_list(tasks, filter, offset, has_more)
 
 
 @tool
 def add_todoist_task(content: str, due_date: Optional[str] = None, priority: int = 1) -> str:
     """
     Adiciona uma nova tarefa ao Todoist com data opcional.
-    
+
     Args:
         content: Descrição da tarefa a ser adicionada
         due_date: Data de vencimento opcional. Pode ser:
@@ -122,66 +298,29 @@ def add_todoist_task(content: str, due_date: Optional[str] = None, priority: int
                  - "próxima segunda", "next monday", etc.
         priority: Prioridade da tarefa (1-4, onde 4 é urgente)
     """
-    data = {
-        "content": content,
-        "priority": priority
-    }
-    
-    if due_date:
-        due_date_lower = due_date.lower()
-        today = datetime.now().date()
-        
-        if due_date_lower in ["hoje", "today"]:
-            data["due_date"] = today.strftime("%Y-%m-%d")
-        elif due_date_lower in ["amanhã", "amanha", "tomorrow"]:
-            tomorrow = today + timedelta(days=1)
-            data["due_date"] = tomorrow.strftime("%Y-%m-%d")
-        elif "próxima" in due_date_lower or "next" in due_date_lower:
-            weekdays = {
-                "segunda": 0, "monday": 0,
-                "terça": 1, "tuesday": 1,
-                "quarta": 2, "wednesday": 2,
-                "quinta": 3, "thursday": 3,
-                "sexta": 4, "friday": 4,
-                "sábado": 5, "saturday": 5,
-                "domingo": 6, "sunday": 6
-            }
-            
-            for day_name, day_num in weekdays.items():
-                if day_name in due_date_lower:
-                    days_ahead = day_num - today.weekday()
-                    if days_ahead <= 0:
-                        days_ahead += 7
-                    target_date = today + timedelta(days=days_ahead)
-                    data["due_date"] = target_date.strftime("%Y-%m-%d")
-                    break
-        else:
-            try:
-                parsed_date = datetime.strptime(due_date, "%Y-%m-%d")
-                data["due_date"] = due_date
-            except ValueError:
-                for fmt in ["%d/%m/%Y", "%d-%m-%Y", "%d/%m", "%d-%m"]:
-                    try:
-                        parsed_date = datetime.strptime(due_date, fmt)
-                        if fmt in ["%d/%m", "%d-%m"]:
-                            parsed_date = parsed_date.replace(year=today.year)
-                        data["due_date"] = parsed_date.strftime("%Y-%m-%d")
-                        break
-                    except ValueError:
-                        continue
-    
-    response = requests.post(
-        f"{TODOIST_BASE_URL}/tasks",
-        headers=TODOIST_HEADERS,
-        json=data
-    )
-    
+    data = _build_task_data(content, due_date, priority)
+
+    if TODOIST_BATCH_WINDOW > 0:
+        command = item_add_command(data)
+        try:
+            result = get_write_batcher().submit(command).result()
+        except requests.RequestException as e:
+            return f"Erro ao adicionar tarefa: {e}"
+        if not result["ok"]:
+            return f"Erro ao adicionar tarefa: {result['error']}"
+        task = task_from_command(command, result)
+        _record_added_task(task)
+        return _format_added_task(task)
+
+    try:
+        response = get_todoist_client().post("/tasks", json=data)
+    except requests.RequestException as e:
+        return f"Erro ao adicionar tarefa: {e}"
+
     if response.status_code == 200:
         task = response.json()
-        due_info = ""
-        if task.get("due") and task["due"].get("date"):
-            due_info = f" 📅 para {task['due']['date']}"
-        return f"✅ Tarefa adicionada: {task['content']}{due_info} (ID: {task['id']})"
+        _record_added_task(task)
+        return _format_added_task(task)
     else:
         return f"Erro ao adicionar tarefa: {response.status_code}"
 
@@ -190,73 +329,78 @@ def add_todoist_task(content: str, due_date: Optional[str] = None, priority: int
 def complete_todoist_task(task_id: str) -> str:
     """
     Marca uma tarefa como concluída no Todoist.
-    
+
     Args:
         task_id: ID da tarefa a ser completada
     """
-    response = requests.post(
-        f"{TODOIST_BASE_URL}/tasks/{task_id}/close",
-        headers=TODOIST_HEADERS
-    )
-    
+    if TODOIST_BATCH_WINDOW > 0:
+        try:
+            result = get_write_batcher().submit(item_close_command(task_id)).result()
+        except requests.RequestException as e:
+            return f"Erro ao completar tarefa: {e}"
+        if not result["ok"]:
+            return f"Erro ao completar tarefa: {result['error']}"
+        _record_completed_task(task_id)
+        return f"✅ Tarefa {task_id} marcada como concluída!"
+
+    try:
+        response = get_todoist_client().post(f"/tasks/{task_id}/close")
+    except requests.RequestException as e:
+        return f"Erro ao completar tarefa: {e}"
+
     if response.status_code == 204:
+        _record_completed_task(task_id)
         return f"✅ Tarefa {task_id} marcada como concluída!"
     else:
         return f"Erro ao completar tarefa: {response.status_code}"
 
 
+@tool
+def add_todoist_tasks(tasks: List[Dict[str, Any]]) -> str:
+    """
+    Adiciona várias tarefas ao Todoist de uma só vez (uma única requisição).
+
+    Args:
+        tasks: Lista de tarefas. Cada item é um objeto com:
+               - "content": descrição da tarefa (obrigatório)
+               - "due_date": data opcional (mesmos formatos de add_todoist_task)
+               - "priority": prioridade opcional de 1 a 4
+    """
+    if not tasks:
+        return "Nenhuma tarefa informada"
+
+    entries = _bulk_add_entries(tasks)
+    commands = _bulk_add_commands(entries)
+    results = execute_commands(commands) if commands else []
+    return _bulk_add_report(entries, results)
+
+
+@tool
+def complete_todoist_tasks(task_ids: List[str]) -> str:
+    """
+    Marca várias tarefas como concluídas no Todoist de uma só vez (uma única requisição).
+
+    Args:
+        task_ids: Lista de IDs das tarefas a serem completadas
+    """
+    if not task_ids:
+        return "Nenhuma tarefa informada"
+
+    commands = [item_close_command(task_id) for task_id in task_ids]
+    return _bulk_complete_report(execute_commands(commands))
+
+
 @tool
 def list_completed_tasks(limit: int = 20) -> str:
     """
     Lista tarefas concluídas recentemente no Todoist.
-    
+
     Args:
         limit: Número máximo de tarefas concluídas a retornar (padrão: 20)
     """
-    sync_url = "https://api.todoist.com/sync/v9/completed/get_all"
-    
-    params = {
-        "limit": limit
-    }
-    
-    response = requests.get(
-        sync_url,
-        headers=TODOIST_HEADERS,
-        params=params
-    )
-    
-    if response.status_code == 200:
-        data = response.json()
-        completed_items = data.get('items', [])
-        
-        if not completed_items:
-            return "Nenhuma tarefa concluída encontrada"
-        
-        result = "✅ Tarefas concluídas recentemente:\n"
-        
-        for task in completed_items:
-            completed_date_str = task.get('completed_at', '')
-            completed_info = ""
-            
-            if completed_date_str:
-                try:
-                    completed_datetime = datetime.strptime(completed_date_str, '%Y-%m-%dT%H:%M:%S')
-                    completed_date = completed_datetime.date()
-                    today = datetime.now().date()
-                    
-                    if completed_date == today:
-                        completed_info = f" [Concluída HOJE às {completed_datetime.strftime('%H:%M')}]"
-                    elif completed_date == today - timedelta(days=1):
-                        completed_info = f" [Concluída ONTEM às {completed_datetime.strftime('%H:%M')}]"
-                    else:
-                        completed_info = f" [Concluída em {completed_date.strftime('%d/%m às %H:%M')}]"
-                except:
-                    completed_info = f" [Concluída em {completed_date_str}]"
-            
-            status_emoji = "✅"
-            
-            result += f"{status_emoji} {task.get('content', 'Sem título')}{completed_info}\n"
-        
-        return result
-    else:
-        return f"Erro ao listar tarefas concluídas: {response.status_code}"
\ No newline at end of file
+    try:
+        items = read_flights.do(f"completed|{limit}", _fetch_completed_tasks, limit)
+    except READ_ERRORS as e:
+        return f"Erro ao listar tarefas concluídas: {e}"
+
+    return _format_completed_tasks(items)
@@ -0,0 +1,231 @@
+"""Versões assíncronas das ferramentas do Todoist"""
+
+import asyncio
+import httpx
+import requests
+from typing import Optional, Dict, Any, List
+from agno.tools import tool
+from src.config import TODOIST_MIRROR_ENABLED, TODOIST_BATCH_WINDOW
+from src.utils.async_client import get_async_todoist_client
+from src.utils.task_mirror import get_task_mirror, TodoistAPIError
+from src.utils.streaming import aiter_json_array, apaginate
+from src.utils.batching import (
+    item_add_command,
+    item_close_command,
+    task_from_command,
+    async_execute_commands,
+    get_write_batcher,
+)
+from src.tools.todoist import (
+    COMPLETED_TASKS_URL,
+    STREAM_CHUNK_SIZE,
+    task_list_cache,
+    read_flights,
+    READ_ERRORS,
+    _task_list_cache_key,
+    _build_list_params,
+    _format_task_list,
+    _build_task_data,
+    _format_added_task,
+    _format_completed_tasks,
+    _record_added_task,
+    _record_completed_task,
+    _bulk_add_entries,
+    _bulk_add_commands,
+    _bulk_add_report,
+    _bulk_complete_report,
+)
+
+
+async def _afetch_task_page(filter: Optional[str], limit: int, offset: int):
+    """Versão assíncrona de _fetch_task_page (lê a resposta em streaming)."""
+    if TODOIST_MIRROR_ENABLED:
+        mirror = get_task_mirror()
+        await mirror.async_ensure_fresh()
+        # SQLite sob a trava do espelho: fora do event loop
+        tasks = await asyncio.to_thread(mirror.list_tasks, filter, limit=limit + 1, offset=offset)
+        return tasks[:limit], len(tasks) > limit
+
+    params = _build_list_params(filter)
+    response = await get_async_todoist_client().get("/tasks", params=params, stream=True)
+    try:
+        if response.status_code != 200:
+            raise TodoistAPIError(response.status_code)
+        tasks = aiter_json_array(response.aiter_bytes(STREAM_CHUNK_SIZE))
+        return await apaginate(tasks, offset, limit)
+    finally:
+        await response.aclose()
+
+
+async def _aload_task_page(cache_key: str, filter: Optional[str], limit: int, offset: int):
+    """Versão assíncrona de _load_task_page."""
+    page = task_list_cache.get(cache_key)
+    if page is None:
+        generation = task_list_cache.generation
+        page = await _afetch_task_page(filter, limit, offset)
+        task_list_cache.set(cache_key, page, generation)
+    return page
+
+
+async def _afetch_completed_tasks(limit: int) -> List[Dict[str, Any]]:
+    """Versão assíncrona de _fetch_completed_tasks."""
+    params = {
+        "limit": limit
+    }
+    response = await get_async_todoist_client().get(COMPLETED_TASKS_URL, params=params)
+    if response.status_code != 200:
+        raise TodoistAPIError(response.status_code)
+    return response.json().get('items', [])
+
+
+@tool(name="list_todoist_tasks")
+async def alist_todoist_tasks(filter: Optional[str] = None, limit: int = 20, offset: int = 0) -> str:
+    """
+    Lista tarefas do Todoist com filtros opcionais, em páginas.
+
+    Args:
+        filter: Filtro opcional para as tarefas. Pode ser:
+               - "hoje" ou "today": tarefas de hoje
+               - "amanhã" ou "tomorrow": tarefas de amanhã
+               - "semana" ou "week": tarefas desta semana
+               - "vencidas" ou "overdue": tarefas vencidas
+               - None: todas as tarefas
+        limit: Número máximo de tarefas por página (padrão: 20)
+        offset: Posição inicial da página (use o valor indicado no fim da listagem)
+    """
+    limit = max(1, limit)
+    offset = max(0, offset)
+
+    cache_key = _task_list_cache_key(filter, limit, offset)
+    page = task_list_cache.get(cache_key)
+    if page is None:
+        try:
+            page = await read_flights.ado(cache_key, _aload_task_page, cache_key, filter, limit, offset)
+        except READ_ERRORS + (ValueError,) as e:
+            return f"Erro ao listar tarefas: {e}"
+
+    tasks, has_more = page
+    return _format_task_list(tasks, filter, offset, has_more)
+
+
+@tool(name="add_todoist_task")
+async def aadd_todoist_task(content: str, due_date: Optional[str] = None, priority: int = 1) -> str:
+    """
+    Adiciona uma nova tarefa ao Todoist com data opcional.
+
+    Args:
+        content: Descrição da tarefa a ser adicionada
+        due_date: Data de vencimento opcional. Pode ser:
+                 - "hoje" ou "today": para hoje
+                 - "amanhã" ou "tomorrow": para amanhã
+                 - Uma data no formato "YYYY-MM-DD"
+                 - "próxima segunda", "next monday", etc.
+        priority: Prioridade da tarefa (1-4, onde 4 é urgente)
+    """
+    data = _build_task_data(content, due_date, priority)
+
+    if TODOIST_BATCH_WINDOW > 0:
+        command = item_add_command(data)
+        try:
+            result = await asyncio.wrap_future(get_write_batcher().submit(command))
+        except requests.RequestException as e:
+            return f"Erro ao adicionar tarefa: {e}"
+        if not result["ok"]:
+            return f"Erro ao adicionar tarefa: {result['error']}"
+        task = task_from_command(command, result)
+        await asyncio.to_thread(_record_added_task, task)
+        return _format_added_task(task)
+
+    try:
+        response = await get_async_todoist_client().post("/tasks", json=data)
+    except httpx.HTTPError as e:
+        return f"Erro ao adicionar tarefa: {e}"
+
+    if response.status_code == 200:
+        task = response.json()
+        await asyncio.to_thread(_record_added_task, task)
+        return _format_added_task(task)
+    else:
+        return f"Erro ao adicionar tarefa: {response.status_code}"
+
+
+@tool(name="complete_todoist_task")
+async def acomplete_todoist_task(task_id: str) -> str:
+    """
+    Marca uma tarefa como concluída no Todoist.
+
+    Args:
+        task_id: ID da tarefa a ser completada
+    """
+    if TODOIST_BATCH_WINDOW > 0:
+        try:
+            result = await asyncio.wrap_future(get_write_batcher().submit(item_close_command(task_id)))
+        except requests.RequestException as e:
+            return f"Erro ao completar tarefa: {e}"
+        if not result["ok"]:
+            return f"Erro ao completar tarefa: {result['error']}"
+        await asyncio.to_thread(_record_completed_task, task_id)
+        return f"✅ Tarefa {task_id} marcada como concluída!"
+
+    try:
+        response = await get_async_todoist_client().post(f"/tasks/{task_id}/close")
+    except httpx.HTTPError as e:
+        return f"Erro ao completar tarefa: {e}"
+
+    if response.status_code == 204:
+        await asyncio.to_thread(_record_completed_task, task_id)
+        return f"✅ Tarefa {task_id} marcada como concluída!"
+    else:
+        return f"Erro ao completar tarefa: {response.status_code}"
+
+
+@tool(name="add_todoist_tasks")
+async def aadd_todoist_tasks(tasks: List[Dict[str, Any]]) -> str:
+    """
+    Adiciona várias tarefas ao Todoist de uma só vez (uma única requisição).
+
+    Args:
+        tasks: Lista de tarefas. Cada item é um objeto com:
+               - "content": descrição da tarefa (obrigatório)
+               - "due_date": data opcional (mesmos formatos de add_todoist_task)
+               - "priority": prioridade opcional de 1 a 4
+    """
+    if not tasks:
+        return "Nenhuma tarefa informada"
+
+    entries = _bulk_add_entries(tasks)
+    commands = _bulk_add_commands(entries)
+    results = await async_execute_commands(commands) if commands else []
+    return await asyncio.to_thread(_bulk_add_report, entries, results)
+
+
+@tool(name="complete_todoist_tasks")
+async def acomplete_todoist_tasks(task_ids: List[str]) -> str:
+    """
+    Marca várias tarefas como concluídas no Todoist de uma só vez (uma única requisição).
+
+    Args:
+        task_ids: Lista de IDs das tarefas a serem completadas
+    """
+    if not task_ids:
+        return "Nenhuma tarefa informada"
+
+    commands = [item_close_command(task_id) for task_id in task_ids]
+    results = await async_execute_commands(commands)
+    return await asyncio.to_thread(_bulk_complete_report, results)
+
+
+@tool(name="list_completed_tasks")
+async def alist_completed_tasks(limit: int = 20) -> str:
+    """
+    Lista tarefas concluídas recentemente no Todoist.
+
+    Args:
+        limit: Número máximo de tarefas concluídas a retornar (padrão: 20)
+    """
+    try:
+        items = await read_flights.ado(f"completed|{limit}", _afetch_completed_tasks, limit)
+    except READ_ERRORS as e:
+        return f"Erro ao listar tarefas concluídas: {e}"
+
+    return _format_completed_tasks(items)
@@ -1,5 +1,39 @@
 """Utilitários compartilhados"""
 
-from .memory import MemoryManager
+from .memory import MemoryManager, JSONMemoryBackend, JournalMemoryBackend, SQLiteMemoryBackend
+from .rate_limit import RateLimiter, RateLimitTimeout, get_rate_limiter
+from .http_client import TodoistClient, get_todoist_client, get_pool_stats
+from .async_client import AsyncTodoistClient, get_async_todoist_client
+from .task_mirror import TaskMirror, TodoistAPIError, get_task_mirror
+from .cache import TTLCache
+from .embeddings import HashingEmbedder, VectorIndex
+from .batching import WriteBatcher, execute_commands, get_write_batcher
+from .response_cache import ResponseCache, get_response_cache
+from .singleflight import SingleFlight
 
-__all__ = ['MemoryManager']
\ No newline at end of file
+__all__ = [
+    'MemoryManager',
+    'JSONMemoryBackend',
+    'JournalMemoryBackend',
+    'SQLiteMemoryBackend',
+    'TodoistClient',
+    'get_todoist_client',
+    'get_pool_stats',
+    'AsyncTodoistClient',
+    'get_async_todoist_client',
+    'TaskMirror',
+    'TodoistAPIError',
+    'get_task_mirror',
+    'WriteBatcher',
+    'execute_commands',
+    'get_write_batcher',
+    'ResponseCache',
+    'get_response_cache',
+    'SingleFlight',
+    'TTLCache',
+    'HashingEmbedder',
+    'VectorIndex',
+    'RateLimiter',
+    'RateLimitTimeout',
+    'get_rate_limiter'
+]
\ No newline at end of file
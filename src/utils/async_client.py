@@ -0,0 +1,203 @@
+"""Cliente HTTP assíncrono compartilhado para a API do Todoist"""
+
+import asyncio
+import time
+import uuid
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.config import (
+    TODOIST_BASE_URL,
+    TODOIST_HEADERS,
+    TODOIST_CONNECT_TIMEOUT,
+    TODOIST_READ_TIMEOUT,
+    TODOIST_POOL_MAXSIZE,
+    TODOIST_MAX_RETRIES,
+    TODOIST_BACKOFF_FACTOR,
+    TODOIST_ASYNC_MAX_CONNECTIONS,
+    TODOIST_RATE_LIMIT_ENABLED,
+)
+from src.utils.rate_limit import (
+    RateLimiter,
+    RateLimitTimeout,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+    get_rate_limiter,
+    is_throttled,
+    retry_after_seconds,
+)
+
+
+class AsyncTodoistClient:
+    """Cliente assíncrono (httpx) com pool de conexões keep-alive e retry com backoff."""
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    MAX_BACKOFF = 30.0
+
+    def __init__(
+        self,
+        base_url: str = TODOIST_BASE_URL,
+        headers: Optional[Dict[str, str]] = None,
+        connect_timeout: float = TODOIST_CONNECT_TIMEOUT,
+        read_timeout: float = TODOIST_READ_TIMEOUT,
+        max_connections: int = TODOIST_ASYNC_MAX_CONNECTIONS,
+        max_keepalive: int = TODOIST_POOL_MAXSIZE,
+        max_retries: int = TODOIST_MAX_RETRIES,
+        backoff_factor: float = TODOIST_BACKOFF_FACTOR,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Inicializa o cliente.
+
+        Args:
+            base_url: URL base usada para caminhos relativos (ex: "/tasks")
+            headers: Headers padrão (por padrão, os de autenticação do Todoist)
+            connect_timeout: Timeout de conexão em segundos
+            read_timeout: Timeout de leitura em segundos
+            max_connections: Máximo de conexões simultâneas (requisições em voo)
+            max_keepalive: Máximo de conexões ociosas mantidas abertas
+            max_retries: Número máximo de novas tentativas em falhas transitórias
+            backoff_factor: Fator do backoff exponencial entre tentativas
+            rate_limiter: Limitador de taxa (padrão: o compartilhado, se habilitado)
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        if rate_limiter is None and TODOIST_RATE_LIMIT_ENABLED:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=TODOIST_HEADERS if headers is None else headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            ),
+        )
+
+        self._requests = 0
+        self._errors = 0
+        self._retries = 0
+        self._in_flight = 0
+        self._total_time = 0.0
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Calcula a espera antes da próxima tentativa, respeitando Retry-After."""
+        default = self.backoff_factor * (2 ** attempt)
+        if response is not None:
+            return min(retry_after_seconds(response.headers, default), self.MAX_BACKOFF)
+        return min(default, self.MAX_BACKOFF)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        priority: Optional[int] = None,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Executa uma requisição assíncrona usando o pool compartilhado.
+
+        Args:
+            method: Método HTTP
+            path: Caminho relativo à URL base ou URL absoluta
+            priority: PRIORITY_INTERACTIVE ou PRIORITY_BACKGROUND (padrão: GET é
+                      interativo, demais métodos são escritas em segundo plano)
+            stream: Não lê o corpo; o chamador consome aiter_bytes() e fecha com aclose()
+            **kwargs: Argumentos repassados para httpx.AsyncClient.build_request
+
+        Returns:
+            Resposta HTTP
+
+        Raises:
+            httpx.HTTPError: Em falhas de rede ou timeout após as tentativas
+        """
+        if priority is None:
+            priority = PRIORITY_INTERACTIVE if method.upper() == "GET" else PRIORITY_BACKGROUND
+        if method.upper() == "POST":
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.setdefault("X-Request-Id", str(uuid.uuid4()))
+            kwargs["headers"] = headers
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            attempt = 0
+            while True:
+                response = None
+                if self.rate_limiter is not None:
+                    try:
+                        await self.rate_limiter.acquire_async(priority)
+                    except RateLimitTimeout as e:
+                        self._errors += 1
+                        raise httpx.PoolTimeout(str(e)) from e
+                try:
+                    request = self.client.build_request(method, path, **kwargs)
+                    response = await self.client.send(request, stream=stream)
+                    if response.status_code not in self.RETRY_STATUS_CODES:
+                        return response
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        self._errors += 1
+                        raise
+
+                if attempt >= self.max_retries:
+                    return response
+
+                delay = self._retry_delay(attempt, response)
+                if response is not None:
+                    await response.aclose()
+                attempt += 1
+                self._retries += 1
+                if response is not None and is_throttled(response) and self.rate_limiter is not None:
+                    # Bloqueia o bucket para todos os workers; o acquire seguinte espera
+                    await self.rate_limiter.penalize_async(delay)
+                else:
+                    await asyncio.sleep(delay)
+        finally:
+            self._in_flight -= 1
+            self._requests += 1
+            self._total_time += time.perf_counter() - start
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        """Executa um GET."""
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        """Executa um POST."""
+        return await self.request("POST", path, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cliente assíncrono."""
+        avg_ms = (self._total_time / self._requests * 1000) if self._requests else 0.0
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "retries": self._retries,
+            "in_flight": self._in_flight,
+            "avg_latency_ms": round(avg_ms, 2),
+        }
+
+    async def aclose(self):
+        """Fecha todas as conexões do pool."""
+        await self.client.aclose()
+
+
+# Conexões httpx pertencem ao event loop onde foram abertas, então mantemos
+# um cliente por loop (normalmente só existe um por processo/worker).
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncTodoistClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_todoist_client() -> AsyncTodoistClient:
+    """Retorna o cliente assíncrono compartilhado do event loop atual."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncTodoistClient()
+        _clients[loop] = client
+    return client
@@ -0,0 +1,218 @@
+"""Agrupamento de escritas no Todoist em requisições únicas de commands da Sync API"""
+
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from src.config import TODOIST_SYNC_URL, TODOIST_BATCH_WINDOW
+from src.utils.http_client import TodoistClient, get_todoist_client
+from src.utils.async_client import AsyncTodoistClient, get_async_todoist_client
+
+
+SYNC_ENDPOINT = f"{TODOIST_SYNC_URL}/sync"
+
+# Limite de commands aceitos pela Sync API em uma única requisição
+MAX_COMMANDS_PER_REQUEST = 100
+
+
+def item_add_command(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cria um command item_add a partir do corpo usado na REST API.
+
+    Args:
+        data: Dicionário com content, priority e due_date opcional
+    """
+    args = {"content": data["content"], "priority": data.get("priority", 1)}
+    if data.get("due_date"):
+        args["due"] = {"date": data["due_date"]}
+    return {
+        "type": "item_add",
+        "temp_id": str(uuid.uuid4()),
+        "uuid": str(uuid.uuid4()),
+        "args": args,
+    }
+
+
+def item_close_command(task_id: str) -> Dict[str, Any]:
+    """Cria um command item_close para concluir uma tarefa."""
+    return {
+        "type": "item_close",
+        "uuid": str(uuid.uuid4()),
+        "args": {"id": str(task_id)},
+    }
+
+
+def task_from_command(command: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstrói a tarefa (formato da REST API) criada por um item_add bem-sucedido."""
+    args = command["args"]
+    return {
+        "id": result["id"],
+        "content": args["content"],
+        "priority": args.get("priority", 1),
+        "due": args.get("due"),
+    }
+
+
+def _failed_results(commands: List[Dict[str, Any]], error: str) -> List[Dict[str, Any]]:
+    """Um resultado de falha por command (com o ID da tarefa, quando já conhecido)."""
+    return [{"ok": False, "id": command["args"].get("id"), "error": error} for command in commands]
+
+
+def _parse_results(commands: List[Dict[str, Any]], status_code: int, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Converte a resposta da Sync API em um resultado por command (na mesma ordem)."""
+    if status_code != 200:
+        return _failed_results(commands, str(status_code))
+
+    sync_status = data.get("sync_status", {})
+    mapping = data.get("temp_id_mapping", {})
+    results = []
+    for command in commands:
+        status = sync_status.get(command["uuid"])
+        if command["type"] == "item_add":
+            task_id = mapping.get(command["temp_id"])
+        else:
+            task_id = command["args"]["id"]
+
+        if status == "ok":
+            results.append({"ok": True, "id": task_id, "error": None})
+        else:
+            error = status.get("error") if isinstance(status, dict) else "sem resposta"
+            results.append({"ok": False, "id": task_id, "error": error})
+    return results
+
+
+def _chunks(commands: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    return [commands[i:i + MAX_COMMANDS_PER_REQUEST] for i in range(0, len(commands), MAX_COMMANDS_PER_REQUEST)]
+
+
+def execute_commands(commands: List[Dict[str, Any]], client: Optional[TodoistClient] = None) -> List[Dict[str, Any]]:
+    """
+    Envia commands à Sync API em lotes de até 100 por requisição.
+
+    Uma falha de rede interrompe o envio: os lotes já respondidos mantêm seus
+    resultados e os commands restantes (a partir do lote que falhou) são
+    marcados com o erro.
+
+    Args:
+        commands: Lista de commands (item_add, item_close, ...)
+        client: Cliente HTTP (padrão: cliente compartilhado)
+
+    Returns:
+        Lista de resultados {"ok", "id", "error"} na ordem dos commands
+    """
+    client = client or get_todoist_client()
+    results = []
+    for chunk in _chunks(commands):
+        try:
+            response = client.post(SYNC_ENDPOINT, json={"commands": chunk})
+            data = response.json() if response.status_code == 200 else {}
+        except (requests.RequestException, ValueError) as e:
+            results.extend(_failed_results(commands[len(results):], str(e)))
+            break
+        results.extend(_parse_results(chunk, response.status_code, data))
+    return results
+
+
+async def async_execute_commands(
+    commands: List[Dict[str, Any]],
+    client: Optional[AsyncTodoistClient] = None,
+) -> List[Dict[str, Any]]:
+    """Versão assíncrona de execute_commands()."""
+    client = client or get_async_todoist_client()
+    results = []
+    for chunk in _chunks(commands):
+        try:
+            response = await client.post(SYNC_ENDPOINT, json={"commands": chunk})
+            data = response.json() if response.status_code == 200 else {}
+        except (httpx.HTTPError, ValueError) as e:
+            results.extend(_failed_results(commands[len(results):], str(e)))
+            break
+        results.extend(_parse_results(chunk, response.status_code, data))
+    return results
+
+
+class WriteBatcher:
+    """Agrupa escritas feitas dentro de uma janela curta em uma única requisição."""
+
+    def __init__(
+        self,
+        window: float = TODOIST_BATCH_WINDOW,
+        max_batch: int = MAX_COMMANDS_PER_REQUEST,
+        client: Optional[TodoistClient] = None,
+    ):
+        """
+        Inicializa o agrupador.
+
+        Args:
+            window: Segundos que o primeiro command espera por outros antes do envio
+            max_batch: Envia imediatamente ao atingir esse número de commands
+            client: Cliente HTTP (padrão: cliente compartilhado)
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self._client = client
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Dict[str, Any], Future]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, command: Dict[str, Any]) -> Future:
+        """
+        Enfileira um command para o próximo envio.
+
+        Returns:
+            Future resolvido com o resultado {"ok", "id", "error"} do command
+        """
+        future: Future = Future()
+        flush_now = False
+        with self._lock:
+            self._pending.append((command, future))
+            if len(self._pending) >= self.max_batch:
+                flush_now = True
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush()
+        return future
+
+    def flush(self):
+        """Envia imediatamente todos os commands pendentes."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        commands = [command for command, _ in pending]
+        try:
+            results = execute_commands(commands, self._client)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+
+
+_batcher: Optional[WriteBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_write_batcher() -> WriteBatcher:
+    """Retorna o agrupador de escritas compartilhado do processo."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = WriteBatcher()
+    return _batcher
@@ -0,0 +1,79 @@
+"""Cache em memória com TTL e limite LRU"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Cache LRU limitado em que cada entrada expira após um TTL."""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        """
+        Inicializa o cache.
+
+        Args:
+            maxsize: Número máximo de entradas (as menos usadas são descartadas)
+            ttl: Segundos de validade de cada entrada (0 desativa o cache)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Avança a cada clear(): valores buscados antes de uma limpeza não são gravados
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Armazena um valor, descartando a entrada menos usada se necessário.
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            generation: Valor de `generation` lido antes de calcular o valor; se
+                houve clear() desde então, o valor (possivelmente velho) é descartado
+        """
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Remove uma entrada específica."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove todas as entradas."""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos, falhas e tamanho atual."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
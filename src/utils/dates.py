@@ -0,0 +1,206 @@
+"""Resolução de datas e filtros em linguagem natural (português e inglês)"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+class DateFilter(NamedTuple):
+    """Filtro de listagem resolvido."""
+
+    query: str                  # filtro na sintaxe do Todoist (ex: "due today")
+    start: Optional[date]       # primeira data incluída (None = sem limite inferior)
+    end: Optional[date]         # data limite exclusiva (None = sem limite superior)
+    overdue: bool = False       # tarefas vencidas (inclui horários já passados hoje)
+
+
+# Expressões de filtro exatas -> (dias até o início, dias até o fim exclusivo)
+_FILTER_TABLE = {
+    "hoje": (0, 1), "today": (0, 1),
+    "amanhã": (1, 2), "amanha": (1, 2), "tomorrow": (1, 2),
+    "semana": (None, 7), "week": (None, 7), "esta semana": (None, 7), "this week": (None, 7),
+}
+_OVERDUE = frozenset({"vencidas", "overdue", "atrasadas"})
+_FILTER_QUERIES = {(0, 1): "due today", (1, 2): "due tomorrow"}
+
+# Datas relativas exatas -> deslocamento em dias
+_DAY_OFFSETS = {
+    "hoje": 0, "today": 0,
+    "amanhã": 1, "amanha": 1, "tomorrow": 1,
+    "depois de amanhã": 2, "depois de amanha": 2, "day after tomorrow": 2,
+}
+
+_WEEKDAYS = {
+    "segunda": 0, "segunda-feira": 0, "monday": 0,
+    "terça": 1, "terca": 1, "terça-feira": 1, "terca-feira": 1, "tuesday": 1,
+    "quarta": 2, "quarta-feira": 2, "wednesday": 2,
+    "quinta": 3, "quinta-feira": 3, "thursday": 3,
+    "sexta": 4, "sexta-feira": 4, "friday": 4,
+    "sábado": 5, "sabado": 5, "saturday": 5,
+    "domingo": 6, "sunday": 6,
+}
+
+_SPACES_RE = re.compile(r"\s+")
+_NEXT_DAYS_RE = re.compile(r"(?:pr[oó]xim[oa]s?|next)\D*(\d+)")
+_IN_DAYS_RE = re.compile(r"^(?:em|in)\s+(\d+)\s+(?:dias?|days?)$")
+_WEEKDAY_RE = re.compile(
+    r"^(?:(?:na\s+|nesta\s+)?pr[oó]xim[oa]\s+|next\s+|on\s+)?("
+    + "|".join(sorted((re.escape(name) for name in _WEEKDAYS), key=len, reverse=True))
+    + r")$"
+)
+_ISO_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+_DMY_RE = re.compile(r"^(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2}|\d{4}))?$")
+
+
+@lru_cache(maxsize=1024)
+def _normalize(expression: str) -> str:
+    return _SPACES_RE.sub(" ", expression.strip().lower())
+
+
+def _add_days(today: date, days) -> Optional[date]:
+    """Soma dias a uma data; None se o número for grande demais ("em 99999999 dias")."""
+    try:
+        return today + timedelta(days=int(days))
+    except (OverflowError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _resolve_filter(expression: str, today: date) -> Optional[DateFilter]:
+    if expression in _OVERDUE:
+        return DateFilter("overdue", None, today, overdue=True)
+
+    offsets = _FILTER_TABLE.get(expression)
+    if offsets is None:
+        match = _NEXT_DAYS_RE.search(expression)
+        if not match:
+            return None
+        offsets = (None, match.group(1))
+
+    start_days, end_days = offsets
+    start = today + timedelta(days=start_days) if start_days is not None else None
+    end = _add_days(today, end_days)
+    if end is None:
+        return None
+    query = _FILTER_QUERIES.get(offsets) or f"due before: {end.isoformat()}"
+    return DateFilter(query, start, end)
+
+
+def resolve_filter(expression: Optional[str], today: Optional[date] = None) -> Optional[DateFilter]:
+    """
+    Resolve um filtro de listagem ("hoje", "semana", "vencidas", "próximos 3"...).
+
+    Args:
+        expression: Filtro em linguagem natural
+        today: Data de referência (padrão: hoje)
+
+    Returns:
+        DateFilter ou None se a expressão não for reconhecida
+    """
+    if not expression:
+        return None
+    return _resolve_filter(_normalize(expression), today or date.today())
+
+
+def to_local_datetime(value: str) -> datetime:
+    """
+    Converte um datetime ISO para horário local ingênuo.
+
+    Horários com fuso (ex: "2026-01-10T02:00:00Z", de tarefas com fuso fixo) são
+    convertidos; sem fuso (horário "flutuante" do Todoist) já são locais.
+
+    Raises:
+        ValueError: Se o texto não for um datetime ISO
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _build_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _resolve_due_date(expression: str, today: date) -> Optional[date]:
+    offset = _DAY_OFFSETS.get(expression)
+    if offset is not None:
+        return today + timedelta(days=offset)
+
+    match = _WEEKDAY_RE.match(expression)
+    if match:
+        days_ahead = _WEEKDAYS[match.group(1)] - today.weekday()
+        if days_ahead <= 0:
+            days_ahead += 7
+        return today + timedelta(days=days_ahead)
+
+    match = _IN_DAYS_RE.match(expression)
+    if match:
+        return _add_days(today, match.group(1))
+
+    match = _ISO_RE.match(expression)
+    if match:
+        return _build_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = _DMY_RE.match(expression)
+    if match:
+        day, month, year = match.groups()
+        if year is None:
+            year = today.year
+        elif len(year) == 2:
+            year = 2000 + int(year)
+        return _build_date(int(year), int(month), int(day))
+
+    return None
+
+
+def resolve_due_date(expression: Optional[str], today: Optional[date] = None) -> Optional[str]:
+    """
+    Converte uma data em linguagem natural para o formato YYYY-MM-DD.
+
+    Aceita "hoje", "amanhã", "próxima segunda", "next friday", "em 3 dias",
+    "YYYY-MM-DD", "DD/MM/YYYY", "DD-MM-YYYY", "DD/MM" e "DD-MM".
+
+    Args:
+        expression: Data em linguagem natural
+        today: Data de referência (padrão: hoje)
+
+    Returns:
+        Data no formato YYYY-MM-DD ou None se não for reconhecida
+    """
+    if not expression:
+        return None
+    resolved = _resolve_due_date(_normalize(expression), today or date.today())
+    return resolved.isoformat() if resolved else None
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m src.utils.dates
+    import timeit
+
+    expressions = [
+        "hoje", "Today", "amanhã", "semana", "this week", "vencidas", "overdue",
+        "próximos 3 dias", "next 10 days", "próxima segunda", "next friday",
+        "sexta-feira", "em 5 dias", "2025-12-31", "31/12/2025", "31-12", "15/08",
+        "qualquer coisa",
+    ]
+    rounds = 10_000
+    total = rounds * len(expressions)
+    today = date.today()
+    normalized = [_normalize(expression) for expression in expressions]
+
+    for name, public, cached in (
+        ("resolve_filter", resolve_filter, _resolve_filter),
+        ("resolve_due_date", resolve_due_date, _resolve_due_date),
+    ):
+        elapsed = timeit.timeit(lambda: [public(e) for e in expressions], number=rounds)
+        print(f"{name}: {total / elapsed:,.0f} expressões/s (chamada pública)")
+        elapsed = timeit.timeit(lambda: [cached(e, today) for e in normalized], number=rounds)
+        print(f"{name}: {total / elapsed:,.0f} expressões/s (memoizado)")
+        elapsed = timeit.timeit(lambda: [cached.__wrapped__(e, today) for e in normalized], number=rounds)
+        print(f"{name}: {total / elapsed:,.0f} expressões/s (sem cache)")
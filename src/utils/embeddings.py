@@ -0,0 +1,143 @@
+"""Embeddings locais e índice vetorial para busca semântica nas memórias"""
+
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _strip_accents(word: str) -> str:
+    """Remove acentos ("prioritário" -> "prioritario")."""
+    if word.isascii():
+        return word
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Palavras do texto em minúsculas e sem acentos ("Reunião às 10h" -> ["reuniao", "as", "10h"])."""
+    return [_strip_accents(word) for word in _TOKEN_RE.findall(text.lower())]
+
+
+@lru_cache(maxsize=65536)
+def _word_slots(word: str, dim: int) -> Tuple[int, ...]:
+    """Posições (com sinal) da palavra e de seus trigramas no vetor."""
+    word = _strip_accents(word)
+    padded = f"#{word}#"
+    features = [word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+    slots = []
+    for feature in features:
+        # crc32 é estável entre processos (hash() de str não é)
+        digest = zlib.crc32(feature.encode("utf-8"))
+        column = digest % dim + 1
+        slots.append(column if digest & 0x80000000 else -column)
+    return tuple(slots)
+
+
+class HashingEmbedder:
+    """
+    Embedder determinístico e local (hashing trick de palavras e trigramas).
+
+    Não entende sinônimos, mas aproxima chaves e valores com palavras em comum
+    ou grafias parecidas. Qualquer objeto com `dim` e `embed(texts)` pode
+    substituí-lo (ex: um modelo de embeddings).
+    """
+
+    def __init__(self, dim: int = 256):
+        """
+        Inicializa o embedder.
+
+        Args:
+            dim: Dimensão dos vetores gerados
+        """
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Gera os vetores (normalizados) de uma lista de textos.
+
+        Returns:
+            Matriz float32 de formato (len(texts), dim)
+        """
+        rows = []
+        slots = []
+        for row, text in enumerate(texts):
+            for word in _TOKEN_RE.findall(text.lower()):
+                word_slots = _word_slots(word, self.dim)
+                slots.extend(word_slots)
+                rows.extend([row] * len(word_slots))
+
+        slots = np.array(slots, dtype=np.int64)
+        columns = np.abs(slots) - 1
+        # Posição codificada como ±(coluna + 1): o sinal reduz o efeito das colisões
+        signs = np.sign(slots).astype(np.float32)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(vectors, (np.array(rows, dtype=np.intp), columns), signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class VectorIndex:
+    """Matriz float32 de vetores normalizados, com inserção incremental por chave."""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self.keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, vector: np.ndarray):
+        """Insere ou substitui o vetor de uma chave (O(1) amortizado)."""
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self._matrix):
+                # Dobra a capacidade: inserções seguidas não copiam a matriz toda vez
+                grown = np.zeros((2 * len(self._matrix), self.dim), dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self.keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vector
+
+    def remove(self, key: str):
+        """Remove o vetor de uma chave, movendo o último para a linha liberada."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self._matrix[row] = self._matrix[last]
+            self.keys[row] = moved
+            self._rows[moved] = row
+        self.keys.pop()
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Retorna as k chaves mais próximas por similaridade de cosseno.
+
+        Args:
+            query: Vetor normalizado da consulta
+            k: Número máximo de resultados
+        """
+        count = len(self.keys)
+        if count == 0 or k <= 0:
+            return []
+        scores = self._matrix[:count] @ query
+        if k < count:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[row], float(scores[row])) for row in top]
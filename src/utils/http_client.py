@@ -0,0 +1,240 @@
+"""Cliente HTTP compartilhado para a API do Todoist"""
+
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import (
+    TODOIST_BASE_URL,
+    TODOIST_HEADERS,
+    TODOIST_CONNECT_TIMEOUT,
+    TODOIST_READ_TIMEOUT,
+    TODOIST_POOL_CONNECTIONS,
+    TODOIST_POOL_MAXSIZE,
+    TODOIST_MAX_RETRIES,
+    TODOIST_BACKOFF_FACTOR,
+    TODOIST_RATE_LIMIT_ENABLED,
+)
+from src.utils.rate_limit import (
+    RateLimiter,
+    RateLimitTimeout,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+    get_rate_limiter,
+    is_throttled,
+    retry_after_seconds,
+)
+
+
+class _Retry(Retry):
+    """Retry do urllib3 que deixa o 503 com Retry-After para o limitador (_send)."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 503 and has_retry_after:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class TodoistClient:
+    """Cliente HTTP com pool de conexões keep-alive, timeouts e retry para o Todoist."""
+
+    # 429 e 503 com Retry-After são tratados em _send() para passar pelo limitador;
+    # os demais 503 seguem o Retry do urllib3 como as outras falhas transitórias
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+    def __init__(
+        self,
+        base_url: str = TODOIST_BASE_URL,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Tuple[float, float] = (TODOIST_CONNECT_TIMEOUT, TODOIST_READ_TIMEOUT),
+        pool_connections: int = TODOIST_POOL_CONNECTIONS,
+        pool_maxsize: int = TODOIST_POOL_MAXSIZE,
+        max_retries: int = TODOIST_MAX_RETRIES,
+        backoff_factor: float = TODOIST_BACKOFF_FACTOR,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Inicializa o cliente.
+
+        Args:
+            base_url: URL base usada para caminhos relativos (ex: "/tasks")
+            headers: Headers padrão (por padrão, os de autenticação do Todoist)
+            timeout: Tupla (conexão, leitura) em segundos aplicada a toda requisição
+            pool_connections: Número de hosts com pool de conexões mantido
+            pool_maxsize: Máximo de conexões simultâneas por host
+            max_retries: Número máximo de novas tentativas em falhas transitórias
+            backoff_factor: Fator do backoff exponencial entre tentativas
+            rate_limiter: Limitador de taxa (padrão: o compartilhado, se habilitado)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        if rate_limiter is None and TODOIST_RATE_LIMIT_ENABLED:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+
+        retry = _Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            # POSTs são seguros para repetir pois enviamos X-Request-Id (idempotência)
+            allowed_methods=frozenset({"GET", "POST", "DELETE"}),
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(TODOIST_HEADERS if headers is None else headers)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._throttled = 0
+        self._total_time = 0.0
+
+    def _url(self, path: str) -> str:
+        """Resolve caminhos relativos contra a URL base."""
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _send(self, method: str, url: str, priority: int, **kwargs) -> requests.Response:
+        """Envia passando pelo limitador e repete em 429 (ou 503 com Retry-After) respeitando o header."""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire(priority)
+                except RateLimitTimeout as e:
+                    raise requests.exceptions.RetryError(str(e)) from e
+
+            response = self.session.request(method, url, **kwargs)
+            if not is_throttled(response) or attempt >= self.max_retries:
+                return response
+
+            with self._lock:
+                self._throttled += 1
+            delay = retry_after_seconds(response.headers, self.backoff_factor * (2 ** attempt))
+            response.close()
+            if self.rate_limiter is not None:
+                self.rate_limiter.penalize(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def request(self, method: str, path: str, priority: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Executa uma requisição usando o pool de conexões compartilhado.
+
+        Args:
+            method: Método HTTP
+            path: Caminho relativo à URL base ou URL absoluta
+            priority: PRIORITY_INTERACTIVE ou PRIORITY_BACKGROUND (padrão: GET é
+                      interativo, demais métodos são escritas em segundo plano)
+            **kwargs: Argumentos repassados para requests.Session.request
+
+        Returns:
+            Resposta HTTP
+
+        Raises:
+            requests.RequestException: Em falhas de rede ou timeout após as tentativas
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if priority is None:
+            priority = PRIORITY_INTERACTIVE if method.upper() == "GET" else PRIORITY_BACKGROUND
+        if method.upper() == "POST":
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.setdefault("X-Request-Id", str(uuid.uuid4()))
+            kwargs["headers"] = headers
+
+        start = time.perf_counter()
+        try:
+            return self._send(method, self._url(path), priority, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._requests += 1
+                self._total_time += elapsed
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """Executa um GET."""
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        """Executa um POST."""
+        return self.request("POST", path, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cliente e do pool de conexões.
+
+        Returns:
+            Dicionário com contadores de requisições e o estado de cada pool por host
+        """
+        pools = {}
+        manager = self._adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            # A fila do urllib3 guarda None nos slots ainda não usados
+            queue = list(pool.pool.queue) if pool.pool is not None else []
+            idle = sum(1 for conn in queue if conn is not None)
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": idle,
+                "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+            }
+
+        with self._lock:
+            requests_count = self._requests
+            avg_ms = (self._total_time / requests_count * 1000) if requests_count else 0.0
+            return {
+                "requests": requests_count,
+                "errors": self._errors,
+                "throttled": self._throttled,
+                "avg_latency_ms": round(avg_ms, 2),
+                "pools": pools,
+            }
+
+    def close(self):
+        """Fecha todas as conexões do pool."""
+        self.session.close()
+
+
+_client: Optional[TodoistClient] = None
+_client_lock = threading.Lock()
+
+
+def get_todoist_client() -> TodoistClient:
+    """Retorna o cliente Todoist compartilhado do processo (criado sob demanda)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TodoistClient()
+    return _client
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Retorna as estatísticas do pool de conexões do cliente compartilhado."""
+    return get_todoist_client().stats()
@@ -1,51 +1,1010 @@
 """Gerenciador de memória para assistentes"""
 
+import atexit
+import hashlib
+import heapq
 import json
 import os
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: sem travas entre processos
+    fcntl = None
+
+from src.config import (
+    MEMORY_BACKEND,
+    MEMORY_EMBEDDING_DIM,
+    MEMORY_MAX_PER_USER,
+    MEMORY_DEFAULT_TTL,
+    MEMORY_EVICTION_POLICY,
+    MEMORY_CACHE_USERS,
+    MEMORY_DURABILITY,
+    MEMORY_FLUSH_INTERVAL,
+    MEMORY_FLUSH_COUNT,
+    MEMORY_FLUSH_MAX_BACKOFF,
+    MEMORY_SYNC_INTERVAL,
+    MEMORY_JOURNAL_FSYNC_INTERVAL,
+    MEMORY_JOURNAL_COMPACT_INTERVAL,
+    MEMORY_JOURNAL_COMPACT_ENTRIES,
+)
+from src.utils.embeddings import HashingEmbedder, VectorIndex
+
+
+# user_ids usados diretamente no nome dos arquivos: sem separadores de caminho,
+# sem começar por "." (nem "." / "..") e sem o prefixo "~" dos nomes com hash
+_SAFE_USER_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.@-]{0,127}")
+
+
+class JSONMemoryBackend:
+    """Um arquivo JSON por usuário (formato original, reescrito a cada alteração)."""
+
+    # Arquivos que indicam memórias de um usuário (usados na exportação)
+    _USER_FILE_SUFFIXES = ("_memory.json",)
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        # Versão (stat dos arquivos) de cada usuário na última leitura ou escrita
+        # deste processo; diferente da atual = outro processo alterou o usuário
+        self._seen: Dict[str, Any] = {}
+        self._stale = set()
+
+    @staticmethod
+    def _file_stem(user_id: str) -> str:
+        """
+        Nome de arquivo do usuário: o próprio user_id se for seguro, senão
+        "~" + sha256 (o user_id vem do cliente e não pode escolher o caminho).
+        """
+        if _SAFE_USER_ID.fullmatch(user_id):
+            return user_id
+        return "~" + hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+
+    # Caminhos como str: pathlib internaliza cada componente (sys.intern), o que
+    # faria a memória crescer com o número de usuários
+    def _get_memory_file(self, user_id: str) -> str:
+        # Subdiretórios por prefixo do hash: nenhum diretório acumula dezenas
+        # de milhares de arquivos
+        shard = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.storage_path, shard, f"{self._file_stem(user_id)}_memory.json")
+
+    def _get_legacy_file(self, user_id: str) -> Optional[str]:
+        """Arquivo do formato anterior aos shards (só existe para user_ids seguros)."""
+        if not _SAFE_USER_ID.fullmatch(user_id):
+            return None
+        return os.path.join(self.storage_path, f"{user_id}_memory.json")
+
+    @staticmethod
+    def _remove(path: Optional[str]):
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        # os.replace troca o inode: o snapshot reescrito muda de versão mesmo
+        # com mtime e tamanho iguais
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _version(self, user_id: str) -> Any:
+        return self._stat(self._get_memory_file(user_id))
+
+    @contextmanager
+    def _user_lock(self, user_id: str, shared: bool = False):
+        """
+        Trava consultiva (flock) do usuário, compartilhada entre processos.
+
+        Só as escritas criam o shard e o arquivo de trava: uma leitura de um
+        usuário sem trava (nunca gravado neste formato) não trava nem cria nada.
+        """
+        base = self._get_memory_file(user_id)[:-len(".json")]
+        lock_file = base + ".lock"
+        if shared:
+            try:
+                fd = os.open(lock_file, os.O_RDONLY)
+            except FileNotFoundError:
+                fd = None
+        else:
+            os.makedirs(os.path.dirname(lock_file), exist_ok=True)
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        if fd is None:
+            yield
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            if not shared and os.path.basename(base).startswith("~") and not os.path.exists(base + ".id"):
+                # Nome com hash: guarda o user_id para iter_users (exportação)
+                with open(base + ".id", "w", encoding="utf-8") as f:
+                    f.write(user_id)
+            yield
+        finally:
+            # Fechar o descritor libera a trava
+            os.close(fd)
+
+    def load(self, user_id: str) -> Dict[str, Any]:
+        """Carrega as memórias de um usuário."""
+        with self._user_lock(user_id, shared=True):
+            version = self._version(user_id)
+            memories = self._read(user_id)
+        self._seen[user_id] = version
+        self._stale.discard(user_id)
+        return memories
+
+    def _read(self, user_id: str) -> Dict[str, Any]:
+        memory_file = self._get_memory_file(user_id)
+        if not os.path.exists(memory_file):
+            memory_file = self._get_legacy_file(user_id)
+        if memory_file is None or not os.path.exists(memory_file):
+            return {}
+        try:
+            with open(memory_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get(user_id, {})
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+
+    def _write_snapshot(self, user_id: str, memories: Dict[str, Any], fsync: bool = False):
+        memory_file = self._get_memory_file(user_id)
+        os.makedirs(os.path.dirname(memory_file), exist_ok=True)
+        tmp_file = f"{memory_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({user_id: memories}, f, indent=2, ensure_ascii=False)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # Troca atômica: um leitor nunca vê o arquivo pela metade
+        os.replace(tmp_file, memory_file)
+        self._remove(self._get_legacy_file(user_id))
+
+    def _write(self, user_id: str, memories: Dict[str, Any], apply):
+        """Reescreve o arquivo do usuário sob a trava, sem perder escritas de outros processos."""
+        with self._user_lock(user_id):
+            # Aplica a alteração sobre o conteúdo atual do disco, sem confiar na
+            # versão: os.replace reaproveita inodes e o mtime tem resolução grossa,
+            # então outra gravação pode deixar (inode, mtime, tamanho) iguais
+            current = self._read(user_id)
+            apply(current)
+            if current != memories:
+                # Outro processo gravou desde a nossa leitura: a cache recarrega
+                self._stale.add(user_id)
+            self._write_snapshot(user_id, current)
+            self._seen[user_id] = self._version(user_id)
+
+    def upsert(self, user_id: str, key: str, record: Dict[str, Any], memories: Dict[str, Any]):
+        """Grava o arquivo do usuário inteiro (`memories` já contém `record`)."""
+        self._write(user_id, memories, lambda current: current.__setitem__(key, record))
+
+    def upsert_many(self, user_id: str, records: Dict[str, Any], memories: Dict[str, Any]):
+        """Grava várias memórias de um usuário com uma única reescrita do arquivo."""
+        self._write(user_id, memories, lambda current: current.update(records))
+
+    def delete(self, user_id: str, keys: List[str], memories: Dict[str, Any]):
+        """Remove memórias (`memories` já não contém `keys`)."""
+        def apply(current):
+            for key in keys:
+                current.pop(key, None)
+        self._write(user_id, memories, apply)
+
+    def clear(self, user_id: str):
+        """Remove todas as memórias de um usuário."""
+        with self._user_lock(user_id):
+            self._remove(self._get_memory_file(user_id))
+            self._remove(self._get_legacy_file(user_id))
+            self._seen[user_id] = self._version(user_id)
+
+    def _discard_journal(self, user_id: str):
+        """Descarta alterações pendentes já incorporadas ao snapshot (chamado com a trava)."""
+
+    def iter_users(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Itera sobre (user_id, memórias) de todos os usuários armazenados."""
+        user_ids = set()
+        for directory, _, files in os.walk(self.storage_path):
+            for name in files:
+                for suffix in self._USER_FILE_SUFFIXES:
+                    if not name.endswith(suffix):
+                        continue
+                    stem = name[:-len(suffix)]
+                    if stem.startswith("~"):
+                        stem = self._read_user_id(os.path.join(directory, stem + "_memory.id"))
+                    if stem is not None:
+                        user_ids.add(stem)
+        for user_id in sorted(user_ids):
+            with self._user_lock(user_id, shared=True):
+                memories = self._read(user_id)
+            yield user_id, memories
+
+    @staticmethod
+    def _read_user_id(id_file: str) -> Optional[str]:
+        """user_id original de um arquivo com nome em hash (None se ausente)."""
+        try:
+            with open(id_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def restore(self, users: Dict[str, Dict[str, Any]], replace: bool = True):
+        """
+        Grava as memórias de vários usuários (importação de snapshot).
+
+        Args:
+            users: user_id -> memórias
+            replace: Substitui as memórias existentes (False = mescla)
+        """
+        for user_id, memories in users.items():
+            with self._user_lock(user_id):
+                if not replace:
+                    memories = {**self._read(user_id), **memories}
+                self._write_snapshot(user_id, memories)
+                self._discard_journal(user_id)
+
+    def changed(self, user_ids: List[str]) -> set:
+        """
+        Usuários alterados por outros processos desde a última leitura deste.
+
+        Custa um stat por usuário; basta recarregar os usuários retornados.
+        """
+        changed = {
+            user_id for user_id in user_ids
+            if user_id in self._stale or self._version(user_id) != self._seen.get(user_id)
+        }
+        self._stale -= changed
+        return changed
+
+    def forget(self, user_id: str):
+        """Descarta a versão de um usuário que saiu da cache (a próxima escrita relê o disco)."""
+        self._seen.pop(user_id, None)
+        self._stale.discard(user_id)
+
+    def close(self):
+        pass
+
+
+class JournalMemoryBackend(JSONMemoryBackend):
+    """Snapshot JSON por usuário + journal append-only compactado em segundo plano."""
+
+    _USER_FILE_SUFFIXES = ("_memory.json", "_memory.log", "_memory.log.compacting")
+
+    def __init__(
+        self,
+        storage_path: Path,
+        fsync_interval: float = MEMORY_JOURNAL_FSYNC_INTERVAL,
+        compact_interval: float = MEMORY_JOURNAL_COMPACT_INTERVAL,
+        compact_entries: int = MEMORY_JOURNAL_COMPACT_ENTRIES,
+    ):
+        """
+        Inicializa o backend.
+
+        Args:
+            storage_path: Diretório dos snapshots e journals
+            fsync_interval: Segundos entre fsyncs em lote (0 = fsync a cada escrita)
+            compact_interval: Segundos entre compactações periódicas
+            compact_entries: Entradas no journal de um usuário que antecipam a compactação
+        """
+        super().__init__(storage_path)
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+        self.compact_entries = compact_entries
+        self._lock = threading.Lock()
+        self._unsynced = set()
+        self._entries: Dict[str, int] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-journal", daemon=True)
+        self._thread.start()
+
+    def _get_journal_file(self, user_id: str) -> str:
+        return self._get_memory_file(user_id)[:-len(".json")] + ".log"
+
+    def _version(self, user_id: str) -> Any:
+        return (super()._version(user_id), self._stat(self._get_journal_file(user_id)))
+
+    def _append(self, user_id: str, *entries: Dict[str, Any]):
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        journal_file = self._get_journal_file(user_id)
+        with self._user_lock(user_id):
+            # Entradas anexadas por outros processos não se perdem no journal, mas
+            # a cache deste processo precisa ser recarregada
+            if self._version(user_id) != self._seen.get(user_id):
+                self._stale.add(user_id)
+            with self._lock:
+                with open(journal_file, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+                    if self.fsync_interval <= 0:
+                        f.flush()
+                        os.fsync(f.fileno())
+                if self.fsync_interval > 0:
+                    self._unsynced.add(journal_file)
+                pending = self._entries[user_id] = self._entries.get(user_id, 0) + len(entries)
+            self._seen[user_id] = self._version(user_id)
+        if pending >= self.compact_entries:
+            self._wake.set()
+
+    def upsert(self, user_id: str, key: str, record: Dict[str, Any], memories: Optional[Dict[str, Any]] = None):
+        """Acrescenta a memória ao journal do usuário."""
+        self._append(user_id, {"op": "set", "key": key, "record": record})
+
+    def upsert_many(self, user_id: str, records: Dict[str, Any], memories: Optional[Dict[str, Any]] = None):
+        """Acrescenta várias memórias ao journal com uma única escrita."""
+        self._append(user_id, *({"op": "set", "key": key, "record": record} for key, record in records.items()))
+
+    def delete(self, user_id: str, keys: List[str], memories: Optional[Dict[str, Any]] = None):
+        """Registra a remoção de memórias no journal."""
+        self._append(user_id, *({"op": "del", "key": key} for key in keys))
+
+    def clear(self, user_id: str):
+        """Registra a limpeza das memórias de um usuário no journal."""
+        self._append(user_id, {"op": "clear"})
+
+    @staticmethod
+    def _replay(journal_file: str, memories: Dict[str, Any]) -> int:
+        """Aplica as entradas de um journal sobre `memories`; retorna quantas leu."""
+        try:
+            f = open(journal_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return 0
+        count = 0
+        line = "\n"
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha incompleta de uma escrita interrompida
+                    continue
+                if entry.get("op") == "set":
+                    memories[entry["key"]] = entry["record"]
+                elif entry.get("op") == "del":
+                    memories.pop(entry["key"], None)
+                elif entry.get("op") == "clear":
+                    memories.clear()
+                count += 1
+        if not line.endswith("\n"):
+            # Termina a linha interrompida para a próxima entrada não se juntar a ela
+            with open(journal_file, 'a', encoding='utf-8') as f:
+                f.write("\n")
+        return count
+
+    def _discard_journal(self, user_id: str):
+        journal_file = self._get_journal_file(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._unsynced.discard(journal_file)
+        self._remove(journal_file + ".compacting")
+        self._remove(journal_file)
+
+    def _read(self, user_id: str) -> Dict[str, Any]:
+        """Lê o snapshot do usuário e reaplica o journal pendente (chamado com a trava)."""
+        journal_file = self._get_journal_file(user_id)
+        memories = super()._read(user_id)
+        pending = self._replay(journal_file + ".compacting", memories)
+        pending += self._replay(journal_file, memories)
+        if pending:
+            with self._lock:
+                self._entries[user_id] = max(self._entries.get(user_id, 0), pending)
+        return memories
+
+    def compact(self, user_id: str):
+        """Incorpora o journal de um usuário ao snapshot."""
+        journal_file = self._get_journal_file(user_id)
+        compacting_file = journal_file + ".compacting"
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._unsynced.discard(journal_file)
+
+        # A trava do usuário impede que um load (deste ou de outro processo) leia
+        # o snapshot antigo sem o journal já compactado
+        with self._user_lock(user_id):
+            version = self._version(user_id)
+            # Um .compacting existente é sobra de uma compactação interrompida:
+            # ele é incorporado agora e o journal atual fica para a próxima
+            if not os.path.exists(compacting_file):
+                if not os.path.exists(journal_file):
+                    return
+                os.replace(journal_file, compacting_file)
+            memories = JSONMemoryBackend._read(self, user_id)
+            self._replay(compacting_file, memories)
+            self._write_snapshot(user_id, memories, fsync=True)
+            self._remove(compacting_file)
+            # O conteúdo não mudou: a cache continua válida se já estava
+            if version == self._seen.get(user_id):
+                self._seen[user_id] = self._version(user_id)
+
+    def sync(self):
+        """Força o fsync dos journals escritos desde o último lote."""
+        with self._lock:
+            unsynced, self._unsynced = self._unsynced, set()
+        for journal_file in unsynced:
+            try:
+                fd = os.open(journal_file, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _compact_pending(self, min_entries: int):
+        with self._lock:
+            users = [user_id for user_id, entries in self._entries.items() if entries >= min_entries]
+        for user_id in users:
+            try:
+                self.compact(user_id)
+            except OSError:
+                # O journal continua íntegro; a próxima rodada tenta de novo
+                with self._lock:
+                    self._entries[user_id] = self._entries.get(user_id, 0) + 1
+
+    def _run(self):
+        next_compaction = time.monotonic() + self.compact_interval
+        timeout = self.fsync_interval if self.fsync_interval > 0 else self.compact_interval
+        while not self._stop.is_set():
+            self._wake.wait(timeout)
+            self._wake.clear()
+            try:
+                self.sync()
+            except OSError:
+                pass
+            if time.monotonic() >= next_compaction:
+                self._compact_pending(1)
+                next_compaction = time.monotonic() + self.compact_interval
+            else:
+                self._compact_pending(self.compact_entries)
+
+    def close(self):
+        """Para a thread de fundo, faz o fsync e compacta os journals pendentes."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self.sync()
+        self._compact_pending(1)
+
+
+class SQLiteMemoryBackend:
+    """Uma linha por (user_id, key) em SQLite/WAL, compartilhável entre processos."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=10, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                session_id TEXT,
+                expires_at TEXT,
+                importance REAL,
+                PRIMARY KEY (user_id, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories (user_id, timestamp);
+            CREATE TABLE IF NOT EXISTS user_versions (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+            """
+        )
+        # Versão de cada usuário vista por este processo; o contador em
+        # user_versions sobe a cada escrita, de qualquer processo
+        self._seen: Dict[str, int] = {}
+        self._stale = set()
+        self._data_version = None
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(memories)")}
+        for column, column_type in (("expires_at", "TEXT"), ("importance", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE memories ADD COLUMN {column} {column_type}")
+
+    def _get_version(self, user_id: str) -> int:
+        row = self._conn.execute("SELECT version FROM user_versions WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, user_id: str) -> Dict[str, Any]:
+        """Carrega as memórias de um usuário."""
+        with self._lock:
+            # Mesma transação de leitura: as linhas correspondem à versão lida
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute(
+                    "SELECT key, value, timestamp, session_id, expires_at, importance "
+                    "FROM memories WHERE user_id = ? ORDER BY timestamp",
+                    (user_id,),
+                ).fetchall()
+                self._seen[user_id] = self._get_version(user_id)
+            finally:
+                self._conn.execute("COMMIT")
+            self._stale.discard(user_id)
+        return {row[0]: self._record(*row[1:]) for row in rows}
+
+    @staticmethod
+    def _record(value: str, timestamp: str, session_id, expires_at, importance) -> Dict[str, Any]:
+        record = {"value": json.loads(value), "timestamp": timestamp, "session_id": session_id}
+        if expires_at is not None:
+            record["expires_at"] = expires_at
+        if importance is not None:
+            record["importance"] = importance
+        return record
+
+    def iter_users(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Itera sobre (user_id, memórias) de todos os usuários, em uma única consulta."""
+        # Conexão própria: a leitura é um snapshot consistente (WAL) e não
+        # bloqueia as escritas desta instância enquanto o iterador é consumido
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            rows = conn.execute(
+                "SELECT user_id, key, value, timestamp, session_id, expires_at, importance "
+                "FROM memories ORDER BY user_id, timestamp"
+            )
+            current, memories = None, {}
+            for row in rows:
+                if row[0] != current:
+                    if memories:
+                        yield current, memories
+                    current, memories = row[0], {}
+                memories[row[1]] = self._record(*row[2:])
+            if memories:
+                yield current, memories
+        finally:
+            conn.close()
+
+    _UPSERT = """
+        INSERT INTO memories (user_id, key, value, timestamp, session_id, expires_at, importance)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, key) DO UPDATE SET
+            value = excluded.value,
+            timestamp = excluded.timestamp,
+            session_id = excluded.session_id,
+            expires_at = excluded.expires_at,
+            importance = excluded.importance
+    """
+
+    @staticmethod
+    def _row(user_id: str, key: str, record: Dict[str, Any]) -> tuple:
+        return (
+            user_id,
+            key,
+            json.dumps(record.get("value"), ensure_ascii=False),
+            record.get("timestamp", ""),
+            record.get("session_id"),
+            record.get("expires_at"),
+            record.get("importance"),
+        )
+
+    _BUMP_VERSION = """
+        INSERT INTO user_versions (user_id, version) VALUES (?, 1)
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+    """
+
+    def _write(self, user_id: str, sql: str, rows: List[tuple]):
+        """Executa uma escrita e incrementa a versão do usuário na mesma transação."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute(self._BUMP_VERSION, (user_id,))
+                version = self._get_version(user_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            # Um salto maior que 1 indica escritas de outro processo no meio
+            if version != self._seen.get(user_id, 0) + 1:
+                self._stale.add(user_id)
+            self._seen[user_id] = version
+
+    def upsert(self, user_id: str, key: str, record: Dict[str, Any], memories: Optional[Dict[str, Any]] = None):
+        """Insere ou atualiza uma única memória."""
+        self._write(user_id, self._UPSERT, [self._row(user_id, key, record)])
+
+    def upsert_many(self, user_id: str, records: Dict[str, Any], memories: Optional[Dict[str, Any]] = None):
+        """Insere ou atualiza várias memórias de um usuário em uma única transação."""
+        self._write(user_id, self._UPSERT, [self._row(user_id, key, record) for key, record in records.items()])
+
+    def delete(self, user_id: str, keys: List[str], memories: Optional[Dict[str, Any]] = None):
+        """Remove memórias de um usuário em uma única transação."""
+        self._write(user_id, "DELETE FROM memories WHERE user_id = ? AND key = ?", [(user_id, key) for key in keys])
+
+    def clear(self, user_id: str):
+        """Remove todas as memórias de um usuário."""
+        self._write(user_id, "DELETE FROM memories WHERE user_id = ?", [(user_id,)])
+
+    def changed(self, user_ids: List[str]) -> set:
+        """
+        Usuários alterados por outros processos desde a última leitura deste.
+
+        PRAGMA data_version só muda com commits de outras conexões: sem eles,
+        a verificação não consulta nenhuma tabela.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version and not self._stale:
+                return set()
+            self._data_version = data_version
+            versions = {}
+            user_ids = list(user_ids)
+            # Lotes abaixo do limite de parâmetros do SQLite
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                versions.update(self._conn.execute(
+                    f"SELECT user_id, version FROM user_versions WHERE user_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ))
+            changed = {
+                user_id for user_id in user_ids
+                if user_id in self._stale or versions.get(user_id, 0) != self._seen.get(user_id)
+            }
+            self._stale -= changed
+        return changed
+
+    def forget(self, user_id: str):
+        """Descarta a versão de um usuário que saiu da cache."""
+        with self._lock:
+            self._seen.pop(user_id, None)
+            self._stale.discard(user_id)
+
+    def restore(self, users: Dict[str, Dict[str, Any]], replace: bool = True):
+        """
+        Grava as memórias de vários usuários em uma única transação (importação de snapshot).
+
+        Args:
+            users: user_id -> memórias
+            replace: Substitui as memórias existentes (False = mescla)
+        """
+        rows = [
+            self._row(user_id, key, record)
+            for user_id, memories in users.items()
+            for key, record in memories.items()
+        ]
+        user_rows = [(user_id,) for user_id in users]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if replace:
+                    self._conn.executemany("DELETE FROM memories WHERE user_id = ?", user_rows)
+                self._conn.executemany(self._UPSERT, rows)
+                self._conn.executemany(self._BUMP_VERSION, user_rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM memories LIMIT 1").fetchone() is None
+
+    def import_json(self, storage_path: Path) -> int:
+        """
+        Importa os arquivos `{user_id}_memory.json` do backend JSON.
+
+        Returns:
+            Número de memórias importadas
+        """
+        imported = 0
+        for user_id, records in JSONMemoryBackend(storage_path).iter_users():
+            if records:
+                self.upsert_many(user_id, records)
+                imported += len(records)
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_memory_backend(storage_path: Path, backend: str = MEMORY_BACKEND):
+    """
+    Cria o backend de armazenamento de memórias.
+
+    Args:
+        storage_path: Diretório dos dados de memória
+        backend: "sqlite" (padrão), "json" ou "journal"
+    """
+    storage_path = Path(storage_path)
+    if backend == "json":
+        return JSONMemoryBackend(storage_path)
+    if backend == "journal":
+        return JournalMemoryBackend(storage_path)
+
+    db_path = storage_path / "memory.db"
+    is_new = not db_path.exists()
+    sqlite_backend = SQLiteMemoryBackend(db_path)
+    # Na primeira execução, migra as memórias gravadas pelo backend JSON
+    if is_new and sqlite_backend.is_empty():
+        sqlite_backend.import_json(storage_path)
+    return sqlite_backend
+
+
+EVICTION_POLICIES = ("lru", "oldest", "importance")
+
+
+class MemoryRetention:
+    """Estruturas de expiração e descarte das memórias de um usuário."""
+
+    def __init__(self, policy: str):
+        self.policy = policy if policy in EVICTION_POLICIES else "lru"
+        # Heaps com remoção preguiçosa: entradas de chaves reescritas são
+        # ignoradas quando chegam ao topo
+        self._expiry: List[Tuple[str, str]] = []
+        self._importance: List[Tuple[float, str, str]] = []
+        # Ordem de uso (gravação ou recall), do menos ao mais recente
+        self._access: "OrderedDict[str, None]" = OrderedDict()
+
+    def track(self, key: str, record: Dict[str, Any]):
+        """Registra uma memória gravada (ou carregada do backend)."""
+        expires_at = record.get("expires_at")
+        if expires_at:
+            heapq.heappush(self._expiry, (expires_at, key))
+        if self.policy == "importance":
+            heapq.heappush(self._importance, (record.get("importance", 1.0), record.get("timestamp", ""), key))
+        elif self.policy == "lru":
+            self._access.pop(key, None)
+            self._access[key] = None
+
+    def touch(self, key: str):
+        """Registra um recall (política "lru")."""
+        if self.policy == "lru" and key in self._access:
+            self._access.move_to_end(key)
+
+    def forget(self, key: str):
+        self._access.pop(key, None)
+
+    def expired(self, memories: Dict[str, Any], now: str, limit: Optional[int] = None) -> List[str]:
+        """Chaves vencidas (no máximo `limit`), verificando só o topo do heap."""
+        keys = []
+        while self._expiry and self._expiry[0][0] <= now and (limit is None or len(keys) < limit):
+            expires_at, key = heapq.heappop(self._expiry)
+            record = memories.get(key)
+            if record is not None and record.get("expires_at") == expires_at:
+                keys.append(key)
+        return keys
+
+    def victims(self, memories: Dict[str, Any], count: int) -> List[str]:
+        """Escolhe `count` memórias a descartar segundo a política."""
+        if count <= 0:
+            return []
+        if self.policy == "lru":
+            return list(islice(self._access, count))
+        if self.policy == "oldest":
+            return list(islice(memories, count))
+
+        keys = []
+        while self._importance and len(keys) < count:
+            importance, timestamp, key = heapq.heappop(self._importance)
+            record = memories.get(key)
+            if record is not None and record.get("timestamp") == timestamp and key not in keys:
+                keys.append(key)
+        return keys
+
+    def compact(self, memories: Dict[str, Any]):
+        """Reconstrói os heaps quando as entradas obsoletas passam do dobro das válidas."""
+        if len(self._expiry) + len(self._importance) <= 2 * len(memories) + 64:
+            return
+        self._expiry = [(r["expires_at"], k) for k, r in memories.items() if r.get("expires_at")]
+        heapq.heapify(self._expiry)
+        if self.policy == "importance":
+            self._importance = [
+                (r.get("importance", 1.0), r.get("timestamp", ""), k) for k, r in memories.items()
+            ]
+            heapq.heapify(self._importance)
+
 
 class MemoryManager:
     """Gerenciador de memória persistente para assistentes."""
     
-    def __init__(self, storage_path: str = "storage/memory"):
+    def __init__(
+        self,
+        storage_path: str = "storage/memory",
+        backend=None,
+        max_cached_users: int = MEMORY_CACHE_USERS,
+        durability: str = MEMORY_DURABILITY,
+        flush_interval: float = MEMORY_FLUSH_INTERVAL,
+        flush_count: int = MEMORY_FLUSH_COUNT,
+        flush_max_backoff: float = MEMORY_FLUSH_MAX_BACKOFF,
+        embedder=None,
+        max_memories: int = MEMORY_MAX_PER_USER,
+        default_ttl: float = MEMORY_DEFAULT_TTL,
+        eviction_policy: str = MEMORY_EVICTION_POLICY,
+        sync_interval: float = MEMORY_SYNC_INTERVAL,
+    ):
         """
         Inicializa o gerenciador de memória.
         
         Args:
             storage_path: Caminho para armazenar os arquivos de memória
+            backend: Backend de armazenamento (padrão: definido por MEMORY_BACKEND)
+            max_cached_users: Número de usuários mantidos em memória (LRU)
+            durability: "sync" (grava antes de retornar) ou "buffered" (write-behind:
+                        grava em segundo plano por tempo, quantidade ou ao encerrar)
+            flush_interval: Segundos que uma alteração pode esperar no modo "buffered"
+            flush_count: Alterações pendentes que antecipam a gravação no modo "buffered"
+            flush_max_backoff: Espera máxima entre novas tentativas de uma gravação
+                               em segundo plano que falhou
+            embedder: Gera os vetores da busca semântica (padrão: HashingEmbedder local)
+            max_memories: Máximo de memórias por usuário (0 = sem limite)
+            default_ttl: Validade padrão, em segundos, de cada memória (0 = não expira)
+            eviction_policy: Memória descartada ao atingir o limite: "lru" (menos
+                             lembrada), "oldest" (gravada há mais tempo) ou
+                             "importance" (menor importância)
+            sync_interval: Segundos entre verificações de alterações feitas por
+                           outros processos (0 = a cada acesso)
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.memories: Dict[str, Any] = {}
+        self.backend = backend or create_memory_backend(self.storage_path)
+        self.max_cached_users = max(1, max_cached_users)
+        # Usuários "quentes", do menos ao mais recentemente usado; os demais
+        # ficam só no backend e são carregados no primeiro acesso
+        # Dentro de cada usuário, as chaves ficam em ordem de timestamp (índice
+        # de recência): remember() move a chave para o fim
+        self.memories: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Resumos por usuário (por limite ou por mensagem), descartados a cada alteração
+        self._summaries: Dict[str, Dict[Any, str]] = {}
+        # Índices vetoriais, criados na primeira busca de cada usuário; chaves
+        # alteradas depois disso são vetorizadas em lote na busca seguinte
+        self.embedder = embedder or HashingEmbedder(MEMORY_EMBEDDING_DIM)
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._unindexed: Dict[str, set] = {}
+        self.max_memories = max_memories
+        self.default_ttl = default_ttl
+        self.eviction_policy = eviction_policy
+        self._retention: Dict[str, MemoryRetention] = {}
+        # Vários processos (workers) podem compartilhar o armazenamento: usuários
+        # alterados por outro processo são descartados da cache e relidos
+        self.sync_interval = sync_interval
+        self._next_sync = 0.0
+        self._lock = threading.RLock()
         self.current_session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self._load_memories()
+        
+        self.buffered = durability == "buffered"
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self.flush_max_backoff = flush_max_backoff
+        # Alterações ainda não gravadas: user_id -> (limpar antes?, {key: registro})
+        self._dirty: Dict[str, Tuple[bool, Dict[str, Any]]] = {}
+        self._dirty_count = 0
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        # Falhas seguidas da gravação em segundo plano (definem a espera da próxima)
+        self._flush_failures = 0
+        if self.buffered:
+            atexit.register(self.flush)
     
-    def _get_memory_file(self, user_id: str = "default") -> Path:
-        """Retorna o caminho do arquivo de memória para um usuário."""
-        return self.storage_path / f"{user_id}_memory.json"
+    def _load_memories(self, user_id: str = "default") -> Dict[str, Any]:
+        """Carrega as memórias de um usuário do backend, descartando o menos usado."""
+        loaded = self.backend.load(user_id)
+        pending = self._dirty.get(user_id)
+        if pending is not None:
+            # Alterações deste processo ainda não gravadas valem sobre o disco
+            clear, records = pending
+            if clear:
+                loaded = {}
+            for key, record in records.items():
+                if record is None:
+                    loaded.pop(key, None)
+                else:
+                    loaded[key] = record
+        user_memories = dict(sorted(loaded.items(), key=lambda x: x[1].get("timestamp", "")))
+        self.memories[user_id] = user_memories
+        self._drop_derived(user_id)
+        retention = self._user_retention(user_id)
+        for key, record in user_memories.items():
+            retention.track(key, record)
+        # Aplica TTL e limite já na carga: o que venceu enquanto o usuário estava
+        # inativo sai do disco e a próxima carga fica menor
+        self._enforce_limits(user_id, user_memories, expire_limit=None)
+        if len(self.memories) > self.max_cached_users:
+            # Usuários com alterações pendentes ficam em memória até a gravação
+            for candidate in [u for u in self.memories if u not in self._dirty and u != user_id]:
+                self._evict(candidate)
+                if len(self.memories) <= self.max_cached_users:
+                    break
+        return user_memories
     
-    def _load_memories(self, user_id: str = "default"):
-        """Carrega memórias do arquivo."""
-        memory_file = self._get_memory_file(user_id)
-        if memory_file.exists():
-            try:
-                with open(memory_file, 'r', encoding='utf-8') as f:
-                    self.memories = json.load(f)
-            except json.JSONDecodeError:
-                self.memories = {}
+    def _evict(self, user_id: str):
+        """Remove um usuário da memória (alterações pendentes são reaplicadas ao recarregar)."""
+        self.memories.pop(user_id, None)
+        self._drop_derived(user_id)
+        self.backend.forget(user_id)
+    
+    def refresh(self):
+        """Descarta da cache os usuários alterados por outros processos."""
+        with self._lock:
+            self._next_sync = time.monotonic() + self.sync_interval
+            if not self.memories:
+                return
+            for user_id in self.backend.changed(list(self.memories)):
+                self._evict(user_id)
+    
+    def _drop_derived(self, user_id: str):
+        """Descarta resumos e índice vetorial de um usuário."""
+        self._summaries.pop(user_id, None)
+        self._indexes.pop(user_id, None)
+        self._unindexed.pop(user_id, None)
+        self._retention.pop(user_id, None)
+    
+    def _user_retention(self, user_id: str) -> MemoryRetention:
+        retention = self._retention.get(user_id)
+        if retention is None:
+            retention = self._retention[user_id] = MemoryRetention(self.eviction_policy)
+        return retention
+    
+    def _remove_keys(self, user_id: str, user_memories: Dict[str, Any], keys: List[str]):
+        """Remove memórias da cache, dos índices e do backend."""
+        if not keys:
+            return
+        retention = self._user_retention(user_id)
+        index = self._indexes.get(user_id)
+        for key in keys:
+            user_memories.pop(key, None)
+            retention.forget(key)
+            if index is not None:
+                index.remove(key)
+        self._summaries.pop(user_id, None)
+        
+        if self.buffered:
+            clear, records = self._dirty.get(user_id, (False, {}))
+            for key in keys:
+                records[key] = None
+            self._mark_dirty(user_id, clear, records)
         else:
-            self.memories = {}
+            self.backend.delete(user_id, keys, user_memories)
     
-    def _save_memories(self, user_id: str = "default"):
-        """Salva memórias no arquivo."""
-        memory_file = self._get_memory_file(user_id)
-        with open(memory_file, 'w', encoding='utf-8') as f:
-            json.dump(self.memories, f, indent=2, ensure_ascii=False)
+    def _enforce_limits(self, user_id: str, user_memories: Dict[str, Any], expire_limit: Optional[int] = 32):
+        """
+        Remove memórias vencidas e as que excedem o limite do usuário.
+        
+        Incremental: nas escritas e leituras só olha o topo dos heaps (no máximo
+        `expire_limit` vencidas por vez); a carga passa expire_limit=None.
+        """
+        retention = self._user_retention(user_id)
+        removed = retention.expired(user_memories, datetime.now().isoformat(), expire_limit)
+        self._remove_keys(user_id, user_memories, removed)
+        if self.max_memories > 0:
+            excess = len(user_memories) - self.max_memories
+            self._remove_keys(user_id, user_memories, retention.victims(user_memories, excess))
+        retention.compact(user_memories)
+    
+    def _user_memories(self, user_id: str) -> Dict[str, Any]:
+        """Memórias de um usuário, carregadas na primeira vez que são usadas."""
+        with self._lock:
+            if time.monotonic() >= self._next_sync:
+                self.refresh()
+            user_memories = self.memories.get(user_id)
+            if user_memories is None:
+                return self._load_memories(user_id)
+            self.memories.move_to_end(user_id)
+            self._enforce_limits(user_id, user_memories)
+            return user_memories
     
-    def remember(self, key: str, value: Any, user_id: str = "default"):
+    def remember(
+        self,
+        key: str,
+        value: Any,
+        user_id: str = "default",
+        ttl: Optional[float] = None,
+        importance: Optional[float] = None,
+    ):
         """
         Armazena uma informação na memória.
         
@@ -53,17 +1012,38 @@ class MemoryManager:
             key: Chave da memória
             value: Valor a ser armazenado
             user_id: ID do usuário
+            ttl: Validade em segundos (padrão: default_ttl; 0 = não expira)
+            importance: Peso na política "importance" (padrão: 1.0)
         """
-        if user_id not in self.memories:
-            self.memories[user_id] = {}
-        
-        self.memories[user_id][key] = {
+        now = datetime.now()
+        record = {
             "value": value,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "session_id": self.current_session_id
         }
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl > 0:
+            record["expires_at"] = (now + timedelta(seconds=ttl)).isoformat()
+        if importance is not None:
+            record["importance"] = float(importance)
         
-        self._save_memories(user_id)
+        with self._lock:
+            user_memories = self._user_memories(user_id)
+            user_memories.pop(key, None)
+            user_memories[key] = record
+            self._summaries.pop(user_id, None)
+            if user_id in self._indexes:
+                self._unindexed.setdefault(user_id, set()).add(key)
+            self._user_retention(user_id).track(key, record)
+            
+            if self.buffered:
+                clear, records = self._dirty.get(user_id, (False, {}))
+                records[key] = record
+                self._mark_dirty(user_id, clear, records)
+            else:
+                self.backend.upsert(user_id, key, record, user_memories)
+            
+            self._enforce_limits(user_id, user_memories)
     
     def recall(self, key: str, user_id: str = "default") -> Optional[Any]:
         """
@@ -76,8 +1056,11 @@ class MemoryManager:
         Returns:
             Valor armazenado ou None se não existir
         """
-        if user_id in self.memories and key in self.memories[user_id]:
-            return self.memories[user_id][key].get("value")
+        with self._lock:
+            record = self._user_memories(user_id).get(key)
+            if record is not None:
+                self._user_retention(user_id).touch(key)
+                return record.get("value")
         return None
     
     def get_all_memories(self, user_id: str = "default") -> Dict[str, Any]:
@@ -90,7 +1073,7 @@ class MemoryManager:
         Returns:
             Dicionário com todas as memórias
         """
-        return self.memories.get(user_id, {})
+        return self._user_memories(user_id)
     
     def clear_memories(self, user_id: str = "default"):
         """
@@ -99,9 +1082,184 @@ class MemoryManager:
         Args:
             user_id: ID do usuário
         """
-        if user_id in self.memories:
-            self.memories[user_id] = {}
-            self._save_memories(user_id)
+        with self._lock:
+            if self.buffered:
+                self.memories[user_id] = {}
+                self._drop_derived(user_id)
+                self._mark_dirty(user_id, True, {})
+                return
+            
+            self._evict(user_id)
+            self.backend.clear(user_id)
+    
+    @staticmethod
+    def _memory_text(key: str, data: Dict[str, Any]) -> str:
+        return f"{key}: {data.get('value', '')}"
+    
+    def _user_index(self, user_id: str) -> VectorIndex:
+        """Índice vetorial de um usuário, atualizado com as chaves pendentes."""
+        user_memories = self._user_memories(user_id)
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = self._indexes[user_id] = VectorIndex(self.embedder.dim)
+            keys = list(user_memories)
+        else:
+            keys = [key for key in self._unindexed.pop(user_id, ()) if key in user_memories]
+        if keys:
+            vectors = self.embedder.embed([self._memory_text(key, user_memories[key]) for key in keys])
+            for key, vector in zip(keys, vectors):
+                index.add(key, vector)
+        return index
+    
+    def search(
+        self, query: str, user_id: str = "default", k: int = 5, min_score: float = 0.1
+    ) -> List[Tuple[str, Any, float]]:
+        """
+        Busca memórias pelo significado da chave e do valor (similaridade de cosseno).
+        
+        Args:
+            query: Texto da consulta
+            user_id: ID do usuário
+            k: Número máximo de resultados
+            min_score: Similaridade mínima (0 a 1) para um resultado ser incluído
+            
+        Returns:
+            Lista de (chave, valor, similaridade), da mais para a menos parecida
+        """
+        query_vector = self.embedder.embed([query])[0]
+        with self._lock:
+            index = self._user_index(user_id)
+            user_memories = self.memories.get(user_id, {})
+            return [
+                (key, user_memories[key].get("value"), score)
+                for key, score in index.search(query_vector, k)
+                if score >= min_score and key in user_memories
+            ]
+    
+    def _mark_dirty(self, user_id: str, clear: bool, records: Dict[str, Any]):
+        """Registra alterações pendentes e agenda a gravação (chamado com o lock)."""
+        self._dirty[user_id] = (clear, records)
+        self._dirty_count += 1
+        if self._dirty_count >= self.flush_count and not self._flush_failures:
+            # Grava em outra thread: a chamada da ferramenta não espera o disco
+            self._schedule_flush(0.0)
+        elif self._timer is None:
+            self._schedule_flush(self._flush_delay())
+    
+    def _flush_delay(self) -> float:
+        """Espera até a próxima gravação: dobra a cada falha seguida, até o limite."""
+        if not self._flush_failures:
+            return self.flush_interval
+        delay = max(self.flush_interval, 0.1) * 2 ** self._flush_failures
+        return min(delay, self.flush_max_backoff)
+    
+    def _schedule_flush(self, delay: float):
+        """Agenda a gravação em segundo plano (chamado com o lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._background_flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _background_flush(self):
+        """Gravação disparada pelo timer: se falhar, agenda uma nova tentativa."""
+        try:
+            self.flush()
+        except Exception:
+            with self._lock:
+                self._flush_failures += 1
+                # As alterações voltaram ao conjunto pendente; sem um novo timer
+                # elas só seriam gravadas na próxima alteração ou ao encerrar
+                if self._dirty and self._timer is None:
+                    self._schedule_flush(self._flush_delay())
+            raise
+        with self._lock:
+            self._flush_failures = 0
+    
+    def flush(self):
+        """Grava imediatamente todas as alterações pendentes (modo "buffered")."""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                self._dirty_count = 0
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                # Cópias: o backend JSON grava o usuário inteiro fora do lock
+                snapshots = {user_id: dict(self.memories.get(user_id, {})) for user_id in dirty}
+            
+            for index, (user_id, (clear, records)) in enumerate(dirty.items()):
+                try:
+                    if clear:
+                        self.backend.clear(user_id)
+                    deleted = [key for key, record in records.items() if record is None]
+                    if deleted:
+                        self.backend.delete(user_id, deleted, snapshots[user_id])
+                    upserts = {key: record for key, record in records.items() if record is not None}
+                    if upserts:
+                        self.backend.upsert_many(user_id, upserts, snapshots[user_id])
+                except Exception:
+                    self._restore_dirty(list(dirty.items())[index:])
+                    raise
+    
+    def _restore_dirty(self, failed):
+        """Devolve alterações não gravadas ao conjunto pendente, sem sobrepor as mais novas."""
+        with self._lock:
+            for user_id, (clear, records) in failed:
+                newer = self._dirty.get(user_id)
+                if newer is not None:
+                    if newer[0]:
+                        continue
+                    records = {**records, **newer[1]}
+                self._dirty[user_id] = (clear, records)
+            self._dirty_count = sum(len(records) or 1 for _, records in self._dirty.values())
+    
+    def export_snapshot(self, path: str) -> Dict[str, int]:
+        """
+        Exporta as memórias de todos os usuários para um snapshot comprimido.
+        
+        Args:
+            path: Arquivo de destino (ex: "backup.jsonl.gz")
+            
+        Returns:
+            Dicionário com o número de usuários e de memórias exportados
+        """
+        # Importado aqui: o módulo também roda como CLI (python -m src.utils.memory_snapshot)
+        from src.utils.memory_snapshot import export_snapshot
+        
+        if self.buffered:
+            self.flush()
+        return export_snapshot(self.backend, path)
+    
+    def import_snapshot(self, path: str, replace: bool = True, workers: int = 4) -> Dict[str, int]:
+        """
+        Importa um snapshot (de qualquer backend), conferindo os checksums antes.
+        
+        Args:
+            path: Arquivo do snapshot
+            replace: Substitui as memórias dos usuários do snapshot (False = mescla)
+            workers: Threads de gravação
+            
+        Returns:
+            Dicionário com o número de usuários e de memórias importados
+        """
+        from src.utils.memory_snapshot import import_snapshot
+        
+        if self.buffered:
+            self.flush()
+        stats = import_snapshot(self.backend, path, replace=replace, workers=workers)
+        # Os usuários importados são relidos do backend no próximo acesso
+        with self._lock:
+            for user_id in list(self.memories):
+                self._evict(user_id)
+        return stats
+    
+    def close(self):
+        """Grava as alterações pendentes e fecha o backend de armazenamento."""
+        if self.buffered:
+            self.flush()
+            atexit.unregister(self.flush)
+        self.backend.close()
     
     def get_context_summary(self, user_id: str = "default", limit: int = 10) -> str:
         """
@@ -114,29 +1272,82 @@ class MemoryManager:
         Returns:
             String com resumo das memórias
         """
-        user_memories = self.get_all_memories(user_id)
-        if not user_memories:
-            return "Nenhuma memória anterior encontrada."
-        
-        # Ordenar por timestamp
-        sorted_memories = sorted(
-            user_memories.items(),
-            key=lambda x: x[1].get("timestamp", ""),
-            reverse=True
-        )[:limit]
-        
-        summary = "📝 Memórias anteriores:\n"
-        for key, data in sorted_memories:
-            value = data.get("value", "")
-            timestamp = data.get("timestamp", "")
-            if timestamp:
-                try:
-                    dt = datetime.fromisoformat(timestamp)
-                    time_str = dt.strftime("%d/%m %H:%M")
-                    summary += f"• [{time_str}] {key}: {value}\n"
-                except:
-                    summary += f"• {key}: {value}\n"
-            else:
-                summary += f"• {key}: {value}\n"
+        with self._lock:
+            # Carrega antes de consultar a cache: a expiração invalida o resumo
+            user_memories = self.get_all_memories(user_id)
+            cached = self._summaries.get(user_id, {}).get(limit)
+            if cached is not None:
+                return cached
+            
+            if not user_memories:
+                return "Nenhuma memória anterior encontrada."
+            
+            # As chaves já estão em ordem de timestamp: as N mais recentes são as
+            # N últimas, sem ordenar todas
+            lines = ["📝 Memórias anteriores:\n"]
+            for key in islice(reversed(user_memories), max(limit, 0)):
+                lines.append(self._summary_line(key, user_memories[key]))
+            
+            summary = "".join(lines)
+            self._cache_summary(user_id, limit, summary)
+            return summary
+    
+    @staticmethod
+    def _summary_line(key: str, data: Dict[str, Any]) -> str:
+        value = data.get("value", "")
+        timestamp = data.get("timestamp", "")
+        if timestamp:
+            try:
+                time_str = datetime.fromisoformat(timestamp).strftime("%d/%m %H:%M")
+                return f"• [{time_str}] {key}: {value}\n"
+            except ValueError:
+                pass
+        return f"• {key}: {value}\n"
+    
+    def _cache_summary(self, user_id: str, cache_key, summary: str):
+        summaries = self._summaries.setdefault(user_id, {})
+        # Resumos por mensagem variam muito: limita os guardados por usuário
+        if len(summaries) >= 64:
+            summaries.clear()
+        summaries[cache_key] = summary
+    
+    def get_relevant_context(
+        self, query: str, user_id: str = "default", limit: int = 5, min_score: float = 0.2
+    ) -> str:
+        """
+        Retorna as memórias relacionadas a uma mensagem, para o contexto da execução.
+        
+        Usa a busca semântica e completa com as memórias mais recentes até `limit`.
+        O resultado fica em cache até a próxima alteração das memórias do usuário.
         
-        return summary
\ No newline at end of file
+        Args:
+            query: Mensagem do usuário
+            user_id: ID do usuário
+            limit: Número máximo de memórias a incluir
+            min_score: Similaridade mínima para uma memória ser considerada relacionada
+            
+        Returns:
+            String com as memórias selecionadas
+        """
+        with self._lock:
+            user_memories = self.get_all_memories(user_id)
+            cache_key = (limit, " ".join(query.lower().split()))
+            cached = self._summaries.get(user_id, {}).get(cache_key)
+            if cached is not None:
+                return cached
+            
+            if not user_memories:
+                return "Nenhuma memória anterior encontrada."
+            
+            keys = [key for key, _, _ in self.search(query, user_id, k=limit, min_score=min_score)]
+            for key in reversed(user_memories):
+                if len(keys) >= limit:
+                    break
+                if key not in keys:
+                    keys.append(key)
+            
+            lines = ["📝 Memórias relevantes:\n"]
+            lines.extend(self._summary_line(key, user_memories[key]) for key in keys)
+            summary = "".join(lines)
+            self._cache_summary(user_id, cache_key, summary)
+            return summary
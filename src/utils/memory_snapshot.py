@@ -0,0 +1,207 @@
+"""Exportação e importação em lote das memórias (snapshot comprimido, uma linha por usuário)
+
+Formato (gzip, UTF-8):
+
+    {"format": "memory-snapshot", "version": 1, "created_at": "..."}
+    <sha256 da linha>\t{"user_id": "...", "memories": {...}}
+    ...
+    {"users": N, "memories": M, "sha256": "<sha256 dos digests das linhas>"}
+
+Cada linha de usuário carrega o digest do próprio conteúdo, e o rodapé o digest
+do conjunto: a verificação não precisa decodificar o JSON, e um arquivo truncado
+ou corrompido é rejeitado antes de qualquer escrita.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+SNAPSHOT_FORMAT = "memory-snapshot"
+SNAPSHOT_VERSION = 1
+_BATCH_USERS = 256
+
+
+def export_snapshot(backend, path: str) -> Dict[str, int]:
+    """
+    Grava as memórias de todos os usuários de um backend em um snapshot.
+
+    Args:
+        backend: Backend de memórias (JSON, journal ou SQLite)
+        path: Arquivo de destino (ex: "backup.jsonl.gz")
+
+    Returns:
+        Dicionário com o número de usuários e de memórias exportados
+    """
+    users = memories = 0
+    total = hashlib.sha256()
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        header = {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "created_at": datetime.now().isoformat()}
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        for user_id, user_memories in backend.iter_users():
+            if not user_memories:
+                continue
+            payload = json.dumps(
+                {"user_id": user_id, "memories": user_memories}, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            digest = hashlib.sha256(payload).hexdigest()
+            total.update(digest.encode("ascii"))
+            f.write(digest.encode("ascii") + b"\t" + payload + b"\n")
+            users += 1
+            memories += len(user_memories)
+        footer = {"users": users, "memories": memories, "sha256": total.hexdigest()}
+        f.write(json.dumps(footer).encode("utf-8") + b"\n")
+    return {"users": users, "memories": memories}
+
+
+def _read_lines(path: str) -> Iterator[Tuple[str, Any]]:
+    """Lê o snapshot validando cada linha: ("user", payload) e, por último, ("end", rodapé)."""
+    # Abrir fora do try: arquivo ausente ou sem permissão não é "corrompido"
+    with open(path, "rb") as raw:
+        try:
+            yield from _iter_lines(raw)
+        except (EOFError, OSError, zlib.error, json.JSONDecodeError, UnicodeDecodeError):
+            # OSError inclui gzip.BadGzipFile (CRC ou tamanho não conferem)
+            raise ValueError("Snapshot truncado ou corrompido")
+
+
+def _iter_lines(raw) -> Iterator[Tuple[str, Any]]:
+    total = hashlib.sha256()
+    users = 0
+    with gzip.GzipFile(fileobj=raw, mode="rb") as f:
+        try:
+            header = json.loads(f.readline())
+        except (json.JSONDecodeError, UnicodeDecodeError, gzip.BadGzipFile):
+            header = None
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Arquivo não é um snapshot de memórias")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versão de snapshot não suportada: {header.get('version')}")
+
+        for line_number, line in enumerate(f, start=2):
+            digest, tab, payload = line.rstrip(b"\n").partition(b"\t")
+            if not tab:
+                footer = json.loads(line)
+                if footer.get("users") != users or footer.get("sha256") != total.hexdigest():
+                    raise ValueError("Checksum do snapshot não confere")
+                # Ler até o fim confere o CRC do gzip
+                if f.read():
+                    raise ValueError("Dados após o rodapé do snapshot")
+                yield "end", footer
+                return
+            if hashlib.sha256(payload).hexdigest().encode("ascii") != digest:
+                raise ValueError(f"Checksum inválido na linha {line_number} do snapshot")
+            total.update(digest)
+            users += 1
+            yield "user", payload
+    raise ValueError("Snapshot truncado (rodapé ausente)")
+
+
+def verify_snapshot(path: str) -> Dict[str, int]:
+    """
+    Confere os checksums de um snapshot sem importá-lo.
+
+    Returns:
+        Dicionário com o número de usuários e de memórias do snapshot
+
+    Raises:
+        ValueError: Se o arquivo estiver truncado, corrompido ou em outro formato
+    """
+    for kind, value in _read_lines(path):
+        if kind == "end":
+            return {"users": value["users"], "memories": value["memories"]}
+    raise ValueError("Snapshot truncado (rodapé ausente)")
+
+
+def _restore_batch(backend, payloads: List[bytes], replace: bool) -> int:
+    users = {}
+    for payload in payloads:
+        entry = json.loads(payload)
+        users[entry["user_id"]] = entry["memories"]
+    backend.restore(users, replace=replace)
+    return sum(len(memories) for memories in users.values())
+
+
+def import_snapshot(
+    backend, path: str, replace: bool = True, workers: int = 4, verify: bool = True
+) -> Dict[str, int]:
+    """
+    Restaura um snapshot em um backend, em lotes de usuários gravados em paralelo.
+
+    Args:
+        backend: Backend de destino (pode ser de outro tipo que o de origem)
+        path: Arquivo do snapshot
+        replace: Substitui as memórias dos usuários do snapshot (False = mescla)
+        workers: Threads de gravação
+        verify: Confere todo o arquivo antes da primeira escrita
+
+    Returns:
+        Dicionário com o número de usuários e de memórias importados
+
+    Raises:
+        ValueError: Se o snapshot estiver truncado ou corrompido
+    """
+    if verify:
+        verify_snapshot(path)
+
+    users = memories = 0
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-restore") as executor:
+        pending = []
+        batch: List[bytes] = []
+        for kind, payload in _read_lines(path):
+            if kind == "user":
+                batch.append(payload)
+                users += 1
+                if len(batch) < _BATCH_USERS:
+                    continue
+            if batch:
+                pending.append(executor.submit(_restore_batch, backend, batch, replace))
+                batch = []
+            # Limita os lotes em memória: a leitura espera as gravações mais antigas
+            while len(pending) > 2 * workers:
+                memories += pending.pop(0).result()
+        for future in pending:
+            memories += future.result()
+    return {"users": users, "memories": memories}
+
+
+def main(argv=None):
+    """CLI: python -m src.utils.memory_snapshot {export,import,verify} ARQUIVO"""
+    import argparse
+
+    from src.config import MEMORY_BACKEND
+    from src.utils.memory import create_memory_backend
+
+    parser = argparse.ArgumentParser(description="Exporta e importa snapshots das memórias")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("path", help="Arquivo do snapshot (ex: backup.jsonl.gz)")
+    parser.add_argument("--storage", default="storage/memory", help="Diretório das memórias")
+    parser.add_argument("--backend", default=MEMORY_BACKEND, choices=["sqlite", "json", "journal"])
+    parser.add_argument("--merge", action="store_true", help="Mescla em vez de substituir as memórias de cada usuário")
+    parser.add_argument("--workers", type=int, default=4, help="Threads de gravação na importação")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "verify":
+        stats = verify_snapshot(args.path)
+    else:
+        backend = create_memory_backend(args.storage, args.backend)
+        try:
+            if args.command == "export":
+                stats = export_snapshot(backend, args.path)
+            else:
+                stats = import_snapshot(backend, args.path, replace=not args.merge, workers=args.workers)
+        finally:
+            backend.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args.command}: {stats['users']} usuários, {stats['memories']} memórias em {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Limitador de taxa (token bucket) compartilhado entre threads e processos"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping, Optional
+
+from src.config import (
+    TODOIST_RATE_LIMIT,
+    TODOIST_RATE_WINDOW,
+    TODOIST_RATE_BURST,
+    TODOIST_RATE_RESERVE,
+    TODOIST_RATE_MAX_WAIT,
+    TODOIST_RATE_LIMIT_DB,
+)
+
+
+# Prioridades: leituras interativas podem usar todo o bucket; escritas em
+# segundo plano só consomem tokens acima da reserva das interativas.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class RateLimitTimeout(Exception):
+    """Tempo máximo de espera por um token excedido."""
+
+
+def retry_after_seconds(headers: Mapping[str, str], default: float) -> float:
+    """
+    Lê o header Retry-After (segundos ou data HTTP).
+
+    Args:
+        headers: Headers da resposta
+        default: Espera usada se o header estiver ausente ou inválido
+    """
+    value = headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def is_throttled(response) -> bool:
+    """
+    Indica se a resposta pede para reduzir o ritmo: 429, ou 503 com Retry-After.
+
+    Um 503 sem Retry-After é uma falha transitória comum (repetida com backoff).
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 503 and bool(response.headers.get("Retry-After"))
+
+
+class MemoryBucketBackend:
+    """Estado do bucket em memória (compartilhado apenas entre threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def take(self, name: str, rate: float, capacity: float, floor: float) -> float:
+        """Consome um token se houver mais que `floor`; senão retorna a espera em segundos."""
+        now = time.time()
+        with self._lock:
+            tokens, updated, blocked_until = self._state.get(name, (capacity, now, 0.0))
+            wait, tokens = _take(now, rate, capacity, floor, tokens, updated, blocked_until)
+            self._state[name] = (tokens, now, blocked_until)
+        return wait
+
+    def block(self, name: str, until: float):
+        """Bloqueia o bucket até o instante `until` (epoch)."""
+        with self._lock:
+            tokens, updated, blocked_until = self._state.get(name, (0.0, time.time(), 0.0))
+            self._state[name] = (tokens, updated, max(blocked_until, until))
+
+
+class SQLiteBucketBackend:
+    """Estado do bucket em SQLite, compartilhado entre workers da mesma máquina."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=10, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Com WAL, NORMAL evita um fsync por token consumido; no pior caso uma
+        # queda de energia perde as últimas atualizações do bucket
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def _transaction(self, name: str, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated, blocked_until FROM buckets WHERE name = ?", (name,)
+                ).fetchone()
+                result, state = fn(row)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)",
+                    (name, *state),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def take(self, name: str, rate: float, capacity: float, floor: float) -> float:
+        """Consome um token se houver mais que `floor`; senão retorna a espera em segundos."""
+        def fn(row):
+            now = time.time()
+            tokens, updated, blocked_until = row if row else (capacity, now, 0.0)
+            wait, tokens = _take(now, rate, capacity, floor, tokens, updated, blocked_until)
+            return wait, (tokens, now, blocked_until)
+        return self._transaction(name, fn)
+
+    def block(self, name: str, until: float):
+        """Bloqueia o bucket até o instante `until` (epoch)."""
+        def fn(row):
+            tokens, updated, blocked_until = row if row else (0.0, time.time(), 0.0)
+            return None, (tokens, updated, max(blocked_until, until))
+        self._transaction(name, fn)
+
+
+def _take(now, rate, capacity, floor, tokens, updated, blocked_until):
+    """Regra do token bucket: retorna (espera, tokens restantes)."""
+    tokens = min(capacity, tokens + max(now - updated, 0.0) * rate)
+    if now < blocked_until:
+        return blocked_until - now, tokens
+    if tokens - 1 >= floor:
+        return 0.0, tokens - 1
+    return (floor + 1 - tokens) / rate, tokens
+
+
+class RateLimiter:
+    """Agenda requisições respeitando a cota da API e o Retry-After do servidor."""
+
+    def __init__(
+        self,
+        name: str = "todoist",
+        rate_limit: int = TODOIST_RATE_LIMIT,
+        window: float = TODOIST_RATE_WINDOW,
+        burst: int = TODOIST_RATE_BURST,
+        reserve: float = TODOIST_RATE_RESERVE,
+        max_wait: float = TODOIST_RATE_MAX_WAIT,
+        db_path: Optional[Path] = TODOIST_RATE_LIMIT_DB,
+    ):
+        """
+        Inicializa o limitador.
+
+        Args:
+            name: Nome do bucket (ex: um por token de API)
+            rate_limit: Número de requisições permitidas por janela
+            window: Duração da janela em segundos
+            burst: Capacidade máxima do bucket (rajada permitida)
+            reserve: Fração do bucket reservada para leituras interativas
+            max_wait: Espera máxima por um token antes de desistir
+            db_path: Banco SQLite compartilhado entre processos (None = só em memória)
+        """
+        self.name = name
+        self.rate = rate_limit / window
+        self.capacity = float(burst)
+        self.reserve = self.capacity * reserve
+        self.max_wait = max_wait
+        self.backend = SQLiteBucketBackend(db_path) if db_path else MemoryBucketBackend()
+        self.throttled = 0
+        self._throttled_lock = threading.Lock()
+
+    def _floor(self, priority: int) -> float:
+        return 0.0 if priority == PRIORITY_INTERACTIVE else self.reserve
+
+    def _count_throttled(self):
+        # acquire() roda em várias threads (e acquire_async no event loop)
+        with self._throttled_lock:
+            self.throttled += 1
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Bloqueia até obter um token.
+
+        Raises:
+            RateLimitTimeout: Se a espera ultrapassar max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self.backend.take(self.name, self.rate, self.capacity, self._floor(priority))
+            if wait <= 0:
+                return
+            self._count_throttled()
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"Limite de requisições do Todoist atingido (aguarde {wait:.1f}s)")
+            time.sleep(wait)
+
+    async def acquire_async(self, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Versão assíncrona de acquire(), sem bloquear o event loop.
+
+        O backend SQLite (transação com busy timeout) roda em uma thread; só a
+        espera pelo token fica no loop.
+        """
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = await asyncio.to_thread(
+                self.backend.take, self.name, self.rate, self.capacity, self._floor(priority)
+            )
+            if wait <= 0:
+                return
+            self._count_throttled()
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"Limite de requisições do Todoist atingido (aguarde {wait:.1f}s)")
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """Suspende todas as requisições (de todos os workers) pelo tempo indicado."""
+        self.backend.block(self.name, time.time() + seconds)
+
+    async def penalize_async(self, seconds: float):
+        """Versão assíncrona de penalize(), com o backend fora do event loop."""
+        await asyncio.to_thread(self.backend.block, self.name, time.time() + seconds)
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Retorna o limitador de taxa compartilhado do processo."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,324 @@
+"""Renderização das tarefas do Todoist em texto para o agente"""
+
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.dates import to_local_datetime
+
+
+VERBOSE = "verbose"
+COMPACT = "compact"
+# Uma linha por tarefa separada por tabs; datas repetidas em sequência viram um grupo
+TABLE = "table"
+
+_PRIORITY_PREFIX = {
+    VERBOSE: {4: "🔴 ", 3: "🟡 ", 2: "🔵 "},
+    # Mesma notação da interface do Todoist (p1 = prioridade 4 na API)
+    COMPACT: {4: "p1 ", 3: "p2 ", 2: "p3 "},
+    TABLE: {4: "1", 3: "2", 2: "3"},
+}
+_TASK_TEMPLATE = {
+    VERBOSE: "⬜ {prefix}[{id}] {content}{due}",
+    COMPACT: "{prefix}[{id}] {content}{due}",
+    TABLE: "{id}\t{prefix}\t{time}\t{content}",
+}
+_COMPLETED_TEMPLATE = {
+    VERBOSE: "✅ {content}{info}",
+    COMPACT: "- {content}{info}",
+    TABLE: "{time}\t{content}",
+}
+_TABLE_TASK_COLUMNS = "id\tp\thora\ttarefa"
+_TABLE_COMPLETED_COLUMNS = "hora\ttarefa"
+
+# Categorias usadas no resumo das tarefas que não couberam no orçamento
+_OVERDUE = "vencidas"
+_TODAY = "hoje"
+_TOMORROW = "amanhã"
+_LATER = "futuras"
+_NO_DATE = "sem data"
+
+# Tokens reservados para a linha de resumo do que foi omitido
+_SUMMARY_TOKENS = 24
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens (~4 bytes UTF-8 por token; emojis contam mais)."""
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def _plural_days(days: int) -> str:
+    return f"{days} dia{'s' if days != 1 else ''}"
+
+
+class TaskRenderer:
+    """Renderiza listas de tarefas em uma passada, com datas de referência pré-calculadas."""
+
+    def __init__(self, mode: str = VERBOSE, today: Optional[date] = None, token_budget: int = 0):
+        """
+        Inicializa o renderizador.
+
+        Args:
+            mode: "verbose" (emojis, como na interface), "compact" (menos tokens)
+                  ou "table" (colunas separadas por tab, datas agrupadas)
+            today: Data de referência (padrão: hoje)
+            token_budget: Máximo estimado de tokens por listagem (0 = sem limite);
+                          o excedente é resumido em contagens
+        """
+        self.mode = mode if mode in _TASK_TEMPLATE else VERBOSE
+        self.today = today or date.today()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.yesterday = self.today - timedelta(days=1)
+        self.token_budget = token_budget
+        self.rendered = 0
+        self.omitted = 0
+        self._priority_prefix = _PRIORITY_PREFIX[self.mode]
+        self._task_template = _TASK_TEMPLATE[self.mode]
+        self._completed_template = _COMPLETED_TEMPLATE[self.mode]
+        # Muitas tarefas compartilham a mesma data: cada data é tratada uma vez
+        self._due_parts: Dict[Tuple[str, str], Tuple[Optional[date], Optional[str]]] = {}
+        self._due_labels: Dict[Tuple[str, str], str] = {}
+        self._completed_parts: Dict[str, Tuple[Optional[date], str]] = {}
+
+    def _parse_due(self, key: Tuple[str, str]) -> Tuple[Optional[date], Optional[str]]:
+        """(data, "HH:MM" ou None) de um vencimento; data None se for inválida."""
+        parts = self._due_parts.get(key)
+        if parts is None:
+            due_date, due_datetime = key
+            try:
+                if due_datetime:
+                    task_datetime = to_local_datetime(due_datetime)
+                    parts = (task_datetime.date(), f"{task_datetime.hour:02d}:{task_datetime.minute:02d}")
+                else:
+                    parts = (date.fromisoformat(due_date[:10]), None)
+            except ValueError:
+                parts = (None, None)
+            self._due_parts[key] = parts
+        return parts
+
+    @staticmethod
+    def _due_key(due: Optional[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        if not due or not due.get("date"):
+            return None
+        return due["date"], due.get("datetime", "")
+
+    def _build_due_label(self, key: Tuple[str, str]) -> str:
+        task_date, time_str = self._parse_due(key)
+        if task_date is None:
+            return f" ({key[0]})" if self.mode == COMPACT else f" 📅 [{key[0]}]"
+
+        if self.mode == COMPACT:
+            time_part = f" {time_str}" if time_str else ""
+            if task_date == self.today:
+                return f" (hoje{time_part})"
+            if task_date == self.tomorrow:
+                return f" (amanhã{time_part})"
+            if task_date < self.today:
+                return f" (vencida {(self.today - task_date).days}d)"
+            return f" ({task_date.day:02d}/{task_date.month:02d}{time_part})"
+
+        time_part = f" às {time_str}" if time_str else ""
+        if task_date == self.today:
+            return f" 📅 [HOJE{time_part}]"
+        if task_date == self.tomorrow:
+            return f" 📅 [AMANHÃ{time_part}]"
+        if task_date < self.today:
+            return f" ⚠️ [VENCIDA há {_plural_days((self.today - task_date).days)}]"
+        return f" 📅 [{task_date.day:02d}/{task_date.month:02d}{time_part}]"
+
+    def due_label(self, due: Optional[Dict[str, Any]]) -> str:
+        """Rótulo de vencimento de uma tarefa (vazio se não houver data)."""
+        key = self._due_key(due)
+        if key is None:
+            return ""
+        label = self._due_labels.get(key)
+        if label is None:
+            label = self._due_labels[key] = self._build_due_label(key)
+        return label
+
+    def _category(self, task: Dict[str, Any]) -> str:
+        key = self._due_key(task.get("due"))
+        task_date = self._parse_due(key)[0] if key else None
+        if task_date is None:
+            return _NO_DATE
+        if task_date < self.today:
+            return _OVERDUE
+        if task_date == self.today:
+            return _TODAY
+        if task_date == self.tomorrow:
+            return _TOMORROW
+        return _LATER
+
+    def _group_label(self, task: Dict[str, Any]) -> str:
+        """Linha de grupo do modo tabela ("@hoje", "@20/10", "@vencida 15/10"...)."""
+        key = self._due_key(task.get("due"))
+        if key is None:
+            return f"@{_NO_DATE}"
+        task_date = self._parse_due(key)[0]
+        if task_date is None:
+            return f"@{key[0]}"
+        if task_date == self.today:
+            return "@hoje"
+        if task_date == self.tomorrow:
+            return "@amanhã"
+        day = f"{task_date.day:02d}/{task_date.month:02d}"
+        return f"@vencida {day}" if task_date < self.today else f"@{day}"
+
+    def task_line(self, task: Dict[str, Any]) -> str:
+        """Uma linha de tarefa ativa."""
+        prefix = self._priority_prefix.get(task.get("priority", 1), "")
+        if self.mode == TABLE:
+            key = self._due_key(task.get("due"))
+            time_str = self._parse_due(key)[1] if key else None
+            return self._task_template.format(
+                id=task["id"], prefix=prefix, time=time_str or "", content=task["content"]
+            )
+        return self._task_template.format(
+            prefix=prefix,
+            id=task["id"],
+            content=task["content"],
+            due=self.due_label(task.get("due")),
+        )
+
+    def _render(self, lines: List[str], items: List[Dict[str, Any]], line_fn, group_fn, summary_fn) -> str:
+        """Acrescenta os itens a `lines` até o orçamento de tokens e resume o restante."""
+        budget = self.token_budget - _SUMMARY_TOKENS if self.token_budget > 0 else 0
+        used = sum(estimate_tokens(line) + 1 for line in lines)
+        group = None
+        self.rendered = 0
+        self.omitted = 0
+
+        for index, item in enumerate(items):
+            chunk = []
+            item_group = group_fn(item) if group_fn else None
+            if item_group is not None and item_group != group:
+                chunk.append(item_group)
+            chunk.append(line_fn(item))
+            cost = sum(estimate_tokens(line) + 1 for line in chunk)
+            # Ao menos um item é sempre exibido para a paginação avançar
+            if budget and index and used + cost > budget:
+                self.omitted = len(items) - index
+                lines.append(summary_fn(items[index:]))
+                break
+            lines.extend(chunk)
+            used += cost
+            group = item_group
+            self.rendered += 1
+
+        return "\n".join(lines) + "\n"
+
+    def _summarize_tasks(self, tasks: List[Dict[str, Any]]) -> str:
+        counts = Counter(map(self._category, tasks))
+        detail = ", ".join(
+            f"{counts[name]} {name}"
+            for name in (_OVERDUE, _TODAY, _TOMORROW, _LATER, _NO_DATE)
+            if counts[name]
+        )
+        return f"… +{len(tasks)} tarefas omitidas ({detail})"
+
+    def render_tasks(self, header: str, tasks: Iterable[Dict[str, Any]]) -> str:
+        """Renderiza o cabeçalho e as tarefas ativas, uma por linha."""
+        tasks = list(tasks)
+        lines = [header]
+        group_fn = None
+        if self.mode == TABLE:
+            lines.append(_TABLE_TASK_COLUMNS)
+            # Sem reordenar (o offset da próxima página depende da ordem): a
+            # listagem já vem ordenada por data, então cada data aparece uma vez
+            group_fn = self._group_label
+        return self._render(lines, tasks, self.task_line, group_fn, self._summarize_tasks)
+
+    def _parse_completed(self, completed_at: str) -> Tuple[Optional[date], str]:
+        """(data, "HH:MM") de uma conclusão; data None se for inválida."""
+        parts = self._completed_parts.get(completed_at)
+        if parts is None:
+            try:
+                completed_datetime = to_local_datetime(completed_at)
+                parts = (
+                    completed_datetime.date(),
+                    f"{completed_datetime.hour:02d}:{completed_datetime.minute:02d}",
+                )
+            except ValueError:
+                parts = (None, "")
+            self._completed_parts[completed_at] = parts
+        return parts
+
+    def _completed_label(self, completed_at: str) -> str:
+        if not completed_at:
+            return ""
+        completed_date, time_str = self._parse_completed(completed_at)
+        if completed_date is None:
+            return f" ({completed_at})" if self.mode == COMPACT else f" [Concluída em {completed_at}]"
+
+        day_str = f"{completed_date.day:02d}/{completed_date.month:02d}"
+        if self.mode == COMPACT:
+            if completed_date == self.today:
+                return f" (hoje {time_str})"
+            if completed_date == self.yesterday:
+                return f" (ontem {time_str})"
+            return f" ({day_str} {time_str})"
+
+        if completed_date == self.today:
+            return f" [Concluída HOJE às {time_str}]"
+        if completed_date == self.yesterday:
+            return f" [Concluída ONTEM às {time_str}]"
+        return f" [Concluída em {day_str} às {time_str}]"
+
+    def _completed_group(self, task: Dict[str, Any]) -> str:
+        completed_at = task.get("completed_at", "")
+        if not completed_at:
+            return f"@{_NO_DATE}"
+        completed_date = self._parse_completed(completed_at)[0]
+        if completed_date is None:
+            return f"@{completed_at}"
+        if completed_date == self.today:
+            return "@hoje"
+        if completed_date == self.yesterday:
+            return "@ontem"
+        return f"@{completed_date.day:02d}/{completed_date.month:02d}"
+
+    def completed_line(self, task: Dict[str, Any]) -> str:
+        """Uma linha de tarefa concluída."""
+        content = task.get("content", "Sem título")
+        completed_at = task.get("completed_at", "")
+        if self.mode == TABLE:
+            time_str = self._parse_completed(completed_at)[1] if completed_at else ""
+            return self._completed_template.format(time=time_str, content=content)
+        return self._completed_template.format(content=content, info=self._completed_label(completed_at))
+
+    def render_completed(self, header: str, tasks: Iterable[Dict[str, Any]]) -> str:
+        """Renderiza o cabeçalho e as tarefas concluídas, uma por linha."""
+        lines = [header]
+        group_fn = None
+        if self.mode == TABLE:
+            lines.append(_TABLE_COMPLETED_COLUMNS)
+            group_fn = self._completed_group
+        return self._render(
+            lines, list(tasks), self.completed_line, group_fn,
+            lambda rest: f"… +{len(rest)} tarefas concluídas omitidas",
+        )
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m src.utils.render
+    import timeit
+
+    today = date.today()
+    tasks = []
+    for i in range(5000):
+        due_day = today + timedelta(days=(i % 30) - 10)
+        due = {"date": due_day.isoformat()}
+        if i % 3 == 0:
+            due["datetime"] = f"{due_day.isoformat()}T{i % 24:02d}:30:00"
+        tasks.append({"id": str(i), "content": f"Tarefa {i}", "priority": 1 + i % 4, "due": due if i % 7 else None})
+    # Mesma ordem do espelho local (por data, sem data no fim)
+    tasks.sort(key=lambda task: (task["due"] is None, task["due"] and task["due"]["date"]))
+
+    for mode in (VERBOSE, COMPACT, TABLE):
+        runs = 20
+        elapsed = timeit.timeit(lambda: TaskRenderer(mode).render_tasks("Tarefas:", tasks), number=runs)
+        output = TaskRenderer(mode).render_tasks("Tarefas:", tasks)
+        print(
+            f"{mode}: {elapsed / runs * 1000:.2f} ms para {len(tasks)} tarefas "
+            f"(~{estimate_tokens(output):,} tokens)"
+        )
@@ -0,0 +1,361 @@
+"""Cache de respostas dos agentes por usuário (texto normalizado e similaridade)"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.config import (
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_SIMILARITY,
+    MEMORY_EMBEDDING_DIM,
+)
+from src.utils.embeddings import HashingEmbedder, VectorIndex, tokenize
+
+
+# Grupos (usuário, modo, dia) mantidos; os menos usados são descartados
+_MAX_BUCKETS = 1024
+# Usuários com geração própria (invalidate(user_id)); acima disso, as gerações
+# por usuário são zeradas e a global avança
+_MAX_USER_GENERATIONS = 4096
+# Execuções em streaming com mais eventos que isso não são guardadas
+_MAX_EVENTS = 10_000
+# Eventos que indicam execução incompleta (não reaproveitável)
+_FAILED_EVENTS = frozenset({"RunError", "RunPaused", "RunCancelled"})
+# Entradas extras que tornam a resposta diferente para o mesmo texto
+_MEDIA_ARGS = ("images", "audio", "videos", "files")
+# Opções do agente que colocam a conversa no contexto: a resposta depende da sessão
+_STATEFUL_FLAGS = ("add_history_to_context", "read_chat_history", "add_session_state_to_context")
+
+
+def normalize_prompt(text: str) -> str:
+    """Normaliza uma mensagem ("Quais minhas  TAREFAS de hoje?" -> "quais minhas tarefas de hoje")."""
+    return " ".join(tokenize(text))
+
+
+class _Bucket:
+    """Respostas de um usuário em um modo de execução, em um dia."""
+
+    __slots__ = ("entries", "index")
+
+    def __init__(self):
+        # Chave (texto exato ou normalizado) -> (expira_em, resposta)
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.index: Optional[VectorIndex] = None
+
+
+class ResponseCache:
+    """
+    Cache de respostas de agentes, separado por usuário.
+
+    Procura a mensagem pelo texto exato, depois pelo texto normalizado (sem
+    caixa, acentos e pontuação) e, opcionalmente, pela pergunta em cache mais
+    parecida. As entradas valem pelo TTL e só no dia em que foram geradas
+    ("hoje" muda de sentido à meia-noite). Cada invalidação avança uma geração:
+    uma execução que alterou dados durante o próprio processamento (ex: criou
+    uma tarefa) não é guardada. O cache e as invalidações valem só para o
+    processo atual.
+    """
+
+    def __init__(
+        self,
+        ttl: float = RESPONSE_CACHE_TTL,
+        maxsize: int = RESPONSE_CACHE_SIZE,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+        embedder=None,
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            ttl: Segundos de validade de cada resposta (0 desativa o cache)
+            maxsize: Entradas por usuário (as menos usadas são descartadas)
+            similarity: Similaridade mínima para reaproveitar uma pergunta parecida (0 = desativada)
+            embedder: Objeto com `dim` e `embed(texts)` (padrão: HashingEmbedder)
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.similarity = similarity
+        self.embedder = embedder
+        if similarity > 0 and embedder is None:
+            self.embedder = HashingEmbedder(MEMORY_EMBEDDING_DIM)
+        self._buckets: "OrderedDict[Tuple[str, Hashable, date], _Bucket]" = OrderedDict()
+        self._generation = 0
+        self._user_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def generation(self, user_id: str) -> Tuple[int, int]:
+        """Marca de invalidação do usuário, a ser repassada para set()."""
+        return self._generation, self._user_generations.get(user_id, 0)
+
+    def get(self, user_id: str, mode: Hashable, text: str) -> Optional[Any]:
+        """
+        Retorna a resposta em cache para uma mensagem.
+
+        Args:
+            user_id: Usuário da execução
+            mode: Modo da execução (respostas em streaming e completas não se misturam)
+            text: Mensagem do usuário
+
+        Returns:
+            A resposta guardada ou None se ausente/expirada
+        """
+        if not self.enabled:
+            return None
+        bucket_key = (user_id, mode, date.today())
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                self._buckets.move_to_end(bucket_key)
+                value = self._lookup(bucket, text, now)
+                if value is None:
+                    value = self._lookup(bucket, normalize_prompt(text), now)
+                if value is not None:
+                    self.hits += 1
+                    return value
+                if bucket.index is not None and len(bucket.index):
+                    query = self.embedder.embed([normalize_prompt(text)])[0]
+                    for key, score in bucket.index.search(query, k=1):
+                        if score >= self.similarity:
+                            value = self._lookup(bucket, key, now)
+                    if value is not None:
+                        self.hits += 1
+                        self.similar_hits += 1
+                        return value
+            self.misses += 1
+            return None
+
+    def _lookup(self, bucket: _Bucket, key: str, now: float) -> Optional[Any]:
+        entry = bucket.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if now >= expires_at:
+            self._discard(bucket, key)
+            return None
+        bucket.entries.move_to_end(key)
+        return value
+
+    def set(self, user_id: str, mode: Hashable, text: str, value: Any, generation: Tuple[int, int]):
+        """
+        Guarda a resposta de uma mensagem.
+
+        Args:
+            user_id: Usuário da execução
+            mode: Modo da execução
+            text: Mensagem do usuário
+            value: Resposta a guardar
+            generation: Valor de generation() lido antes da execução; se houve
+                invalidação desde então, a resposta é descartada
+        """
+        if not self.enabled:
+            return
+        normalized = normalize_prompt(text)
+        vector = None
+        if self.embedder is not None and self.similarity > 0 and normalized:
+            vector = self.embedder.embed([normalized])[0]
+        bucket_key = (user_id, mode, date.today())
+        entry = (time.monotonic() + self.ttl, value)
+        with self._lock:
+            if generation != self.generation(user_id):
+                return
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = self._buckets[bucket_key] = _Bucket()
+                while len(self._buckets) > _MAX_BUCKETS:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(bucket_key)
+            for key in {text, normalized}:
+                bucket.entries[key] = entry
+                bucket.entries.move_to_end(key)
+            if vector is not None:
+                if bucket.index is None:
+                    bucket.index = VectorIndex(self.embedder.dim)
+                bucket.index.add(normalized, vector)
+            while len(bucket.entries) > self.maxsize:
+                self._discard(bucket, next(iter(bucket.entries)))
+
+    @staticmethod
+    def _discard(bucket: _Bucket, key: str):
+        del bucket.entries[key]
+        if bucket.index is not None:
+            bucket.index.remove(key)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """
+        Descarta as respostas de um usuário (ou de todos, com user_id=None).
+
+        Execuções em andamento do usuário também deixam de ser guardadas.
+        """
+        with self._lock:
+            if user_id is None:
+                self._generation += 1
+                self._buckets.clear()
+                self._user_generations.clear()
+                return
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+            if len(self._user_generations) > _MAX_USER_GENERATIONS:
+                # Zerar faria uma marca antiga voltar a valer: a geração global
+                # avança e descarta todas as execuções em andamento
+                self._user_generations.clear()
+                self._generation += 1
+            for bucket_key in [key for key in self._buckets if key[0] == user_id]:
+                del self._buckets[bucket_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Estatísticas de uso do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "buckets": len(self._buckets),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def wrap(self, agent):
+        """
+        Coloca o cache na frente de agent.run e agent.arun.
+
+        Só passam pelo cache mensagens de texto sem anexos; o usuário vem do
+        argumento user_id (ou do agente, ou "default"). Em streaming, os eventos
+        da execução são gravados e repetidos num acerto.
+
+        Apenas agentes sem estado de conversa são cacheados: com o histórico no
+        contexto, a resposta a "sim" ou "e amanhã?" depende da sessão, e um
+        acerto (que não passa pelo agente) não seria registrado no histórico.
+        Com o cache desativado ou um agente com histórico, o agente é retornado
+        sem alterações.
+
+        Args:
+            agent: Agente agno
+
+        Returns:
+            O próprio agente
+        """
+        if not self.enabled or any(getattr(agent, flag, False) for flag in _STATEFUL_FLAGS):
+            return agent
+        run, arun = agent.run, agent.arun
+
+        def cache_key(args, kwargs) -> Optional[Tuple[str, Hashable, str]]:
+            text = args[0] if args else kwargs.get("input")
+            if not isinstance(text, str) or any(kwargs.get(name) for name in _MEDIA_ARGS):
+                return None
+            user_id = kwargs.get("user_id") or getattr(agent, "user_id", None) or "default"
+            stream = kwargs.get("stream")
+            if stream is None:
+                stream = getattr(agent, "stream", None)
+            events = kwargs.get("stream_events", kwargs.get("stream_intermediate_steps"))
+            if events is None:
+                events = getattr(agent, "stream_events", getattr(agent, "stream_intermediate_steps", None))
+            return user_id, (bool(stream), bool(stream and events)), text
+
+        def cached_run(*args, **kwargs):
+            key = cache_key(args, kwargs)
+            if key is None:
+                return run(*args, **kwargs)
+            user_id, mode, text = key
+            cached = self.get(user_id, mode, text)
+            generation = self.generation(user_id)
+            if mode[0]:
+                return self._replay(cached) if cached is not None else self._record(
+                    run(*args, **kwargs), key, generation
+                )
+            if cached is not None:
+                return copy.copy(cached)
+            result = run(*args, **kwargs)
+            if _completed(result):
+                self.set(user_id, mode, text, result, generation)
+            return result
+
+        def cached_arun(*args, **kwargs):
+            key = cache_key(args, kwargs)
+            if key is None:
+                return arun(*args, **kwargs)
+            user_id, mode, text = key
+            cached = self.get(user_id, mode, text)
+            generation = self.generation(user_id)
+            if mode[0]:
+                return self._areplay(cached) if cached is not None else self._arecord(
+                    arun(*args, **kwargs), key, generation
+                )
+
+            async def complete():
+                if cached is not None:
+                    return copy.copy(cached)
+                result = await arun(*args, **kwargs)
+                if _completed(result):
+                    self.set(user_id, mode, text, result, generation)
+                return result
+
+            return complete()
+
+        agent.run = cached_run
+        agent.arun = cached_arun
+        return agent
+
+    @staticmethod
+    def _replay(events):
+        yield from events
+
+    @staticmethod
+    async def _areplay(events):
+        for event in events:
+            yield event
+
+    def _record(self, stream, key, generation):
+        events = []
+        for event in stream:
+            events.append(event)
+            yield event
+        self._store_events(events, key, generation)
+
+    async def _arecord(self, stream, key, generation):
+        events = []
+        async for event in stream:
+            events.append(event)
+            yield event
+        self._store_events(events, key, generation)
+
+    def _store_events(self, events, key, generation):
+        """Guarda os eventos de um streaming que terminou sem erro nem pausa."""
+        if len(events) > _MAX_EVENTS:
+            return
+        if any(str(getattr(event, "event", "")) in _FAILED_EVENTS for event in events):
+            return
+        user_id, mode, text = key
+        self.set(user_id, mode, text, tuple(events), generation)
+
+
+def _completed(result) -> bool:
+    """Indica se uma execução terminou normalmente (sem erro, pausa ou cancelamento)."""
+    status = getattr(result, "status", None)
+    if status is None:
+        return result is not None
+    return str(getattr(status, "value", status)).lower() == "completed"
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Retorna o cache de respostas compartilhado do processo."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
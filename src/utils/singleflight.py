@@ -0,0 +1,121 @@
+"""Coalescência de chamadas idênticas em andamento (single-flight)"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Compartilha uma única execução entre chamadas concorrentes com a mesma chave.
+
+    A primeira chamada (líder) executa a função; as que chegam enquanto ela está
+    em andamento esperam e recebem o mesmo resultado (ou a mesma exceção).
+    Chamadas síncronas (threads) e assíncronas compartilham as mesmas execuções.
+    Nada é guardado depois que a execução termina: cache é responsabilidade de
+    quem chama.
+    """
+
+    def __init__(self):
+        # Chave -> (Future com o resultado, loop do líder assíncrono ou None)
+        self._calls: Dict[Hashable, Tuple[Future, Optional[asyncio.AbstractEventLoop]]] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable, loop: Optional[asyncio.AbstractEventLoop]):
+        """Retorna (future, é_líder), registrando uma nova execução se não houver."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and not (loop is None and _is_current_loop(call[1])):
+                self.shared += 1
+                return call[0], False
+            future: Future = Future()
+            self._calls[key] = (future, loop)
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call[0] is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args) -> Any:
+        """
+        Executa func(*args), ou espera a execução em andamento com a mesma chave.
+
+        Args:
+            key: Identifica chamadas equivalentes
+            func: Função a executar (só pelo líder)
+
+        Returns:
+            O resultado compartilhado
+
+        Raises:
+            A exceção levantada pela execução compartilhada
+        """
+        future, leader = self._join(key, None)
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """
+        Versão assíncrona de do(): func(*args) deve retornar um awaitable.
+
+        A execução roda em uma task própria: o cancelamento de quem espera
+        (inclusive do líder) não interrompe as outras chamadas.
+        """
+        loop = asyncio.get_running_loop()
+        future, leader = self._join(key, loop)
+        if leader:
+            task = loop.create_task(func(*args))
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key: Hashable, future: Future, task: "asyncio.Task"):
+        """Repassa o resultado da task do líder para o Future compartilhado."""
+        self._finish(key, future)
+        if task.cancelled():
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def forget(self):
+        """
+        Desassocia as execuções em andamento: novas chamadas iniciam outra execução.
+
+        Use após uma escrita, para que leituras posteriores não recebam um
+        resultado buscado antes dela. Quem já espera recebe o resultado normalmente,
+        e a execução órfã continua até o fim: se ela grava o resultado em um cache,
+        a gravação deve ser condicionada (ver TTLCache.set com `generation`).
+        """
+        with self._lock:
+            self._calls.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Execuções iniciadas, chamadas atendidas por uma execução alheia e em andamento."""
+        with self._lock:
+            return {"leaders": self.leaders, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+def _is_current_loop(loop: Optional[asyncio.AbstractEventLoop]) -> bool:
+    """Indica se o loop está rodando nesta thread (esperar por ele travaria o loop)."""
+    if loop is None:
+        return False
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
@@ -0,0 +1,133 @@
+"""Parser incremental de arrays JSON para respostas grandes da API"""
+
+import codecs
+import json
+from typing import Any, AsyncIterable, Iterable, Iterator, AsyncIterator, Optional, Union
+
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class JSONArrayParser:
+    """Extrai os elementos de um array JSON à medida que os bytes chegam."""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self.finished = False
+
+    def feed(self, chunk: Union[bytes, str], final: bool = False) -> Iterator[Any]:
+        """
+        Adiciona um pedaço da resposta e retorna os elementos completos.
+
+        Args:
+            chunk: Próximo pedaço do corpo da resposta
+            final: Indica que não há mais dados
+
+        Raises:
+            ValueError: Se o conteúdo não for um array JSON válido
+        """
+        text = chunk if isinstance(chunk, str) else self._utf8.decode(chunk, final)
+        # Descarta o que já foi consumido para não crescer o buffer indefinidamente
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return self._drain(final)
+
+    def _skip(self, chars: str):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in chars:
+            self._pos += 1
+
+    def _drain(self, final: bool) -> Iterator[Any]:
+        buffer = self._buffer
+        while not self.finished:
+            self._skip(_WHITESPACE)
+            if self._pos >= len(buffer):
+                break
+
+            if not self._started:
+                if buffer[self._pos] != "[":
+                    raise ValueError("Resposta não é um array JSON")
+                self._started = True
+                self._pos += 1
+                continue
+
+            self._skip(_WHITESPACE + ",")
+            if self._pos >= len(buffer):
+                break
+            if buffer[self._pos] == "]":
+                self._pos += 1
+                self.finished = True
+                break
+
+            try:
+                value, end = self._decoder.raw_decode(buffer, self._pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Array JSON truncado")
+                break
+            # Um valor só está completo quando seguido de separador: "4." ou
+            # "1500" podem continuar no próximo pedaço
+            if not final and (end >= len(buffer) or buffer[end] not in _DELIMITERS):
+                break
+            self._pos = end
+            yield value
+
+        if final and not self.finished:
+            raise ValueError("Array JSON truncado")
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]]) -> Iterator[Any]:
+    """
+    Itera sobre os elementos de um array JSON recebido em pedaços.
+
+    Args:
+        chunks: Iterável de pedaços (ex: response.iter_content(chunk_size))
+    """
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.feed(b"", final=True)
+
+
+async def aiter_json_array(chunks: AsyncIterable[Union[bytes, str]]) -> AsyncIterator[Any]:
+    """Versão assíncrona de iter_json_array (ex: response.aiter_bytes())."""
+    parser = JSONArrayParser()
+    async for chunk in chunks:
+        for value in parser.feed(chunk):
+            yield value
+    for value in parser.feed(b"", final=True):
+        yield value
+
+
+def paginate(items: Iterable[Any], offset: int = 0, limit: Optional[int] = None):
+    """
+    Aplica offset/limit a um iterável sem materializá-lo.
+
+    Returns:
+        Tupla (página, há_mais) — lê no máximo offset + limit + 1 elementos
+    """
+    page = []
+    for index, item in enumerate(items):
+        if index < offset:
+            continue
+        if limit is not None and len(page) >= limit:
+            return page, True
+        page.append(item)
+    return page, False
+
+
+async def apaginate(items: AsyncIterable[Any], offset: int = 0, limit: Optional[int] = None):
+    """Versão assíncrona de paginate()."""
+    page = []
+    index = 0
+    async for item in items:
+        if index >= offset:
+            if limit is not None and len(page) >= limit:
+                return page, True
+            page.append(item)
+        index += 1
+    return page, False
@@ -0,0 +1,367 @@
+"""Espelho local das tarefas do Todoist sincronizado incrementalmente via Sync API"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import (
+    STORAGE_DIR,
+    TODOIST_SYNC_URL,
+    TODOIST_MIRROR_MAX_AGE,
+)
+from src.utils.http_client import TodoistClient, get_todoist_client
+from src.utils.async_client import AsyncTodoistClient, get_async_todoist_client
+from src.utils.rate_limit import PRIORITY_INTERACTIVE
+from src.utils.dates import resolve_filter, to_local_datetime
+from src.utils.singleflight import SingleFlight
+
+
+SYNC_ENDPOINT = f"{TODOIST_SYNC_URL}/sync"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 1,
+    project_id TEXT,
+    due_date TEXT,
+    due_datetime TEXT,
+    child_order INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (due_date, due_datetime);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class TodoistAPIError(RuntimeError):
+    """Erro HTTP retornado pela API do Todoist (a mensagem é o status)."""
+
+    def __init__(self, status_code: int):
+        super().__init__(str(status_code))
+        self.status_code = status_code
+
+
+# Formato das colunas de vencimento; espelhos gravados em outro formato (datas
+# UTC) são descartados na próxima sincronização, que passa a ser completa
+_DUE_FORMAT = "local"
+
+_ORDER_BY = "ORDER BY due_date IS NULL, due_date, due_datetime, child_order"
+
+
+def _normalize_due(due: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extrai (data, data-hora) locais de um campo due da Sync API ou da REST API.
+
+    Tarefas com fuso fixo vêm em UTC ("...Z"): a data-hora é convertida para o
+    horário local antes de derivar a data, para que "hoje" e "vencidas" usem o
+    mesmo dia e hora do usuário.
+    """
+    if not due or not due.get("date"):
+        return None, None
+    raw = due["date"]
+    due_datetime = due.get("datetime") or (raw if "T" in raw else None)
+    if not due_datetime:
+        return raw[:10], None
+    try:
+        local = to_local_datetime(due_datetime)
+    except ValueError:
+        return raw[:10], None
+    return local.date().isoformat(), local.isoformat(timespec="seconds")
+
+
+class TaskMirror:
+    """Réplica SQLite das tarefas ativas, atualizada com deltas do sync_token."""
+
+    def __init__(
+        self,
+        db_path: Path = STORAGE_DIR / "todoist_mirror.db",
+        client: Optional[TodoistClient] = None,
+        max_age: float = TODOIST_MIRROR_MAX_AGE,
+    ):
+        """
+        Inicializa o espelho local.
+
+        Args:
+            db_path: Caminho do banco SQLite
+            client: Cliente HTTP usado na sincronização (padrão: cliente compartilhado)
+            max_age: Segundos entre sincronizações incrementais automáticas
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self._client = client
+        self._lock = threading.RLock()
+        self._last_sync = 0.0
+        # Sincronizações simultâneas (threads e event loop) compartilham uma única requisição
+        self._flights = SingleFlight()
+        # Numeração das requisições de sincronização: respostas de requisições com
+        # número menor que _sync_floor (iniciadas antes da última aplicada ou de
+        # uma escrita local) são descartadas
+        self._sync_started = 0
+        self._sync_floor = 0
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'due_format'").fetchone()
+        if row is None or row["value"] != _DUE_FORMAT:
+            self._conn.execute("DELETE FROM meta WHERE key = 'sync_token'")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('due_format', ?)", (_DUE_FORMAT,))
+
+    @property
+    def client(self) -> TodoistClient:
+        return self._client or get_todoist_client()
+
+    @property
+    def sync_token(self) -> str:
+        """Token da última sincronização ("*" força sincronização completa)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'sync_token'").fetchone()
+        return row["value"] if row else "*"
+
+    def sync_payload(self) -> Dict[str, Any]:
+        """Corpo da requisição de sincronização incremental."""
+        return {"sync_token": self.sync_token, "resource_types": ["items"]}
+
+    def _begin_sync(self) -> Tuple[int, Dict[str, Any]]:
+        """Numera uma nova requisição de sincronização e monta seu corpo."""
+        with self._lock:
+            self._sync_started += 1
+            return self._sync_started, self.sync_payload()
+
+    def apply(self, data: Dict[str, Any], request: Optional[int] = None) -> int:
+        """
+        Aplica uma resposta da Sync API ao espelho.
+
+        Args:
+            data: JSON retornado pelo endpoint /sync
+            request: Número da requisição (de _begin_sync); a resposta é descartada
+                se uma requisição iniciada depois dela já foi aplicada ou se houve
+                mark_stale() desde o início dela
+
+        Returns:
+            Número de tarefas alteradas
+        """
+        items = data.get("items", [])
+        with self._lock:
+            if request is not None and request < self._sync_floor:
+                return 0
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if data.get("full_sync"):
+                    self._conn.execute("DELETE FROM tasks")
+                for item in items:
+                    if item.get("is_deleted") or item.get("checked"):
+                        self._conn.execute("DELETE FROM tasks WHERE id = ?", (str(item["id"]),))
+                    else:
+                        self._upsert(item)
+                if data.get("sync_token"):
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('sync_token', ?)",
+                        (data["sync_token"],),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if request is not None:
+                self._sync_floor = request
+            self._last_sync = time.monotonic()
+        return len(items)
+
+    def sync(self) -> int:
+        """
+        Busca na Sync API apenas as mudanças desde o último sync_token.
+
+        A requisição é feita fora do lock (leituras do espelho não esperam a
+        rede) e chamadas simultâneas compartilham a mesma requisição.
+
+        Returns:
+            Número de tarefas alteradas
+
+        Raises:
+            requests.RequestException: Em falhas de rede
+            TodoistAPIError: Se a API responder com erro
+        """
+        return self._flights.do("sync", self._sync)
+
+    def _sync(self) -> int:
+        request, payload = self._begin_sync()
+        response = self.client.post(SYNC_ENDPOINT, json=payload, priority=PRIORITY_INTERACTIVE)
+        if response.status_code != 200:
+            raise TodoistAPIError(response.status_code)
+        return self.apply(response.json(), request)
+
+    async def async_sync(self, client: Optional[AsyncTodoistClient] = None) -> int:
+        """
+        Versão assíncrona de sync(), usando o cliente httpx do event loop.
+
+        O acesso ao SQLite roda em uma thread, sem bloquear o event loop.
+
+        Raises:
+            httpx.HTTPError: Em falhas de rede
+            TodoistAPIError: Se a API responder com erro
+        """
+        return await self._flights.ado("sync", self._async_sync, client)
+
+    async def _async_sync(self, client: Optional[AsyncTodoistClient]) -> int:
+        client = client or get_async_todoist_client()
+        request, payload = await asyncio.to_thread(self._begin_sync)
+        response = await client.post(SYNC_ENDPOINT, json=payload, priority=PRIORITY_INTERACTIVE)
+        if response.status_code != 200:
+            raise TodoistAPIError(response.status_code)
+        return await asyncio.to_thread(self.apply, response.json(), request)
+
+    def is_stale(self) -> bool:
+        """Indica se o espelho precisa de nova sincronização."""
+        return time.monotonic() - self._last_sync >= self.max_age
+
+    def ensure_fresh(self) -> int:
+        """Sincroniza apenas se o espelho estiver desatualizado."""
+        if self.is_stale():
+            return self.sync()
+        return 0
+
+    async def async_ensure_fresh(self, client: Optional[AsyncTodoistClient] = None) -> int:
+        """Versão assíncrona de ensure_fresh()."""
+        if self.is_stale():
+            return await self.async_sync(client)
+        return 0
+
+    def mark_stale(self):
+        """
+        Força uma sincronização incremental na próxima leitura.
+
+        Chamado após cada escrita local: a sincronização em voo (iniciada antes
+        da escrita) não é reaproveitada e sua resposta é descartada, pois poderia
+        remover uma tarefa recém-criada ou devolver uma recém-concluída.
+        """
+        with self._lock:
+            self._flights.forget()
+            self._sync_floor = self._sync_started + 1
+            self._last_sync = 0.0
+
+    def _upsert(self, item: Dict[str, Any]):
+        due_date, due_datetime = _normalize_due(item.get("due"))
+        self._conn.execute(
+            """
+            INSERT INTO tasks (id, content, priority, project_id, due_date, due_datetime, child_order, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                content = excluded.content,
+                priority = excluded.priority,
+                project_id = excluded.project_id,
+                due_date = excluded.due_date,
+                due_datetime = excluded.due_datetime,
+                child_order = excluded.child_order,
+                data = excluded.data
+            """,
+            (
+                str(item["id"]),
+                item.get("content", ""),
+                item.get("priority", 1),
+                item.get("project_id"),
+                due_date,
+                due_datetime,
+                item.get("child_order") or item.get("order") or 0,
+                json.dumps(item, ensure_ascii=False),
+            ),
+        )
+
+    def upsert_task(self, item: Dict[str, Any]):
+        """Insere ou atualiza uma tarefa localmente (ex: após criá-la pela REST API)."""
+        with self._lock:
+            self._upsert(item)
+
+    def remove_task(self, task_id: str):
+        """Remove uma tarefa localmente (ex: após concluí-la)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (str(task_id),))
+
+    @staticmethod
+    def _filter_clause(filter: Optional[str]) -> Tuple[str, List[Any]]:
+        """Traduz o filtro em linguagem natural para uma cláusula SQL."""
+        resolved = resolve_filter(filter)
+        if resolved is None:
+            return "", []
+        if resolved.overdue:
+            now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+            return "WHERE due_date < ? OR due_datetime < ?", [resolved.end.isoformat(), now]
+
+        conditions, params = [], []
+        if resolved.start is not None:
+            conditions.append("due_date >= ?")
+            params.append(resolved.start.isoformat())
+        if resolved.end is not None:
+            conditions.append("due_date < ?")
+            params.append(resolved.end.isoformat())
+        return "WHERE " + " AND ".join(conditions), params
+
+    def list_tasks(
+        self,
+        filter: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista tarefas do espelho local.
+
+        Args:
+            filter: Mesmo filtro aceito por list_todoist_tasks
+            limit: Número máximo de tarefas (None = todas)
+            offset: Número de tarefas a pular (paginação)
+
+        Returns:
+            Lista de tarefas no formato da REST API (id, content, priority, due)
+        """
+        where, params = self._filter_clause(filter)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, content, priority, project_id, due_date, due_datetime FROM tasks {where} {_ORDER_BY} "
+                "LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset],
+            ).fetchall()
+
+        tasks = []
+        for row in rows:
+            due = None
+            if row["due_date"]:
+                due = {"date": row["due_date"]}
+                if row["due_datetime"]:
+                    due["datetime"] = row["due_datetime"]
+            tasks.append({
+                "id": row["id"],
+                "content": row["content"],
+                "priority": row["priority"],
+                "project_id": row["project_id"],
+                "due": due,
+            })
+        return tasks
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        self._conn.close()
+
+
+_mirror: Optional[TaskMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_task_mirror() -> TaskMirror:
+    """Retorna o espelho de tarefas compartilhado do processo."""
+    global _mirror
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = TaskMirror()
+    return _mirror
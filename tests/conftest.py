@@ -0,0 +1,47 @@
+"""Fixtures compartilhadas dos testes"""
+
+import threading
+
+import pytest
+
+from src.tools import todoist
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    """
+    Lista de tarefas servida por um _fetch_task_page falso (sem rede nem espelho).
+
+    Atribua state["pause"] = (iniciada, continuar) para que a próxima busca
+    sinalize `iniciada` e espere `continuar` antes de retornar a página lida.
+    """
+    monkeypatch.setattr(todoist, "TODOIST_MIRROR_ENABLED", False)
+    monkeypatch.setattr(todoist.task_list_cache, "ttl", 60)
+    todoist.task_list_cache.clear()
+    todoist.read_flights.forget()
+
+    state = {"tasks": [{"id": "1", "content": "velha", "priority": 1}], "pause": None}
+
+    def fetch(filter, limit, offset):
+        page = (list(state["tasks"]), False)
+        pause, state["pause"] = state["pause"], None
+        if pause is not None:
+            started, resume = pause
+            started.set()
+            resume.wait(5)
+        return page
+
+    monkeypatch.setattr(todoist, "_fetch_task_page", fetch)
+    yield state
+    todoist.task_list_cache.clear()
+
+
+def paused_read(state, *args):
+    """Inicia list_todoist_tasks em uma thread e retorna quando a busca estiver em voo."""
+    started, resume = threading.Event(), threading.Event()
+    state["pause"] = (started, resume)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(todoist.list_todoist_tasks.entrypoint(*args)))
+    reader.start()
+    assert started.wait(5)
+    return reader, resume, results
@@ -0,0 +1,51 @@
+"""Testes do cliente HTTP compartilhado do Todoist"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.http_client import TodoistClient
+from src.utils.rate_limit import RateLimiter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_stats_report_requests_and_reused_connections(server):
+    limiter = RateLimiter(rate_limit=1000, window=1, burst=1000, db_path=None)
+    client = TodoistClient(base_url=server, headers={}, rate_limiter=limiter)
+    for _ in range(3):
+        assert client.get("/tasks").json() == []
+
+    stats = client.stats()
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    pool = stats["pools"][server]
+    # Keep-alive: as três requisições usam a mesma conexão
+    assert pool["connections_opened"] == 1
+    assert pool["requests"] == 3
+    assert pool["idle_connections"] == 1
+    client.close()
@@ -0,0 +1,169 @@
+"""Testes do MemoryManager e dos backends de memória"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.utils.memory import JSONMemoryBackend, MemoryManager, create_memory_backend
+
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def _manager(path, backend="json", **kwargs):
+    kwargs.setdefault("sync_interval", 0)
+    return MemoryManager(str(path), backend=create_memory_backend(path, backend), **kwargs)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_round_trip(tmp_path, backend):
+    """O que um processo grava, outro lê do disco."""
+    memory = _manager(tmp_path, backend, max_memories=0)
+    memory.remember("cidade", "Recife", user_id="ana")
+    memory.remember("time", {"nome": "Sport"}, user_id="ana")
+    memory.remember("cidade", "Natal", user_id="bia")
+    memory.close()
+
+    reloaded = _manager(tmp_path, backend, max_memories=0)
+    assert reloaded.recall("cidade", "ana") == "Recife"
+    assert reloaded.recall("time", "ana") == {"nome": "Sport"}
+    assert reloaded.recall("cidade", "bia") == "Natal"
+    assert dict(reloaded.backend.iter_users()).keys() == {"ana", "bia"}
+    reloaded.close()
+
+
+def test_json_backend_reads_legacy_file(tmp_path):
+    """Arquivos do formato anterior (sem shards, na raiz) continuam legíveis."""
+    legacy = tmp_path / "ana_memory.json"
+    record = {"value": "Recife", "timestamp": "2026-01-01T00:00:00"}
+    legacy.write_text(json.dumps({"ana": {"cidade": record}}), encoding="utf-8")
+
+    memory = _manager(tmp_path, max_memories=0)
+    assert memory.recall("cidade", "ana") == "Recife"
+
+    # A primeira escrita migra para o arquivo com shard e remove o antigo
+    memory.remember("time", "Sport", user_id="ana")
+    assert not legacy.exists()
+    memory.close()
+    reloaded = _manager(tmp_path, max_memories=0)
+    assert reloaded.recall("cidade", "ana") == "Recife"
+    assert reloaded.recall("time", "ana") == "Sport"
+
+
+@pytest.mark.parametrize("backend", ("json", "journal"))
+@pytest.mark.parametrize("user_id", ["../../fora", "/etc/passwd", "..", ".oculto", "~abc", "a/b\\c", "ação"])
+def test_unsafe_user_id_stays_inside_storage(tmp_path, backend, user_id):
+    """O user_id vem do cliente: nunca escolhe o caminho do arquivo."""
+    storage = tmp_path / "memory"
+    memory = _manager(storage, backend, max_memories=0)
+    memory.remember("cidade", "Recife", user_id=user_id)
+    memory.close()
+
+    for directory, _, files in os.walk(tmp_path):
+        for name in files:
+            assert Path(directory, name).resolve().is_relative_to(storage.resolve())
+
+    reloaded = _manager(storage, backend, max_memories=0)
+    assert reloaded.recall("cidade", user_id) == "Recife"
+    # A exportação recupera o user_id original a partir do nome em hash
+    assert [uid for uid, _ in reloaded.backend.iter_users()] == [user_id]
+
+
+def test_safe_user_id_keeps_readable_file_name(tmp_path):
+    backend = JSONMemoryBackend(tmp_path)
+    assert Path(backend._get_memory_file("ana.silva@example.com")).name == "ana.silva@example.com_memory.json"
+    assert Path(backend._get_memory_file("../ana")).name.startswith("~")
+    assert backend._get_legacy_file("../ana") is None
+
+
+@pytest.mark.parametrize("backend", ("json", "journal"))
+def test_lookups_of_unknown_users_create_no_files(tmp_path, backend):
+    memory = _manager(tmp_path, backend, max_memories=0)
+    for n in range(50):
+        assert memory.recall("cidade", f"desconhecido{n}") is None
+        assert memory.get_all_memories(f"../desconhecido{n}") == {}
+    assert list(tmp_path.iterdir()) == []
+
+    memory.remember("cidade", "Recife", user_id="ana")
+    assert memory.recall("cidade", "ana") == "Recife"
+    memory.close()
+
+
+def test_buffered_changes_are_flushed_on_exit(tmp_path):
+    """No modo "buffered", o que estava pendente é gravado ao encerrar o processo."""
+    script = (
+        "import sys\n"
+        "from src.utils.memory import MemoryManager, create_memory_backend\n"
+        "path = sys.argv[1]\n"
+        "memory = MemoryManager(path, backend=create_memory_backend(path, 'json'),\n"
+        "                       durability='buffered', flush_interval=3600, flush_count=10_000)\n"
+        "memory.remember('cidade', 'Recife', user_id='ana')\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], cwd=ROOT, check=True, timeout=60)
+
+    assert _manager(tmp_path, max_memories=0).recall("cidade", "ana") == "Recife"
+
+
+class _FlakyBackend(JSONMemoryBackend):
+    """Backend JSON cujas primeiras gravações falham."""
+
+    def __init__(self, storage_path, failures):
+        super().__init__(storage_path)
+        self.failures = failures
+        self.attempts = []
+        self.written = False
+
+    def upsert_many(self, *args):
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise OSError("disco indisponível")
+        super().upsert_many(*args)
+        self.written = True
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_failed_background_flush_is_retried_with_backoff(tmp_path):
+    backend = _FlakyBackend(tmp_path, failures=3)
+    memory = MemoryManager(str(tmp_path), backend=backend, durability="buffered", sync_interval=0,
+                           flush_interval=0.05, flush_count=10_000, flush_max_backoff=0.3, max_memories=0)
+    memory.remember("cidade", "Recife", user_id="ana")
+
+    deadline = time.monotonic() + 10
+    while not backend.written and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(backend.attempts) == backend.failures + 1
+    # A espera entre as tentativas cresce a cada falha, até o limite
+    gaps = [b - a for a, b in zip(backend.attempts, backend.attempts[1:])]
+    assert gaps[0] < gaps[1] < 0.3 + 0.1
+    assert _manager(tmp_path, max_memories=0).recall("cidade", "ana") == "Recife"
+    memory.close()
+
+
+def test_ttl_expires_memories(tmp_path):
+    memory = _manager(tmp_path, max_memories=0)
+    memory.remember("efêmera", 1, user_id="ana", ttl=0.05)
+    memory.remember("fixa", 2, user_id="ana", ttl=0)
+    assert memory.recall("efêmera", "ana") == 1
+    time.sleep(0.1)
+    assert memory.recall("efêmera", "ana") is None
+    assert memory.recall("fixa", "ana") == 2
+    memory.close()
+
+    # A remoção também chega ao disco
+    assert _manager(tmp_path, max_memories=0).get_all_memories("ana").keys() == {"fixa"}
+
+
+def test_lru_eviction_keeps_recalled_memories(tmp_path):
+    memory = _manager(tmp_path, max_memories=2, eviction_policy="lru")
+    memory.remember("a", 1, user_id="ana")
+    memory.remember("b", 2, user_id="ana")
+    memory.recall("a", "ana")
+    memory.remember("c", 3, user_id="ana")
+    assert memory.get_all_memories("ana").keys() == {"a", "c"}
+    memory.close()
@@ -0,0 +1,75 @@
+"""Testes de memórias compartilhadas entre processos (workers)"""
+
+import multiprocessing
+
+import pytest
+
+from src.utils.memory import MemoryManager, create_memory_backend
+
+
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def _manager(path, backend, **kwargs):
+    kwargs.setdefault("sync_interval", 0)
+    kwargs.setdefault("max_memories", 0)
+    return MemoryManager(str(path), backend=create_memory_backend(path, backend), **kwargs)
+
+
+def _worker(path, backend, durability, worker, count):
+    memory = _manager(path, backend, durability=durability)
+    for i in range(count):
+        memory.remember(f"w{worker}_{i}", i, user_id="compartilhado")
+        if i % 10 == 0:
+            memory.get_context_summary("compartilhado")
+    memory.close()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_manager_sees_writes_from_another_manager_after_refresh(tmp_path, backend):
+    first = _manager(tmp_path, backend, sync_interval=3600)
+    second = _manager(tmp_path, backend, sync_interval=3600)
+    first.remember("cidade", "Recife", user_id="ana")
+    assert second.recall("cidade", "ana") == "Recife"
+    first.get_all_memories("bia")
+
+    second.remember("cidade", "Natal", user_id="ana")
+    # Sem refresh, a cache do primeiro ainda tem o valor antigo
+    assert first.recall("cidade", "ana") == "Recife"
+    first.refresh()
+    # Só o usuário alterado sai da cache
+    assert "ana" not in first.memories and "bia" in first.memories
+    assert first.recall("cidade", "ana") == "Natal"
+
+    # As próprias escritas não forçam releitura
+    first.remember("time", "Sport", user_id="ana")
+    first.refresh()
+    assert "ana" in first.memories
+    second.refresh()
+    assert second.recall("time", "ana") == "Sport"
+    first.close()
+    second.close()
+
+
+@pytest.mark.parametrize("durability", ("sync", "buffered"))
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_processes_lose_no_writes(tmp_path, backend, durability):
+    observer = _manager(tmp_path, backend)
+    assert observer.get_all_memories("compartilhado") == {}
+
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_worker, args=(tmp_path, backend, durability, worker, 150))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    # Um gerenciador já aberto vê as escritas dos outros processos após o refresh
+    observer.refresh()
+    assert len(observer.get_all_memories("compartilhado")) == 600
+    observer.close()
+    assert len(_manager(tmp_path, backend).get_all_memories("compartilhado")) == 600
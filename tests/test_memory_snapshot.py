@@ -0,0 +1,66 @@
+"""Testes de exportação e importação de snapshots de memória"""
+
+import gzip
+import struct
+
+import pytest
+
+from src.utils.memory import create_memory_backend
+from src.utils.memory_snapshot import export_snapshot, import_snapshot, verify_snapshot
+
+
+def _record(value):
+    return {"value": value, "timestamp": "2026-01-01T00:00:00"}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    backend = create_memory_backend(tmp_path / "origem", "json")
+    backend.restore({f"u{n}": {f"k{i}": _record("v" * 40) for i in range(10)} for n in range(30)})
+    path = tmp_path / "memorias.jsonl.gz"
+    assert export_snapshot(backend, str(path)) == {"users": 30, "memories": 300}
+    return path
+
+
+def test_snapshot_round_trip(tmp_path, snapshot):
+    target = create_memory_backend(tmp_path / "destino", "sqlite")
+    assert import_snapshot(target, str(snapshot)) == {"users": 30, "memories": 300}
+    assert target.load("u7")["k3"].items() >= _record("v" * 40).items()
+    target.close()
+
+
+def _corrupt_crc(data: bytes) -> bytes:
+    return data[:-8] + struct.pack("<I", 0) + data[-4:]
+
+
+def _flip_middle_byte(data: bytes) -> bytes:
+    middle = bytearray(data)
+    middle[len(data) // 2] ^= 0xFF
+    return bytes(middle)
+
+
+def _truncate(data: bytes) -> bytes:
+    return data[: len(data) // 2]
+
+
+def _drop_footer(data: bytes) -> bytes:
+    lines = gzip.decompress(data).splitlines(keepends=True)
+    return gzip.compress(b"".join(lines[:-1]))
+
+
+@pytest.mark.parametrize("corrupt", [_corrupt_crc, _flip_middle_byte, _truncate, _drop_footer])
+def test_corrupt_snapshot_raises_value_error(tmp_path, snapshot, corrupt):
+    snapshot.write_bytes(corrupt(snapshot.read_bytes()))
+    with pytest.raises(ValueError):
+        verify_snapshot(str(snapshot))
+
+    # Nada é gravado a partir de um snapshot inválido
+    target = create_memory_backend(tmp_path / "destino", "json")
+    with pytest.raises(ValueError):
+        import_snapshot(target, str(snapshot))
+    assert list(target.iter_users()) == []
+
+
+def test_missing_snapshot_is_not_reported_as_corrupt(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        verify_snapshot(str(tmp_path / "nao-existe.gz"))
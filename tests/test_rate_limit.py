@@ -0,0 +1,40 @@
+"""Testes do limitador de requisições"""
+
+import threading
+
+import pytest
+
+from src.utils.rate_limit import RateLimiter, RateLimitTimeout, SQLiteBucketBackend
+
+
+def test_sqlite_backend_uses_wal_without_full_sync(tmp_path):
+    backend = SQLiteBucketBackend(tmp_path / "rate.db")
+    assert backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # 1 = NORMAL
+    assert backend._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_bucket_is_shared_between_limiters(tmp_path):
+    first = RateLimiter(rate_limit=1, window=60, burst=2, max_wait=0, db_path=tmp_path / "rate.db")
+    second = RateLimiter(rate_limit=1, window=60, burst=2, max_wait=0, db_path=tmp_path / "rate.db")
+    first.acquire()
+    second.acquire()
+    with pytest.raises(RateLimitTimeout):
+        first.acquire()
+
+
+def test_throttled_counter_is_exact_across_threads():
+    limiter = RateLimiter(rate_limit=1, window=3600, burst=1, max_wait=0, db_path=None)
+    limiter.acquire()
+
+    def worker():
+        for _ in range(500):
+            with pytest.raises(RateLimitTimeout):
+                limiter.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert limiter.throttled == 4000
@@ -0,0 +1,67 @@
+"""Testes do cache de respostas dos agentes"""
+
+from types import SimpleNamespace
+
+from src.utils import response_cache
+from src.utils.response_cache import ResponseCache, normalize_prompt
+
+
+class FakeAgent:
+    """Agente sem estado que conta as execuções."""
+
+    def __init__(self, **flags):
+        self.calls = 0
+        self.__dict__.update(flags)
+
+    def run(self, input, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=f"{input} #{self.calls}", status="completed")
+
+    async def arun(self, input, **kwargs):
+        return self.run(input, **kwargs)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("Quais minhas  TAREFAS de hoje?") == "quais minhas tarefas de hoje"
+    assert normalize_prompt("Reunião às 10h!") == "reuniao as 10h"
+
+
+def test_stateless_agent_is_cached_per_normalized_text():
+    agent = ResponseCache(ttl=60).wrap(FakeAgent())
+    first = agent.run("Quais as tarefas de hoje?")
+    assert agent.run("quais as tarefas de hoje").content == first.content
+    assert agent.calls == 1
+    agent.run("e amanhã?")
+    assert agent.calls == 2
+
+
+def test_agent_with_history_is_not_wrapped():
+    agent = FakeAgent(add_history_to_context=True)
+    run = agent.run
+    assert ResponseCache(ttl=60).wrap(agent).run == run
+
+
+def test_invalidation_discards_entries_and_in_flight_runs():
+    cache = ResponseCache(ttl=60)
+    agent = cache.wrap(FakeAgent())
+    agent.run("tarefas de hoje")
+    cache.invalidate()
+    agent.run("tarefas de hoje")
+    assert agent.calls == 2
+
+    generation = cache.generation("default")
+    cache.invalidate()
+    cache.set("default", (False, False), "velha", "resposta velha", generation)
+    assert cache.get("default", (False, False), "velha") is None
+
+
+def test_user_generations_are_bounded(monkeypatch):
+    monkeypatch.setattr(response_cache, "_MAX_USER_GENERATIONS", 10)
+    cache = ResponseCache(ttl=60)
+    generation = cache.generation("ana")
+    for n in range(25):
+        cache.invalidate(f"u{n}")
+    assert len(cache._user_generations) <= 10
+    # Uma marca lida antes da limpeza continua inválida
+    cache.set("ana", (False, False), "oi", "resposta", generation)
+    assert cache.get("ana", (False, False), "oi") is None
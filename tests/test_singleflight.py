@@ -0,0 +1,63 @@
+"""Testes da coalescência de leituras em andamento"""
+
+import asyncio
+import threading
+import time
+
+from src.tools import todoist
+from src.utils.singleflight import SingleFlight
+from tests.conftest import paused_read
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "resultado"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["resultado"] * 5
+    assert len(calls) == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_sync_and_async_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "resultado"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.ado("k", slow))
+        await asyncio.sleep(0.01)
+        # Uma thread síncrona espera a execução do event loop
+        follower = asyncio.to_thread(flights.do, "k", lambda: calls.append(2))
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(main()) == ["resultado", "resultado"]
+    assert calls == [1]
+
+
+def test_read_after_write_does_not_join_older_flight(tasks):
+    """Depois de uma escrita, uma leitura nova não recebe o resultado da busca anterior."""
+    reader, resume, results = paused_read(tasks, "hoje")
+    task = {"id": "2", "content": "nova", "priority": 1}
+    tasks["tasks"].append(task)
+    todoist._record_added_task(task)
+    fresh = todoist.list_todoist_tasks.entrypoint("hoje")
+    resume.set()
+    reader.join(5)
+
+    assert "nova" in fresh
+    assert "nova" not in results[0]
@@ -0,0 +1,45 @@
+"""Testes do parser incremental de arrays JSON"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.utils.streaming import aiter_json_array, iter_json_array
+
+ARRAYS = [
+    [1, 23, 4.5, 1500.0, -7],
+    [1e3, -0.25, 2e-2, 0],
+    [True, False, None, "ação ✅", {"id": "1", "due": {"date": "2026-01-01"}}, [1, [2]]],
+    [],
+]
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("array", ARRAYS)
+def test_values_split_across_chunks(array):
+    data = json.dumps(array, ensure_ascii=False).encode()
+    for size in range(1, len(data) + 1):
+        assert list(iter_json_array(_chunks(data, size))) == array
+
+
+@pytest.mark.parametrize("array", ARRAYS)
+def test_async_values_split_across_chunks(array):
+    data = json.dumps(array, ensure_ascii=False).encode()
+
+    async def collect():
+        async def chunks():
+            for chunk in _chunks(data, 1):
+                yield chunk
+        return [value async for value in aiter_json_array(chunks())]
+
+    assert asyncio.run(collect()) == array
+
+
+@pytest.mark.parametrize("data", [b"[1, 2", b"[1, 4.", b'[{"id": "1"', b'{"id": "1"}'])
+def test_invalid_array_raises_value_error(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(_chunks(data, 1)))
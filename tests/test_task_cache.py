@@ -0,0 +1,57 @@
+"""Testes do cache de listagens de tarefas"""
+
+import time
+
+from src.tools import todoist
+from src.utils.cache import TTLCache
+from tests.conftest import paused_read
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("hoje", [1])
+    assert cache.get("hoje") == [1]
+    time.sleep(0.1)
+    assert cache.get("hoje") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_discards_values_read_before_clear():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.clear()
+    cache.set("hoje", "velha", generation)
+    assert cache.get("hoje") is None
+    cache.set("hoje", "nova", cache.generation)
+    assert cache.get("hoje") == "nova"
+
+
+def test_listing_is_cached_until_a_write(tasks):
+    assert "velha" in todoist.list_todoist_tasks.entrypoint("hoje")
+    tasks["tasks"].append({"id": "2", "content": "nova", "priority": 1})
+    assert "nova" not in todoist.list_todoist_tasks.entrypoint("hoje")
+
+    todoist._record_added_task({"id": "2", "content": "nova", "priority": 1})
+    assert "nova" in todoist.list_todoist_tasks.entrypoint("hoje")
+
+
+def test_write_during_read_is_not_cached(tasks):
+    """Uma página buscada antes de uma escrita não fica no cache depois dela."""
+    reader, resume, _ = paused_read(tasks, "hoje")
+    task = {"id": "2", "content": "nova", "priority": 1}
+    tasks["tasks"].append(task)
+    todoist._record_added_task(task)
+    resume.set()
+    reader.join(5)
+
+    assert "nova" in todoist.list_todoist_tasks.entrypoint("hoje")
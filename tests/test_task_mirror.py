@@ -0,0 +1,123 @@
+"""Testes do espelho local de tarefas"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.task_mirror import TaskMirror, _normalize_due
+
+
+@pytest.fixture
+def sao_paulo(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Sao_Paulo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = TaskMirror(tmp_path / "mirror.db", client=object())
+    yield mirror
+    mirror.close()
+
+
+def test_fixed_timezone_due_is_converted_to_local_time(sao_paulo):
+    # 01:30 UTC do dia 18 ainda é dia 17 em São Paulo (UTC-3)
+    assert _normalize_due({"date": "2026-10-18T01:30:00Z"}) == ("2026-10-17", "2026-10-17T22:30:00")
+    assert _normalize_due({"date": "2026-10-18", "datetime": "2026-10-18T01:30:00Z"}) == (
+        "2026-10-17", "2026-10-17T22:30:00"
+    )
+
+
+def test_floating_and_all_day_dues_are_kept(sao_paulo):
+    assert _normalize_due({"date": "2026-10-18T01:30:00"}) == ("2026-10-18", "2026-10-18T01:30:00")
+    assert _normalize_due({"date": "2026-10-18"}) == ("2026-10-18", None)
+    assert _normalize_due(None) == (None, None)
+
+
+def test_filters_use_local_due_time(mirror, sao_paulo):
+    now = datetime.now(timezone.utc)
+    past = (now - timedelta(minutes=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    future = (now + timedelta(minutes=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # 23:30 de hoje no horário local já é amanhã em UTC
+    tonight = datetime.now().replace(hour=23, minute=30, second=0, microsecond=0).astimezone(timezone.utc)
+    mirror.apply({"sync_token": "t1", "items": [
+        {"id": "1", "content": "passou", "due": {"date": past}},
+        {"id": "2", "content": "falta", "due": {"date": future}},
+        {"id": "3", "content": "noite", "due": {"date": tonight.strftime("%Y-%m-%dT%H:%M:%SZ")}},
+    ]})
+    assert [task["id"] for task in mirror.list_tasks("vencidas")] == ["1"]
+    assert "3" in {task["id"] for task in mirror.list_tasks("hoje")}
+    assert "3" not in {task["id"] for task in mirror.list_tasks("amanhã")}
+
+
+def test_mirror_in_old_due_format_resyncs_from_scratch(tmp_path):
+    path = tmp_path / "mirror.db"
+    mirror = TaskMirror(path, client=object())
+    mirror.apply({"sync_token": "t1", "items": []})
+    mirror._conn.execute("DELETE FROM meta WHERE key = 'due_format'")
+    mirror.close()
+
+    assert TaskMirror(path, client=object()).sync_token == "*"
+
+
+def test_sync_started_before_a_local_write_is_discarded(mirror):
+    mirror.apply({"sync_token": "t1", "full_sync": True, "items": [{"id": "1", "content": "antiga"}]})
+    request, _ = mirror._begin_sync()
+
+    # Tarefa criada pela REST API enquanto a sincronização estava em voo
+    mirror.mark_stale()
+    mirror.upsert_task({"id": "2", "content": "nova"})
+    mirror.apply({"sync_token": "t2", "full_sync": True, "items": [{"id": "1", "content": "antiga"}]}, request)
+
+    assert [task["id"] for task in mirror.list_tasks()] == ["1", "2"]
+    assert mirror.sync_token == "t1"
+    assert mirror.is_stale()
+
+    # A próxima sincronização é aplicada normalmente
+    request, _ = mirror._begin_sync()
+    mirror.apply({"sync_token": "t3", "items": [{"id": "2", "checked": True}]}, request)
+    assert [task["id"] for task in mirror.list_tasks()] == ["1"]
+    assert not mirror.is_stale()
+
+
+def test_async_listing_does_not_block_the_event_loop(mirror, monkeypatch):
+    from src.tools import todoist_async
+
+    mirror.max_age = 3600
+    mirror.apply({"sync_token": "t1", "items": [{"id": "1", "content": "tarefa"}]})
+    monkeypatch.setattr(todoist_async, "TODOIST_MIRROR_ENABLED", True)
+    monkeypatch.setattr(todoist_async, "get_task_mirror", lambda: mirror)
+
+    async def main():
+        async def ticker():
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+
+        # Outra thread segura a trava do espelho (ex: aplicando uma sincronização completa)
+        holding, release = threading.Event(), threading.Event()
+
+        def hold():
+            with mirror._lock:
+                holding.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        holding.wait(5)
+        page = asyncio.ensure_future(todoist_async._afetch_task_page(None, 10, 0))
+        start = time.monotonic()
+        await ticker()
+        elapsed = time.monotonic() - start
+        release.set()
+        holder.join(5)
+        return elapsed, await page
+
+    elapsed, (tasks, has_more) = asyncio.run(main())
+    assert elapsed < 1
+    assert [task["id"] for task in tasks] == ["1"] and not has_more